@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for batch conversion of many files.
+
+Converts a directory of generated books one after another and with :func:`ooxml.batch.convert`
+using different number of worker processes.
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ooxml import batch
+
+from docgen import generate_docx
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    directory = tempfile.mkdtemp()
+    file_names = []
+
+    for n in range(16):
+        file_name = os.path.join(directory, 'book-{:02d}.docx'.format(n))
+        generate_docx(file_name, chapters=10, paragraphs=40, runs=8, seed=n)
+        file_names.append(file_name)
+
+    print('CPUs: {}'.format(multiprocessing.cpu_count()))
+
+    start = time.time()
+
+    for file_name in file_names:
+        batch.convert_file(file_name)
+
+    elapsed = time.time() - start
+    print('sequential: {:.2f} s, {:.1f} files/s'.format(elapsed, len(file_names) / elapsed))
+
+    for workers in [1, 2, 4]:
+        start = time.time()
+        results = list(batch.convert(file_names, workers=workers))
+        elapsed = time.time() - start
+
+        assert all(result.stats['error'] is None for result in results)
+        print('workers={}: {:.2f} s, {:.1f} files/s'.format(workers, elapsed, len(file_names) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
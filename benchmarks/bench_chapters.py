@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for splitting a book into chapters.
+
+Measures :func:`ooxml.importer.get_chapters` on a large generated book. Weights of the elements
+are calculated before measuring so only splitting and serialization of the chapters is measured.
+
+Serialization of the chapters in a pool of processes is measured with different number of workers.
+On Python 3 it also compares peak memory of writing all the chapters to a file with
+:func:`ooxml.importer.get_chapters` and :func:`ooxml.importer.iter_chapters`.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import importer
+
+from docgen import generate_docx
+
+
+def write_chapters(chapters, file_name):
+    with open(file_name, 'wb') as f:
+        for title, content in chapters:
+            f.write(content)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak / 1024.0 / 1024
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'book.docx')
+    generate_docx(file_name, chapters=60, paragraphs=100, runs=8)
+
+    document = ooxml.read_from_file(file_name).document
+    chapters = importer.get_chapters(document)
+
+    print('Elements: {}'.format(len(document.elements)))
+    print('Chapters: {}'.format(len(chapters)))
+    print('HTML: {:.1f} MB'.format(sum(len(content) for _, content in chapters) / 1024.0 / 1024))
+
+    elapsed = min(timeit.repeat(lambda: importer.get_chapters(document), number=1, repeat=5))
+    print('get_chapters: {:.3f} s'.format(elapsed))
+
+    for workers in [2, 4, 8]:
+        elapsed = min(timeit.repeat(lambda: importer.get_chapters(document, workers=workers), number=1, repeat=3))
+        print('get_chapters, {} workers: {:.3f} s'.format(workers, elapsed))
+
+    if tracemalloc is not None:
+        output = os.path.join(os.path.dirname(file_name), 'book.html')
+
+        print('Peak memory, get_chapters: {:.1f} MB'.format(
+            peak_memory(lambda: write_chapters(importer.get_chapters(document), output))))
+        print('Peak memory, iter_chapters: {:.1f} MB'.format(
+            peak_memory(lambda: write_chapters(importer.iter_chapters(document), output))))
+
+
+if __name__ == '__main__':
+    main()
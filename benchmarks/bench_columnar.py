@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for font size statistics calculated on the columnar document.
+
+Generates a book and compares time and memory needed to get font size usage and possible headers
+using the object model and :class:`ooxml.columnar.ColumnarDocument`. Memory is measured with
+tracemalloc and works only with Python 3. Install NumPy to use vectorized operations.
+"""
+
+import gc
+import logging
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import columnar, importer
+from ooxml.columnar import ColumnarDocument
+
+from docgen import generate_docx
+
+
+def with_object_model(file_name):
+    dfile = ooxml.read_from_file(file_name)
+    document = dfile.document
+    dfile.close()
+
+    importer.calculate_weights(document)
+    document._calculate_possible_headers()
+
+    return document
+
+
+def with_columnar(file_name):
+    cdoc = ColumnarDocument.from_file(file_name)
+    cdoc.possible_headers()
+
+    return cdoc
+
+
+def peak_memory(func, file_name):
+    gc.collect()
+    tracemalloc.start()
+
+    result = func(file_name)
+    peak = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.stop()
+    del result
+
+    return peak / 1024.0 / 1024
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'book.docx')
+    generate_docx(file_name, chapters=40, paragraphs=100, runs=10, split_runs=2)
+
+    print('NumPy: {}'.format('yes' if columnar.numpy is not None else 'no'))
+
+    for name, func in [('object model', with_object_model), ('columnar', with_columnar)]:
+        duration = min(timeit.repeat(lambda: func(file_name), number=1, repeat=3))
+
+        print('{}: {:.3f} s, peak memory {:.1f} MB'.format(name, duration, peak_memory(func, file_name)))
+
+    cdoc = ColumnarDocument.from_file(file_name)
+    duration = min(timeit.repeat(cdoc.font_size_usage, number=10, repeat=3)) / 10
+
+    print('font_size_usage on {} runs: {:.2f} ms'.format(len(cdoc), duration * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for memory used by the document model.
+
+Parses a generated book and measures memory allocated by Python for the parsed document using
+tracemalloc. Works only with Python 3.
+"""
+
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ooxml import doc, parse
+
+from docgen import generate_document_xml
+
+
+def count_elements(elements):
+    count = 0
+
+    for elem in elements:
+        count += 1
+
+        if isinstance(elem, doc.Table):
+            for row in elem.rows:
+                count += count_elements(row)
+        elif hasattr(elem, 'elements'):
+            count += count_elements(elem.elements)
+
+    return count
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    content = generate_document_xml(chapters=40, paragraphs=100, runs=10, split_runs=2)
+
+    gc.collect()
+    tracemalloc.start()
+
+    before = tracemalloc.get_traced_memory()[0]
+    document = parse.parse_document(content)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+
+    elements = count_elements(document.elements)
+
+    print('Elements: {}'.format(elements))
+    print('Memory: {:.1f} MB'.format((after - before) / 1024.0 / 1024))
+    print('Bytes per element: {:.0f}'.format(float(after - before) / elements))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for engines used to parse 'document.xml'.
+
+Generates a book and compares time and peak memory needed by :func:`ooxml.parse.parse_document`,
+:func:`ooxml.parse.iterparse_document` and :func:`ooxml.parse.targetparse_document`. Memory
+allocated by libxml2 is not traced by tracemalloc so peak memory is measured as maximum resident
+set size of a new process for every engine. Works only on Linux.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ooxml import parse
+
+from docgen import generate_document_xml
+
+ENGINES = {
+    'tree': lambda file_name: parse.parse_document(open(file_name, 'rb').read()),
+    'iterparse': parse.iterparse_document,
+    'target': parse.targetparse_document
+}
+
+
+def peak_memory(engine, file_name):
+    "Returns peak memory in MB used by the new process while parsing the document."
+
+    output = subprocess.check_output([sys.executable, __file__, engine, file_name])
+
+    return float(output) / 1024
+
+
+def measure(engine, file_name):
+    "Parses the document and prints maximum resident set size in kB."
+
+    ENGINES[engine](file_name)
+
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                print(line.split()[1])
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'document.xml')
+
+    with open(file_name, 'wb') as f:
+        f.write(generate_document_xml(chapters=40, paragraphs=100, runs=10, split_runs=2))
+
+    print('document.xml: {:.1f} MB'.format(os.path.getsize(file_name) / 1024.0 / 1024))
+
+    for engine in ['tree', 'iterparse', 'target']:
+        duration = min(timeit.repeat(lambda: ENGINES[engine](file_name), number=1, repeat=3))
+
+        print('{}: {:.3f} s, peak memory {:.1f} MB'.format(engine, duration, peak_memory(engine, file_name)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        measure(*sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for hooks filtered by style.
+
+Generates a book and serializes it with 20 paragraph hooks, each one interested in a single style.
+Plain hook functions are called for every paragraph and have to check the style themselves, hooks
+wrapped with :class:`ooxml.serialize.Hook` are called only for paragraphs with matching style.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import serialize
+from ooxml.serialize import Hook
+
+from docgen import generate_docx
+
+STYLES = ['Title', 'Heading1', 'Heading2', 'Quote', 'ListParagraph'] + ['Custom{}'.format(n) for n in range(15)]
+
+
+class Counter(object):
+    def __init__(self):
+        self.calls = 0
+
+    def make_hook(self, style_id):
+        def _hook(ctx, document, el, elem):
+            self.calls += 1
+
+            if getattr(el, 'style_id', None) == style_id:
+                elem.set('class', style_id.lower())
+
+        return _hook
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'book.docx')
+    generate_docx(file_name, chapters=20, paragraphs=100, runs=4)
+
+    dfile = ooxml.read_from_file(file_name)
+    document = dfile.document
+    dfile.close()
+
+    plain, filtered = Counter(), Counter()
+    variants = [
+        ('plain functions', plain, [plain.make_hook(st) for st in STYLES]),
+        ('Hook filters', filtered, [Hook(filtered.make_hook(st), style_id=st) for st in STYLES]),
+    ]
+
+    results = []
+
+    for name, counter, hooks in variants:
+        options = {'hooks': {'p': hooks}}
+        duration = min(timeit.repeat(lambda: serialize.serialize(document, options), number=1, repeat=3))
+        results.append(serialize.serialize(document, options))
+
+        print('{}: {:.3f} s, {} hook calls per serialization'.format(name, duration, counter.calls // 4))
+
+    print('same output: {}'.format(results[0] == results[1]))
+
+
+if __name__ == '__main__':
+    main()
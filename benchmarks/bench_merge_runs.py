@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for merging runs with the same formatting while parsing.
+
+Generates a book where every run is split into several runs with the same formatting, like Word
+does because of spell checking and revision marks. Compares number of text elements and time
+needed for parsing and for :func:`ooxml.importer.get_chapters` with and without merging.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import doc, importer
+
+from docgen import generate_docx
+
+
+def count_texts(elements):
+    count = 0
+
+    for elem in elements:
+        if isinstance(elem, doc.Text):
+            count += 1
+        elif hasattr(elem, 'elements'):
+            count += count_texts(elem.elements)
+
+    return count
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'runs.docx')
+    generate_docx(file_name, chapters=30, paragraphs=100, runs=8, split_runs=4)
+
+    for merge_runs in [False, True]:
+        document = ooxml.read_from_file(file_name, merge_runs=merge_runs).document
+
+        parse_time = min(timeit.repeat(lambda: ooxml.read_from_file(file_name, merge_runs=merge_runs), number=1, repeat=3))
+
+        documents = [ooxml.read_from_file(file_name, merge_runs=merge_runs).document for _ in range(3)]
+        chapters_time = min(timeit.repeat(lambda: importer.get_chapters(documents.pop()), number=1, repeat=3))
+
+        print('merge_runs={}: {} text elements, {} merged, parse {:.3f} s, get_chapters {:.3f} s'.format(
+            merge_runs, count_texts(document.elements), document.merged_runs, parse_time, chapters_time))
+
+
+if __name__ == '__main__':
+    main()
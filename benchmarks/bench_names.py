@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Micro-benchmark for parsing paragraphs.
+
+Measures time needed to parse one paragraph and time needed to resolve qualified
+names with :func:`ooxml.parse._name` compared to precompiled constants.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lxml import etree
+
+from ooxml import doc, parse, NAMESPACES
+
+from docgen import generate_document_xml
+
+
+def main():
+    content = generate_document_xml(chapters=5, paragraphs=200, runs=10)
+    body = etree.fromstring(content).find('.//{{{w}}}body'.format(**NAMESPACES))
+    paragraphs = [el for el in body if el.tag == '{{{w}}}p'.format(**NAMESPACES)]
+
+    def _parse():
+        document = doc.Document()
+
+        for par in paragraphs:
+            parse.parse_paragraph(document, par)
+
+    number = 10
+    total = min(timeit.repeat(_parse, number=number, repeat=5))
+
+    print('Paragraphs: {}'.format(len(paragraphs)))
+    print('parse_paragraph: {:.1f} us per paragraph'.format(total / number / len(paragraphs) * 1e6))
+
+    name_time = min(timeit.repeat(lambda: parse._name('{{{w}}}rStyle'), number=100000, repeat=5))
+    const_time = min(timeit.repeat(lambda: '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}rStyle',
+                                   number=100000, repeat=5))
+
+    print('_name(): {:.3f} us per call'.format(name_time / 100000 * 1e6))
+    print('constant: {:.3f} us per access'.format(const_time / 100000 * 1e6))
+
+
+if __name__ == '__main__':
+    main()
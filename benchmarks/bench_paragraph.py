@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for serialization of paragraphs with many runs.
+
+Documents which were scanned or edited with track changes can have thousands of small runs in one
+paragraph. Time per run should stay the same when the number of runs grows.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ooxml import doc, serialize
+
+
+FORMATTING = [{}, {}, {'b': True}, {'b': True}, {'sz': '28'}, {}, {'i': True}, {}]
+
+
+def create_document(runs):
+    document = doc.Document()
+    par = doc.Paragraph()
+
+    for n in range(runs):
+        text = doc.Text(u'word{} '.format(n))
+        text.rpr = FORMATTING[n % len(FORMATTING)]
+        par.elements.append(text)
+
+    document.elements.append(par)
+
+    return document
+
+
+def main():
+    for runs in [1250, 2500, 5000, 10000, 20000]:
+        document = create_document(runs)
+
+        elapsed = min(timeit.repeat(lambda: serialize.serialize(document), number=1, repeat=3))
+        print('{:5d} runs: {:.3f} s, {:.1f} us per run'.format(runs, elapsed, elapsed / runs * 1000000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for parsing with :class:`ooxml.parse.ParseStats`.
+
+Generates a book, compares time needed to parse it with and without the stats and prints the
+collected report. Memory is traced only in the last run because tracemalloc slows parsing down.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml.parse import ParseStats
+
+from docgen import generate_docx
+
+
+def parse(file_name, stats=None):
+    dfile = ooxml.read_from_file(file_name, stats=stats)
+    dfile.close()
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'book.docx')
+    generate_docx(file_name, chapters=20, paragraphs=100, runs=8)
+
+    duration = min(timeit.repeat(lambda: parse(file_name), number=1, repeat=3))
+    print('without stats: {:.3f} s'.format(duration))
+
+    duration = min(timeit.repeat(lambda: parse(file_name, ParseStats()), number=1, repeat=3))
+    print('with stats: {:.3f} s'.format(duration))
+
+    stats = ParseStats(trace_memory=True)
+    duration = timeit.timeit(lambda: parse(file_name, stats), number=1)
+    print('with stats and memory: {:.3f} s'.format(duration))
+    print('')
+    print(stats.format_report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for serialization with the profiler.
+
+Generates a book and serializes it with a few hooks, first without the profiler and then with
+:class:`ooxml.serialize.Profiler`, and prints the overhead and the collected report.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import serialize
+from ooxml.serialize import Hook, Profiler
+
+from docgen import generate_docx
+
+
+def mark_quote(ctx, document, el, elem):
+    elem.set('class', 'quote')
+
+
+def count_words(ctx, document, el, elem):
+    len(''.join(elem.itertext()).split())
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'book.docx')
+    generate_docx(file_name, chapters=20, paragraphs=100, runs=8)
+
+    dfile = ooxml.read_from_file(file_name)
+    document = dfile.document
+    dfile.close()
+
+    options = {'hooks': {'p': [Hook(mark_quote, style_id='Quote'), count_words], 'table': [count_words]}}
+
+    duration = min(timeit.repeat(lambda: serialize.serialize(document, options), number=1, repeat=3))
+    print('without profiler: {:.3f} s'.format(duration))
+
+    profiler = Profiler()
+    profiled = dict(options, profiler=profiler)
+
+    duration = min(timeit.repeat(lambda: serialize.serialize(document, profiled), number=1, repeat=3))
+    print('with profiler: {:.3f} s'.format(duration))
+    print('')
+    print(profiler.format_report())
+
+
+if __name__ == '__main__':
+    main()
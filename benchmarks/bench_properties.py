@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Memory benchmark for parsed run and paragraph properties.
+
+Parses synthetic document and reports how many property objects are held by the
+document model and how much memory the model takes.
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ooxml import doc, parse
+
+from docgen import generate_document_xml
+
+
+def _walk(elements):
+    for elem in elements:
+        yield elem
+
+        if isinstance(elem, doc.Table):
+            for row in elem.rows:
+                for cell in row:
+                    for el in _walk(cell.elements):
+                        yield el
+
+        for el in _walk(getattr(elem, 'elements', [])):
+            yield el
+
+
+def main():
+    content = generate_document_xml(chapters=20, paragraphs=200, runs=10)
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.time()
+
+    document = parse.parse_document(content)
+
+    elapsed = time.time() - start
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    texts = [el for el in _walk(document.elements) if isinstance(el, doc.Text)]
+    paragraphs = [el for el in _walk(document.elements) if isinstance(el, doc.Paragraph)]
+
+    rpr = set(id(el.rpr) for el in texts if el.rpr)
+    ppr = set(id(el.ppr) for el in paragraphs if el.ppr)
+
+    print('Text elements: {}'.format(len(texts)))
+    print('Distinct formats: {}'.format(len(set(tuple(sorted(el.rpr.items())) for el in texts))))
+    print('Run property objects: {}'.format(len(rpr)))
+    print('Paragraph property objects: {}'.format(len(ppr)))
+    print('Document model: {:.1f} MB, {:.0f} bytes per text element'.format(memory / 1e6, float(memory) / len(texts)))
+    print('Parse time (with tracemalloc): {:.2f} s'.format(elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for style lookups with a large template.
+
+Compares :meth:`ooxml.doc.StylesCollection.get_by_id` with the linear search it replaced,
+measures resolving of inherited style values and conversion of a document which defines 500 styles.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import importer, serialize
+
+from docgen import generate_docx
+
+
+def linear_get_by_id(styles, style_id):
+    for st in styles.styles.values():
+        if st and st.style_id == style_id:
+            return st
+
+    return None
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'styles.docx')
+    generate_docx(file_name, chapters=10, paragraphs=50, runs=8, extra_styles=500)
+
+    dfile = ooxml.read_from_file(file_name)
+    styles = dfile.document.styles
+    style_ids = list(styles.styles.keys())
+
+    print('Styles: {}'.format(len(style_ids)))
+
+    number = 20
+    linear = min(timeit.repeat(lambda: [linear_get_by_id(styles, style_id) for style_id in style_ids], number=number, repeat=5))
+    indexed = min(timeit.repeat(lambda: [styles.get_by_id(style_id) for style_id in style_ids], number=number, repeat=5))
+    by_name = min(timeit.repeat(lambda: [styles.get_by_name(st.name) for st in styles.styles.values()], number=number, repeat=5))
+
+    calls = number * len(style_ids)
+
+    print('linear get_by_id: {:.2f} us per call'.format(linear / calls * 1e6))
+    print('get_by_id: {:.2f} us per call'.format(indexed / calls * 1e6))
+    print('get_by_name: {:.2f} us per call'.format(by_name / calls * 1e6))
+
+    all_styles = list(styles.styles.values())
+    document = dfile.document
+    resolve = min(timeit.repeat(lambda: [(serialize._get_font_size(document, st), serialize.get_css_classes(document, st))
+                                         for st in all_styles], number=number, repeat=5))
+
+    print('font size and CSS classes: {:.2f} us per style'.format(resolve / calls * 1e6))
+
+    elapsed = min(timeit.repeat(lambda: importer.get_chapters(ooxml.read_from_file(file_name).document), number=1, repeat=3))
+    print('read_from_file + get_chapters: {:.3f} s'.format(elapsed))
+
+
+if __name__ == '__main__':
+    main()
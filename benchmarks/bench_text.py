@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for extracting plain text from the document.
+
+Compares :func:`ooxml.extract_text` with parsing the whole document, serializing it to HTML and
+getting text from the HTML.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lxml import html
+
+import ooxml
+from ooxml import serialize
+
+from docgen import generate_docx
+
+
+def full_pipeline(file_name):
+    dfile = ooxml.read_from_file(file_name)
+    content = serialize.serialize(dfile.document)
+    dfile.close()
+
+    return html.fromstring(content).text_content()
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'book.docx')
+    generate_docx(file_name, chapters=40, paragraphs=100, runs=10, split_runs=2)
+
+    full_time = min(timeit.repeat(lambda: full_pipeline(file_name), number=1, repeat=3))
+    text_time = min(timeit.repeat(lambda: ooxml.extract_text(file_name), number=1, repeat=3))
+
+    print('read_from_file + serialize: {:.3f} s'.format(full_time))
+    print('extract_text: {:.3f} s'.format(text_time))
+    print('Speedup: {:.1f}x'.format(full_time / text_time))
+
+
+if __name__ == '__main__':
+    main()
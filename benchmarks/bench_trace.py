@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for tracing of the conversion.
+
+Generates a book and converts it into chapters without the tracer, with the tracer and again
+after the tracer was stopped, to check that stopped tracer leaves no overhead. Trace is saved
+to a temporary file which can be opened in Perfetto.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import importer
+from ooxml.trace import Tracer
+
+from docgen import generate_docx
+
+
+def convert(file_name):
+    dfile = ooxml.read_from_file(file_name)
+    importer.get_chapters(dfile.document)
+    dfile.close()
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    directory = tempfile.mkdtemp()
+    file_name = os.path.join(directory, 'book.docx')
+    generate_docx(file_name, chapters=20, paragraphs=100, runs=8)
+
+    duration = min(timeit.repeat(lambda: convert(file_name), number=1, repeat=3))
+    print('without tracer: {:.3f} s'.format(duration))
+
+    with Tracer() as tracer:
+        duration = timeit.timeit(lambda: convert(file_name), number=1)
+
+    print('with tracer: {:.3f} s, {} spans'.format(duration, len(tracer.events)))
+
+    duration = min(timeit.repeat(lambda: convert(file_name), number=1, repeat=3))
+    print('after tracer: {:.3f} s'.format(duration))
+
+    trace_name = os.path.join(directory, 'trace.json')
+    tracer.save(trace_name)
+    print('trace saved to {}'.format(trace_name))
+
+
+if __name__ == '__main__':
+    main()
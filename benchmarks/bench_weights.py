@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for calculating weights of the elements.
+
+Counts how many times weight of an element is calculated during :func:`ooxml.importer.get_chapters`
+and measures time needed for the whole conversion.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import importer
+
+from docgen import generate_docx
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'weights.docx')
+    generate_docx(file_name, chapters=30, paragraphs=100, runs=10)
+
+    calls = [0]
+    _calculate = importer._calculate
+
+    def _counting(doc, elem, style_id, count_sizes):
+        calls[0] += 1
+
+        return _calculate(doc, elem, style_id, count_sizes)
+
+    importer._calculate = _counting
+
+    document = ooxml.read_from_file(file_name).document
+    importer.get_chapters(document)
+
+    importer._calculate = _calculate
+
+    print('Elements: {}'.format(len(document.elements)))
+    print('Weight calculations: {}'.format(calls[0]))
+
+    documents = [ooxml.read_from_file(file_name).document for _ in range(3)]
+    elapsed = min(timeit.repeat(lambda: importer.get_chapters(documents.pop()), number=1, repeat=3))
+    print('get_chapters: {:.3f} s'.format(elapsed))
+
+
+if __name__ == '__main__':
+    main()
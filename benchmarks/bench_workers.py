@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for concurrent parsing of the document parts.
+
+Compares wall clock time of :func:`ooxml.read_from_file` without workers and with
+thread pool reading and parsing the parts of the file on a book with a lot of footnotes.
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lxml import etree
+
+import ooxml
+
+from docgen import generate_docx
+
+
+def main():
+    logging.disable(logging.WARNING)
+
+    file_name = os.path.join(tempfile.mkdtemp(), 'footnotes.docx')
+    generate_docx(file_name, chapters=30, paragraphs=100, runs=10, footnotes=0.3)
+
+    dfile = ooxml.read_from_file(file_name)
+    print('Footnotes: {}'.format(len(dfile.document.footnotes)))
+
+    # This is the part of the work which can be done concurrently
+    file_names = ['document.xml', 'styles.xml', 'footnotes.xml', 'endnotes.xml', 'comments.xml', 'numbering.xml']
+    elapsed = min(timeit.repeat(lambda: [etree.fromstring(dfile.read_file(name)) for name in file_names], number=1, repeat=5))
+
+    print('CPUs: {}'.format(multiprocessing.cpu_count()))
+    print('Decompress and parse XML: {:.3f} s'.format(elapsed))
+
+    for workers in [1, 2, 4]:
+        elapsed = min(timeit.repeat(lambda: ooxml.read_from_file(file_name, workers=workers), number=1, repeat=5))
+
+        print('workers={}: {:.3f} s'.format(workers, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark for writing HTML of the entire document to a file.
+
+Compares peak memory of :func:`ooxml.serialize.serialize` and :func:`ooxml.serialize.write` for
+books of different size. Memory used by lxml is not visible to the Python memory tracing, so
+the peak resident memory of the process is reset after the document is parsed and measured again
+after it is written. Works only on Linux.
+"""
+
+import ctypes
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import ooxml
+from ooxml import serialize
+
+from docgen import generate_docx
+
+
+def _peak_memory():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024.0
+
+
+def _reset_peak_memory():
+    # Return memory freed after parsing to the system and reset the peak
+    ctypes.CDLL('libc.so.6').malloc_trim(0)
+
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def _measure(file_name, mode, queue):
+    logging.disable(logging.WARNING)
+
+    document = ooxml.read_from_file(file_name).document
+    output_name = file_name + '.html'
+
+    _reset_peak_memory()
+    before = _peak_memory()
+    start = time.time()
+
+    with open(output_name, 'wb') as f:
+        if mode == 'serialize':
+            f.write(serialize.serialize(document))
+        else:
+            serialize.write(document, f)
+
+    elapsed = time.time() - start
+    after = _peak_memory()
+
+    queue.put((elapsed, after - before, os.path.getsize(output_name)))
+
+
+def measure(file_name, mode):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure, args=(file_name, mode, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+
+    return result
+
+
+def main():
+    directory = tempfile.mkdtemp()
+
+    for chapters in [10, 40, 160]:
+        file_name = os.path.join(directory, 'book-{}.docx'.format(chapters))
+        generate_docx(file_name, chapters=chapters, paragraphs=100, runs=8, lists=True)
+
+        for mode in ['serialize', 'write']:
+            elapsed, memory, size = measure(file_name, mode)
+
+            print('{:3d} chapters, {:9s}: {:.3f} s, {:.1f} MB HTML, peak memory +{:.1f} MB'.format(
+                chapters, mode, elapsed, size / 1024.0 / 1024, memory))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+"""Generate synthetic .docx files used by the benchmarks.
+
+Generated documents try to look like a real manuscript. They have chapters with headings,
+styled and directly formatted runs, lists, tables, hyperlinks, footnotes, endnotes, comments,
+text boxes and a table of contents.
+
+.. code-block:: python
+
+    from docgen import generate_docx
+
+    generate_docx('book.docx', chapters=60, paragraphs=100)
+
+"""
+
+import random
+import zipfile
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+MC_NS = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+M_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/math'
+WP_NS = 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing'
+PR_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+ROOT_NS = ('xmlns:w="{}" xmlns:r="{}" xmlns:mc="{}" xmlns:a="{}" xmlns:m="{}" xmlns:wp="{}"'
+           .format(W_NS, R_NS, MC_NS, A_NS, M_NS, WP_NS))
+
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt '
+         'ut labore et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco '
+         'laboris nisi aliquip ex ea commodo consequat duis aute irure in reprehenderit voluptate '
+         'velit esse cillum fugiat nulla pariatur excepteur sint occaecat cupidatat non proident').split()
+
+# Run formats used for directly formatted text.
+FORMATS = [
+    '',
+    '<w:b/>',
+    '<w:i/>',
+    '<w:u w:val="single"/>',
+    '<w:b/><w:i/>',
+    '<w:sz w:val="20"/>',
+    '<w:sz w:val="28"/><w:b/>',
+    '<w:color w:val="FF0000"/>',
+    '<w:vertAlign w:val="superscript"/>',
+    '<w:vertAlign w:val="subscript"/>',
+    '<w:smallCaps/>',
+    '<w:strike/>',
+    '<w:rStyle w:val="Emphasis"/>',
+]
+
+
+def _words(rnd, count):
+    return ' '.join(rnd.choice(WORDS) for _ in range(count))
+
+
+def _run(text, rpr='', rsid=None):
+    _rpr = '<w:rPr>{}</w:rPr>'.format(rpr) if rpr else ''
+    _rsid = ' w:rsidR="{:08X}"'.format(rsid) if rsid is not None else ''
+
+    return '<w:r{}>{}<w:t xml:space="preserve">{}</w:t></w:r>'.format(_rsid, _rpr, text)
+
+
+def _paragraph(content, style=None, ppr=''):
+    _style = '<w:pStyle w:val="{}"/>'.format(style) if style else ''
+
+    if _style or ppr:
+        return '<w:p><w:pPr>{}{}</w:pPr>{}</w:p>'.format(_style, ppr, content)
+
+    return '<w:p>{}</w:p>'.format(content)
+
+
+class _Book(object):
+    def __init__(self, seed, runs, split_runs, lists, footnotes=0.03):
+        self.rnd = random.Random(seed)
+        self.footnote_rate = footnotes
+        self.runs = runs
+        self.split_runs = split_runs
+        self.lists = lists
+        self.footnotes = []
+        self.endnotes = []
+        self.comments = []
+        self.links = []
+
+    def text_paragraph(self, style=None):
+        rnd = self.rnd
+        content = []
+
+        for n in range(self.runs):
+            fmt = rnd.choice(FORMATS) if rnd.random() < 0.3 else ''
+            text = _words(rnd, rnd.randint(2, 12)) + ' '
+
+            if self.split_runs:
+                # Word likes to split runs with same formatting on rsid boundaries
+                for part in range(self.split_runs):
+                    content.append(_run(text, fmt, rsid=rnd.randint(0, 0xFFFFFF)))
+            else:
+                content.append(_run(text, fmt))
+
+            # everything except footnotes has fixed probability
+            dice = rnd.random() - self.footnote_rate + 0.03
+
+            if dice < 0.03:
+                self.footnotes.append(_words(rnd, 20))
+                content.append('<w:r><w:rPr><w:rStyle w:val="FootnoteReference"/></w:rPr>'
+                               '<w:footnoteReference w:id="{}"/></w:r>'.format(len(self.footnotes) + 1))
+            elif dice < 0.04:
+                self.endnotes.append(_words(rnd, 20))
+                content.append('<w:r><w:endnoteReference w:id="{}"/></w:r>'.format(len(self.endnotes) + 1))
+            elif dice < 0.05:
+                self.links.append('http://www.example.com/{}'.format(len(self.links)))
+                content.append('<w:hyperlink r:id="rIdLink{}">{}</w:hyperlink>'.format(
+                    len(self.links), _run(_words(rnd, 3), '<w:rStyle w:val="Hyperlink"/>')))
+            elif dice < 0.055:
+                self.comments.append(_words(rnd, 10))
+                cid = len(self.comments)
+                content.append('<w:commentRangeStart w:id="{0}"/>{1}<w:commentRangeEnd w:id="{0}"/>'
+                               '<w:r><w:commentReference w:id="{0}"/></w:r>'.format(cid, _run(_words(rnd, 4))))
+            elif dice < 0.06:
+                content.append('<w:r><w:sym w:font="Wingdings" w:char="F04A"/></w:r>')
+            elif dice < 0.065:
+                content.append('<w:r><w:t>{}</w:t><w:br/><w:t>{}</w:t></w:r>'.format(_words(rnd, 2), _words(rnd, 2)))
+            elif dice < 0.07:
+                content.append('<w:smartTag w:element="place">{}<w:smartTag w:element="City">{}</w:smartTag>'
+                               '</w:smartTag>'.format(_run(_words(rnd, 1)), _run(_words(rnd, 1))))
+
+        return _paragraph(''.join(content), style)
+
+    def list_items(self, count):
+        items = []
+
+        for n in range(count):
+            ilvl = 1 if n % 3 == 2 else 0
+            ppr = '<w:numPr><w:ilvl w:val="{}"/><w:numId w:val="{}"/></w:numPr>'.format(ilvl, 1 + n % 2)
+            items.append(_paragraph(_run(_words(self.rnd, 6)), 'ListParagraph', ppr))
+
+        return ''.join(items)
+
+    def table(self):
+        rows = []
+
+        for r in range(4):
+            cells = []
+
+            for c in range(3):
+                if r == 0 and c == 0:
+                    tcpr = '<w:tcPr><w:vMerge w:val="restart"/></w:tcPr>'
+                elif r == 1 and c == 0:
+                    tcpr = '<w:tcPr><w:vMerge/></w:tcPr>'
+                else:
+                    tcpr = ''
+
+                cells.append('<w:tc>{}{}</w:tc>'.format(tcpr, self.text_paragraph()))
+
+            rows.append('<w:tr>{}</w:tr>'.format(''.join(cells)))
+
+        rows.append('<w:tr><w:tc><w:tcPr><w:gridSpan w:val="3"/></w:tcPr>{}</w:tc></w:tr>'.format(
+            _paragraph(_run(_words(self.rnd, 4)))))
+
+        return '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/></w:tblPr>{}</w:tbl>'.format(''.join(rows))
+
+    def textbox(self):
+        inner = _paragraph(_run(_words(self.rnd, 8)))
+        box = ('<w:r><mc:AlternateContent><mc:Choice Requires="wps"><w:drawing><wp:inline>'
+               '<w:txbxContent>{0}</w:txbxContent></wp:inline></w:drawing></mc:Choice>'
+               '<mc:Fallback><w:pict><w:txbxContent>{0}</w:txbxContent></w:pict></mc:Fallback>'
+               '</mc:AlternateContent></w:r>').format(inner)
+
+        return _paragraph(box)
+
+
+def _document(book, chapters, paragraphs):
+    rnd = book.rnd
+    body = ['<w:sdt><w:sdtContent>{}</w:sdtContent></w:sdt>'.format(
+        _paragraph(_run('Contents'), 'TOCHeading'))]
+
+    body.append(_paragraph(_run('A Synthetic Book'), 'Title'))
+
+    for chapter in range(chapters):
+        body.append(_paragraph(_run('Chapter {}'.format(chapter + 1)), 'Heading1'))
+
+        for n in range(paragraphs):
+            dice = rnd.random()
+
+            if n and n % 25 == 0:
+                body.append(_paragraph(_run(_words(rnd, 4)), 'Heading2'))
+            elif dice < 0.02:
+                body.append(book.table())
+            elif dice < 0.04 and book.lists:
+                body.append(book.list_items(5))
+            elif dice < 0.05:
+                body.append(book.textbox())
+            elif dice < 0.06:
+                body.append(_paragraph('<m:oMathPara><m:oMath><m:r><m:t>x</m:t></m:r></m:oMath></m:oMathPara>'))
+            elif dice < 0.1:
+                body.append(book.text_paragraph('Quote'))
+            elif dice < 0.12:
+                body.append(_paragraph(_run(_words(rnd, 5), '<w:sz w:val="32"/><w:b/>'), ppr='<w:jc w:val="center"/>'))
+            else:
+                body.append(book.text_paragraph())
+
+        body.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:document {}><w:body>{}<w:sectPr/></w:body></w:document>').format(ROOT_NS, ''.join(body))
+
+
+def _styles(extra_styles=0):
+    styles = [
+        ('paragraph', 'Normal', 'Normal', None, '<w:rPr><w:sz w:val="24"/></w:rPr>', True),
+        ('paragraph', 'Title', 'Title', 'Normal', '<w:rPr><w:sz w:val="56"/><w:b/></w:rPr>', False),
+        ('paragraph', 'Heading1', 'heading 1', 'Normal', '<w:pPr><w:jc w:val="center"/></w:pPr><w:rPr><w:sz w:val="40"/></w:rPr>', False),
+        ('paragraph', 'Heading2', 'heading 2', 'Heading1', '<w:rPr><w:sz w:val="32"/><w:i/></w:rPr>', False),
+        ('paragraph', 'Quote', 'Quote', 'Normal', '<w:pPr><w:ind w:left="720" w:right="720"/></w:pPr><w:rPr><w:i/></w:rPr>', False),
+        ('paragraph', 'ListParagraph', 'List Paragraph', 'Normal', '<w:pPr><w:ind w:left="720"/></w:pPr>', False),
+        ('paragraph', 'TOCHeading', 'TOC Heading', 'Heading1', '', False),
+        ('paragraph', 'FootnoteText', 'footnote text', 'Normal', '<w:rPr><w:sz w:val="20"/></w:rPr>', False),
+        ('character', 'DefaultParagraphFont', 'Default Paragraph Font', None, '', True),
+        ('character', 'Emphasis', 'Emphasis', 'DefaultParagraphFont', '<w:rPr><w:i/><w:color w:val="333333"/></w:rPr>', False),
+        ('character', 'Hyperlink', 'Hyperlink', 'DefaultParagraphFont', '<w:rPr><w:u w:val="single"/><w:color w:val="0000FF"/></w:rPr>', False),
+        ('character', 'FootnoteReference', 'footnote reference', 'DefaultParagraphFont', '<w:rPr><w:vertAlign w:val="superscript"/></w:rPr>', False),
+        ('table', 'TableNormal', 'Normal Table', None, '', True),
+        ('table', 'TableGrid', 'Table Grid', 'TableNormal', '', False),
+        ('numbering', 'NoList', 'No List', None, '', True),
+    ]
+
+    for n in range(extra_styles):
+        based_on = 'Custom{}'.format(n - 1) if n % 10 else 'Normal'
+        styles.append(('paragraph', 'Custom{}'.format(n), 'custom {}'.format(n), based_on,
+                       '<w:rPr><w:sz w:val="{}"/></w:rPr>'.format(16 + (n % 20) * 2) if n % 3 == 0 else '', False))
+
+    content = []
+
+    for style_type, style_id, name, based_on, props, is_default in styles:
+        content.append('<w:style w:type="{}"{} w:styleId="{}"><w:name w:val="{}"/>{}{}</w:style>'.format(
+            style_type, ' w:default="1"' if is_default else '', style_id, name,
+            '<w:basedOn w:val="{}"/>'.format(based_on) if based_on else '', props))
+
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:styles {}><w:docDefaults><w:rPrDefault><w:rPr><w:sz w:val="22"/></w:rPr></w:rPrDefault>'
+            '</w:docDefaults>{}</w:styles>').format(ROOT_NS, ''.join(content))
+
+
+def _numbering():
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:numbering {0}>'
+            '<w:abstractNum w:abstractNumId="0"><w:lvl w:ilvl="0"><w:numFmt w:val="bullet"/></w:lvl>'
+            '<w:lvl w:ilvl="1"><w:numFmt w:val="bullet"/></w:lvl></w:abstractNum>'
+            '<w:abstractNum w:abstractNumId="1"><w:lvl w:ilvl="0"><w:numFmt w:val="decimal"/></w:lvl>'
+            '<w:lvl w:ilvl="1"><w:numFmt w:val="lowerLetter"/></w:lvl></w:abstractNum>'
+            '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+            '<w:num w:numId="2"><w:abstractNumId w:val="1"/></w:num>'
+            '</w:numbering>').format(ROOT_NS)
+
+
+def _notes(tag, notes):
+    content = ['<w:{0} w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:{0}>'.format(tag[:-1]),
+               '<w:{0} w:type="continuationSeparator" w:id="0"><w:p><w:r><w:continuationSeparator/></w:r></w:p></w:{0}>'.format(tag[:-1])]
+
+    for n, text in enumerate(notes):
+        content.append('<w:{0} w:id="{1}">{2}</w:{0}>'.format(tag[:-1], n + 1, _paragraph(_run(text), 'FootnoteText')))
+
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:{0} {1}>{2}</w:{0}>').format(tag, ROOT_NS, ''.join(content))
+
+
+def _comments(comments):
+    content = ['<w:comment w:id="{}" w:author="Author" w:date="2016-01-01T00:00:00Z">{}</w:comment>'.format(
+        n + 1, _paragraph(_run(text))) for n, text in enumerate(comments)]
+
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<w:comments {}>{}</w:comments>').format(ROOT_NS, ''.join(content))
+
+
+def _relationships(links):
+    rels = ['<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>',
+            '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/>']
+
+    for n, link in enumerate(links):
+        rels.append('<Relationship Id="rIdLink{}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink" '
+                    'Target="{}" TargetMode="External"/>'.format(n + 1, link))
+
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="{}">{}</Relationships>').format(PR_NS, ''.join(rels))
+
+
+def generate_document_xml(chapters=10, paragraphs=50, runs=8, split_runs=0, lists=False, seed=1):
+    "Returns content of the synthetic 'word/document.xml' as bytes."
+
+    book = _Book(seed, runs, split_runs, lists)
+
+    return _document(book, chapters, paragraphs).encode('utf-8')
+
+
+def generate_docx(file_name, chapters=10, paragraphs=50, runs=8, split_runs=0, extra_styles=0, lists=False,
+                  footnotes=0.03, seed=1):
+    """Generates synthetic .docx file.
+
+    :Args:
+      - file_name (str): Path to the new .docx file
+      - chapters (int): Number of chapters
+      - paragraphs (int): Number of paragraphs in each chapter
+      - runs (int): Number of runs in each paragraph
+      - split_runs (int): If bigger than 0 each run is split in this many runs with the same formatting
+      - extra_styles (int): Number of extra styles defined in the template
+      - lists (bool): Should we generate numbered and bulleted lists
+      - footnotes (float): Probability that run is followed by a footnote
+      - seed (int): Seed for random number generator
+
+    :Returns:
+      Returns name of the generated file.
+    """
+
+    book = _Book(seed, runs, split_runs, lists, footnotes)
+    document = _document(book, chapters, paragraphs)
+
+    with zipfile.ZipFile(file_name, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"/>')
+        zf.writestr('word/document.xml', document)
+        zf.writestr('word/styles.xml', _styles(extra_styles))
+        zf.writestr('word/numbering.xml', _numbering())
+        zf.writestr('word/footnotes.xml', _notes('footnotes', book.footnotes))
+        zf.writestr('word/endnotes.xml', _notes('endnotes', book.endnotes))
+        zf.writestr('word/comments.xml', _comments(book.comments))
+        zf.writestr('word/_rels/document.xml.rels', _relationships(book.links))
+
+    return file_name
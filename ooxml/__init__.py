@@ -37,11 +37,16 @@ NAMESPACES = {
     'dcterms':  'http://purl.org/dc/terms/'}
 
 
-def read_from_file(file_name):
+def read_from_file(file_name, engine='tree', lazy=False, workers=1, merge_runs=False, stats=None):
     """Parser OOXML file and returns parsed document.
     
     :Args:
       - file_name (str): Path to OOXML file
+      - engine (str): Engine used for parsing the document. Check :func:`ooxml.parse.parse_from_file`.
+      - lazy (bool): Parse comments, footnotes, endnotes, numbering and relationships on first access.
+      - workers (int): Number of threads used for reading and parsing parts of the document.
+      - merge_runs (bool): Merge adjacent runs with the same formatting into one text element.
+      - stats (:class:`ooxml.parse.ParseStats`): Object collecting timings and memory usage of the parsing.
 
     :Returns:
       Returns object of type :class:`ooxml.docx.DOCXFile`.
@@ -49,6 +54,24 @@ def read_from_file(file_name):
     from .docxfile import DOCXFile
 
     dfile = DOCXFile(file_name)
-    dfile.parse()
+    dfile.parse(engine=engine, lazy=lazy, workers=workers, merge_runs=merge_runs, stats=stats)
 
     return dfile
+
+
+def extract_text(file_name, separator=u'\n'):
+    """Returns text of the OOXML file.
+
+    Much faster than parsing the document and serializing it because document model is not built.
+    Check :func:`ooxml.text.extract_text`.
+
+    :Args:
+      - file_name (str): Path to OOXML file
+      - separator (str): String placed between the paragraphs
+
+    :Returns:
+      Returns text of the paragraphs separated with separator.
+    """
+    from .text import extract_text
+
+    return extract_text(file_name, separator=separator)
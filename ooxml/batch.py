@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+
+"""Convert many OOXML files at once using a pool of processes.
+
+.. code-block:: python
+
+    from ooxml import batch
+
+    for result in batch.convert(['first.docx', 'second.docx'], workers=4, timeout=300):
+        if result.stats['error']:
+            print(result.path, result.stats['error'])
+        else:
+            for title, content in result.chapters:
+                pass
+
+Results are returned as soon as the files are converted, not in the order they were given.
+Error in one of the files, even if it kills the worker process, does not stop the conversion
+of other files.
+
+It can also be used from the command line:
+
+.. code-block:: bash
+
+    $ python -m ooxml.batch --workers 4 --timeout 300 --output html/ manuscripts/
+
+.. moduleauthor:: Aleksandar Erkalovic <aerkalov@gmail.com>
+
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import collections
+import multiprocessing
+
+logger = logging.getLogger('ooxml')
+
+
+BatchResult = collections.namedtuple('BatchResult', ['path', 'chapters', 'css', 'stats'])
+
+
+class ConversionTimeout(Exception):
+    "Conversion of the file took too long."
+
+
+def _raise_timeout(signum, frame):
+    raise ConversionTimeout('Conversion took too long.')
+
+
+def convert_file(file_name, options=None, serialize_options=None, timeout=None):
+    """Converts one file into chapters.
+
+    Errors are not raised, they are returned in the stats. Timeout is implemented with SIGALRM
+    and it works only on Unix. It is checked between Python instructions, so very long calls
+    into lxml can run over it.
+
+    :Args:
+      - file_name (str): Path to OOXML file
+      - options (dict): Optional dictionary with :class:`ooxml.importer.ImporterContext` options
+      - serialize_options (dict): Optional dictionary with :class:`ooxml.serialize.Context` options
+      - timeout (float): Maximum number of seconds conversion can take
+
+    :Returns:
+      Returns object of type :class:`BatchResult`. Stats is a dictionary with keys "size", "time",
+      "elements", "chapters" and "error".
+    """
+
+    from . import read_from_file, serialize, importer
+
+    stats = {'size': 0, 'time': 0.0, 'elements': 0, 'chapters': 0, 'error': None}
+    chapters, css = None, None
+
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    start = time.time()
+
+    try:
+        stats['size'] = os.path.getsize(file_name)
+
+        dfile = read_from_file(file_name)
+
+        try:
+            stats['elements'] = len(dfile.document.elements)
+            chapters = importer.get_chapters(dfile.document, options=options, serialize_options=serialize_options)
+            css = serialize.serialize_styles(dfile.document, options=serialize_options)
+            stats['chapters'] = len(chapters)
+        finally:
+            dfile.close()
+    except Exception as e:
+        chapters, css = None, None
+        stats['error'] = '{}: {}'.format(type(e).__name__, e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+    stats['time'] = time.time() - start
+
+    return BatchResult(file_name, chapters, css, stats)
+
+
+def _failed(file_name, error, duration=0.0):
+    stats = {'size': 0, 'time': duration, 'elements': 0, 'chapters': 0, 'error': error}
+
+    return BatchResult(file_name, None, None, stats)
+
+
+class _TrackingContext(object):
+    """Multiprocessing context which remembers processes started by the pool.
+
+    Executor does not give us its worker processes, so we keep them here to be able to kill
+    workers which are stuck.
+    """
+
+    def __init__(self):
+        self._context = multiprocessing.get_context()
+        self.processes = []
+
+    def Process(self, *args, **kwargs):
+        process = self._context.Process(*args, **kwargs)
+        self.processes.append(process)
+
+        return process
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+def _create_pool(workers):
+    from concurrent.futures import ProcessPoolExecutor
+
+    context = _TrackingContext()
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context), context
+
+
+def _kill_pool(pool, context):
+    "Kills worker processes of the pool, even if they are stuck in the C code."
+
+    for process in context.processes:
+        if process.pid is not None and process.is_alive():
+            process.terminate()
+
+    pool.shutdown(wait=False)
+
+
+def convert(file_names, workers=None, timeout=None, max_pending=None, options=None, serialize_options=None):
+    """Converts files using a pool of processes.
+
+    Only a limited number of files is submitted to the pool at the same time, so the list of
+    files can also be a generator. If worker process dies, all the files it was working on at that
+    moment are converted again one by one. File which kills the worker again is returned with
+    an error. Any other error, for instance result which can not be sent from the worker, is
+    returned as an error of that file only. Every file is returned exactly once.
+
+    Timeout is also checked by this process. When conversion of a file runs longer than the timeout,
+    for instance because it is stuck inside of lxml, worker processes are killed and the pool is
+    created again. File is returned with an error and other files which were in the pool at that
+    moment are converted again. Time is measured from the moment file was submitted, so with
+    timeout no more files than workers are submitted to the pool at the same time.
+
+    Requires Python 3.7 or newer.
+
+    :Args:
+      - file_names (iterable): Paths to OOXML files
+      - workers (int): Number of processes. Number of CPUs by default.
+      - timeout (float): Maximum number of seconds conversion of one file can take
+      - max_pending (int): Maximum number of files submitted to the pool. Twice the number of workers by default.
+      - options (dict): Optional dictionary with :class:`ooxml.importer.ImporterContext` options
+      - serialize_options (dict): Optional dictionary with :class:`ooxml.serialize.Context` options
+
+    :Returns:
+      Yields objects of type :class:`BatchResult` as soon as files are converted.
+    """
+
+    from concurrent.futures import wait, FIRST_COMPLETED
+    from concurrent.futures.process import BrokenProcessPool
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    if max_pending is None:
+        max_pending = workers * 2
+
+    if timeout:
+        # Files waiting in the queue of the pool would run out of time before they start
+        max_pending = min(max_pending, workers)
+
+    file_names = iter(file_names)
+    # Files which were in the pool when it was killed because of the timeout
+    retry = collections.deque()
+    # Files which were in the pool when it broke
+    suspects = collections.deque()
+    running = {}
+    started = {}
+    # File converted alone to find out if it is killing the worker
+    isolated = None
+
+    def _submit(file_name):
+        future = pool.submit(convert_file, file_name, options, serialize_options, timeout)
+        running[future] = file_name
+        started[future] = time.time()
+
+    pool, context = _create_pool(workers)
+
+    try:
+        while True:
+            if suspects or isolated is not None:
+                # Suspects are converted one at a time, this way we know which one of them is
+                # killing the worker.
+                if not running and suspects:
+                    isolated = suspects.popleft()
+                    _submit(isolated)
+            else:
+                while len(running) < max_pending:
+                    file_name = retry.popleft() if retry else next(file_names, None)
+
+                    if file_name is None:
+                        break
+
+                    _submit(file_name)
+
+            if not running:
+                break
+
+            wait_timeout = None
+
+            if timeout:
+                now = time.time()
+                wait_timeout = max(min(started[future] + timeout - now for future in running), 0)
+
+            done, _ = wait(list(running), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            is_broken = False
+
+            for future in done:
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    is_broken = True
+                    continue
+                except Exception as e:
+                    result = _failed(running[future], '{}: {}'.format(type(e).__name__, e))
+
+                del running[future]
+                del started[future]
+                yield result
+
+            if timeout and not is_broken:
+                now = time.time()
+                expired = [future for future in running if now - started[future] >= timeout]
+
+                if expired:
+                    # Worker stuck in the C code can not be stopped in any other way
+                    _kill_pool(pool, context)
+                    pool, context = _create_pool(workers)
+
+                    timed_out = [running.pop(future) for future in expired]
+
+                    # Other files were killed together with the workers
+                    retry.extendleft(reversed(list(running.values())))
+                    running.clear()
+                    started.clear()
+
+                    for file_name in timed_out:
+                        logger.warning('Conversion of %s took too long.', file_name)
+                        yield _failed(file_name, 'ConversionTimeout: Conversion took too long.', timeout)
+
+            if is_broken:
+                # All the files which were still in the pool are lost
+                lost = list(running.values())
+                running.clear()
+                started.clear()
+
+                _kill_pool(pool, context)
+                pool, context = _create_pool(workers)
+
+                if isolated in lost:
+                    logger.warning('Worker process crashed while converting %s.', isolated)
+                    yield _failed(isolated, 'Worker process crashed.')
+
+                    lost.remove(isolated)
+
+                suspects.extend(lost)
+
+            if not running:
+                isolated = None
+    finally:
+        pool.shutdown(wait=False)
+
+
+def find_files(paths):
+    """Returns paths to all OOXML files.
+
+    Directories are searched recursively for files with the .docx extension.
+
+    :Args:
+      - paths (list): List of files and directories
+
+    :Returns:
+      Yields paths to the files.
+    """
+
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+
+            for name in sorted(files):
+                if name.lower().endswith('.docx') and not name.startswith('~$'):
+                    yield os.path.join(root, name)
+
+
+def write_result(result, output_dir):
+    """Writes converted chapters and styles to the directory.
+
+    Every file gets its own directory with files chapter-001.html, chapter-002.html... and style.css.
+
+    :Args:
+      - result (:class:`BatchResult`): Converted file
+      - output_dir (str): Path to the output directory
+    """
+
+    name = os.path.splitext(os.path.basename(result.path))[0]
+    path = os.path.join(output_dir, name)
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    for n, (title, content) in enumerate(result.chapters):
+        with open(os.path.join(path, 'chapter-{:03d}.html'.format(n + 1)), 'wb') as f:
+            f.write(content)
+
+    with open(os.path.join(path, 'style.css'), 'wb') as f:
+        f.write(result.css.encode('utf-8'))
+
+
+def main(args=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m ooxml.batch', description='Convert OOXML files to HTML chapters.')
+    parser.add_argument('paths', nargs='+', help='files or directories with .docx files')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('-t', '--timeout', type=float, default=None, help='maximum number of seconds per file')
+    parser.add_argument('-p', '--max-pending', type=int, default=None, help='maximum number of files in the pool')
+    parser.add_argument('-o', '--output', default=None, help='directory where converted files are written')
+
+    args = parser.parse_args(args)
+
+    failed = 0
+    start = time.time()
+
+    for result in convert(find_files(args.paths), workers=args.workers, timeout=args.timeout, max_pending=args.max_pending):
+        stats = result.stats
+
+        if stats['error']:
+            failed += 1
+            print('FAIL {}: {}'.format(result.path, stats['error']))
+            continue
+
+        if args.output:
+            write_result(result, args.output)
+
+        print('OK   {}: {} chapters, {} elements, {:.2f}s'.format(result.path, stats['chapters'], stats['elements'], stats['time']))
+
+    print('Done in {:.2f}s, {} failed.'.format(time.time() - start, failed))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
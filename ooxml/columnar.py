@@ -0,0 +1,517 @@
+# -*- coding: utf-8 -*-
+
+"""Columnar representation of the document content.
+
+Object model in :class:`ooxml.doc.Document` is convenient for conversion, but it is too heavy when
+we only want statistics for a large number of documents. :class:`ColumnarDocument` is built
+directly from 'document.xml' and keeps the content in parallel arrays. Text of all the runs is
+joined in one string and runs only keep offsets into it.
+
+.. code-block:: python
+
+    from ooxml.columnar import ColumnarDocument
+
+    cdoc = ColumnarDocument.from_file('document.docx')
+
+    print(cdoc.font_size_usage())
+    print(cdoc.possible_headers())
+
+If NumPy is installed statistics are calculated with vectorized operations. Without it the same
+values are calculated in pure Python.
+
+.. moduleauthor:: Aleksandar Erkalovic <aerkalov@gmail.com>
+
+"""
+
+import array
+import collections
+import logging
+
+import six
+from lxml import etree
+
+from . import doc, parse
+from .names import (A_BLIP, MC_ALTERNATE_CONTENT, M_O_MATH, M_O_MATH_PARA, R_EMBED, R_ID, W_BODY, W_BR, W_CHAR,
+                    W_COMMENT_RANGE_END, W_COMMENT_RANGE_START, W_COMMENT_REFERENCE, W_DRAWING, W_DROP_CAP,
+                    W_ENDNOTE_REFERENCE, W_FOOTNOTE_REFERENCE, W_FRAME_PR, W_HYPERLINK, W_ID, W_NUM_ID, W_NUM_PR, W_P,
+                    W_P_PR, W_P_STYLE, W_R, W_R_PR, W_R_STYLE, W_SDT, W_SMART_TAG, W_SYM, W_SZ, W_T, W_TBL, W_TBL_PR,
+                    W_TBL_STYLE, W_TC, W_TC_PR, W_TR, W_TXBX_CONTENT, W_TYPE, W_VAL, W_VERT_ALIGN, W_V_MERGE)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+logger = logging.getLogger('ooxml')
+
+# Kinds of the runs. They match elements of the object model.
+TEXT = 0
+BREAK = 1
+SYMBOL = 2
+FOOTNOTE = 3
+ENDNOTE = 4
+COMMENT = 5
+IMAGE = 6
+MATH = 7
+
+# Run flags
+RUN_FLAGS = {
+    'rtl': 1,
+    'b': 2,
+    'i': 4,
+    'u': 8,
+    'strike': 16,
+    'small_caps': 32,
+    'superscript': 64,
+    'subscript': 128
+}
+
+# Paragraph flags
+IN_TABLE = 1
+IN_TEXTBOX = 2
+LIST = 4
+DROPCAP = 8
+
+
+def _column():
+    return array.array('i')
+
+
+def _as_numpy(column):
+    return numpy.frombuffer(column, dtype=column.typecode) if len(column) else numpy.zeros(0, dtype='i')
+
+
+class ColumnarDocument(object):
+    """Document content stored in parallel arrays.
+
+    Every run is one entry in the run columns. Runs are text elements, breaks, symbols, notes,
+    comments, images and math, in the same order as they are in the object model. Paragraphs
+    inside of tables and text boxes are stored together with top level paragraphs.
+
+    :Attributes:
+      - text (str): Text of all the runs
+      - styles (list): Interned style identifiers. Index 0 is reserved for no style.
+      - run_kind (array): Kind of the run
+      - run_paragraph (array): Index of the paragraph run belongs to
+      - run_start (array): Offset of the run value in the text
+      - run_end (array): End of the run value in the text
+      - run_size (array): Font size in half points. -1 if it is not defined for the run.
+      - run_flags (array): Formatting flags from :data:`RUN_FLAGS`
+      - run_style (array): Index of the character style
+      - run_weight (array): Length of the stripped run value. -1 if run has no value.
+      - paragraph_style (array): Index of the paragraph style. Paragraphs without a style inherit
+        style of the table or the paragraph holding the text box.
+      - paragraph_parent (array): Index of the paragraph holding the text box. -1 if none.
+      - paragraph_element (array): Index of the top level element in the document
+      - paragraph_flags (array): Paragraph flags
+      - document (:class:`ooxml.doc.Document`): Document without content holding styles and the
+        list of used styles
+    """
+
+    def __init__(self):
+        self._text = []
+        self._length = 0
+        self._style_index = {None: 0}
+
+        self.styles = [None]
+
+        self.run_kind = _column()
+        self.run_paragraph = _column()
+        self.run_start = _column()
+        self.run_end = _column()
+        self.run_size = _column()
+        self.run_flags = _column()
+        self.run_style = _column()
+        self.run_weight = _column()
+
+        self.paragraph_style = _column()
+        self.paragraph_parent = _column()
+        self.paragraph_element = _column()
+        self.paragraph_flags = _column()
+
+        self.elements = 0
+        self.document = doc.Document()
+
+    @property
+    def text(self):
+        if len(self._text) > 1:
+            self._text = [u''.join(self._text)]
+
+        return self._text[0] if self._text else u''
+
+    def __len__(self):
+        return len(self.run_kind)
+
+    def intern_style(self, style_id):
+        "Returns index of the style identifier."
+
+        idx = self._style_index.get(style_id, None)
+
+        if idx is None:
+            idx = self._style_index[style_id] = len(self.styles)
+            self.styles.append(style_id)
+
+        return idx
+
+    def add_run(self, kind, paragraph, value):
+        "Adds new run and returns its index."
+
+        if value:
+            self._text.append(value)
+            weight = len(value.strip())
+        else:
+            value = u''
+            weight = -1
+
+        self.run_kind.append(kind)
+        self.run_paragraph.append(paragraph)
+        self.run_start.append(self._length)
+        self._length += len(value)
+        self.run_end.append(self._length)
+        self.run_size.append(-1)
+        self.run_flags.append(0)
+        self.run_style.append(0)
+        self.run_weight.append(weight)
+
+        return len(self.run_kind) - 1
+
+    def add_paragraph(self, parent, flags):
+        "Adds new paragraph and returns its index."
+
+        self.paragraph_style.append(0)
+        self.paragraph_parent.append(parent)
+        self.paragraph_element.append(self.elements)
+        self.paragraph_flags.append(flags)
+
+        return len(self.paragraph_style) - 1
+
+    def run_text(self, idx):
+        "Returns text of the run."
+
+        return self.text[self.run_start[idx]:self.run_end[idx]]
+
+    def paragraph_text(self, idx):
+        "Returns text of all the text runs in the paragraph, without text of the text boxes."
+
+        text = self.text
+
+        return u''.join(text[self.run_start[n]:self.run_end[n]] for n in six.moves.range(len(self))
+                        if self.run_paragraph[n] == idx and self.run_kind[n] == TEXT)
+
+    def _style_font_sizes(self):
+        """Returns font size in half points for every interned style.
+
+        Text without a style uses default paragraph style or default run properties.
+        """
+
+        styles = self.document.styles
+        sizes = _column()
+
+        for style_id in self.styles:
+            if style_id is None:
+                st = styles.get_by_id(None, 'paragraph') if 'paragraph' in styles.default_styles else None
+                size = _half_points(styles, st.style_id) if st else -1
+
+                if size == -1 and self.document.default_style:
+                    size = int(self.document.default_style.rpr.get('sz', -1))
+            else:
+                size = _half_points(styles, style_id)
+
+            sizes.append(size)
+
+        return sizes
+
+    def font_size_usage(self):
+        """Returns amount of text using each font size.
+
+        Result is the same as usage_font_size calculated by :func:`ooxml.importer.calculate_weights`
+        for the document.
+
+        :Returns:
+          Returns :class:`collections.Counter` with font sizes as keys.
+        """
+
+        style_sizes = self._style_font_sizes()
+        usage = collections.Counter()
+
+        if numpy is not None:
+            run_size = _as_numpy(self.run_size)
+            paragraph_sizes = _as_numpy(style_sizes)[_as_numpy(self.paragraph_style)]
+            sizes = numpy.where(run_size != -1, run_size, paragraph_sizes[_as_numpy(self.run_paragraph)])
+            weights = _as_numpy(self.run_weight)
+
+            used = (weights != -1) & (sizes != -1)
+            keys, first, inverse = numpy.unique(sizes[used], return_index=True, return_inverse=True)
+            amounts = numpy.bincount(inverse.ravel(), weights=weights[used], minlength=len(keys))
+
+            # Keep the order in which font sizes appear in the document
+            for n in numpy.argsort(first, kind='stable'):
+                usage[int(keys[n]) / 2] = int(amounts[n])
+        else:
+            for n in six.moves.range(len(self)):
+                weight = self.run_weight[n]
+
+                if weight == -1:
+                    continue
+
+                size = self.run_size[n]
+
+                if size == -1:
+                    size = style_sizes[self.paragraph_style[self.run_paragraph[n]]]
+
+                if size != -1:
+                    usage[size / 2] += weight
+
+        return usage
+
+    def possible_headers(self):
+        """Returns font sizes which could be used for headers.
+
+        Result is the same as calculated by the importer for the document.
+
+        :Returns:
+          Returns the same tuple as :func:`ooxml.doc.find_possible_headers`.
+        """
+
+        styles = self.document.styles
+        sizes = []
+
+        for name in self.document.used_styles:
+            resolved = styles.resolve(name)
+            sizes.append(resolved.font_size if resolved else -1)
+
+        return doc.find_possible_headers(sizes, self.font_size_usage())
+
+    @classmethod
+    def from_file(cls, file_name):
+        """Builds columnar document from OOXML file.
+
+        Styles, footnotes, endnotes and comments are parsed into :attr:`document` because styles
+        used in them are needed for possible headers.
+
+        :Args:
+          - file_name (str): Path to OOXML file
+
+        :Returns:
+          Returns object of type :class:`ColumnarDocument`.
+        """
+        from .docxfile import DOCXFile
+
+        dfile = DOCXFile(file_name)
+
+        try:
+            with dfile.open_file('document.xml') as stream:
+                cdoc = build_columnar(stream)
+
+            parse._parse_part(cdoc.document, dfile, 'styles.xml', 'styles', parse.parse_style)
+
+            for part in ['comments', 'footnotes', 'endnotes']:
+                for file_name, description, parse_func, args in dict(parse.DOCUMENT_PARTS)[part]:
+                    parse._parse_part(cdoc.document, dfile, file_name, description, parse_func, args)
+        finally:
+            dfile.close()
+
+        return cdoc
+
+
+def _half_points(styles, style_id):
+    "Returns font size of the style in half points or -1."
+
+    resolved = styles.resolve(style_id)
+
+    if resolved is None:
+        return -1
+
+    for st in resolved.chain:
+        if 'sz' in st.rpr:
+            return int(st.rpr['sz'])
+
+    return -1
+
+
+def _run_properties(cdoc, runs, prop):
+    "Applies run properties to the text runs."
+
+    size = -1
+    flags = 0
+    style = 0
+
+    for elem in prop:
+        tag = elem.tag
+
+        if tag in parse.RUN_TOGGLES:
+            if parse.is_on(elem.attrib.get(W_VAL, 'on')):
+                flags |= RUN_FLAGS[parse.RUN_TOGGLES[tag]]
+        elif tag == W_R_STYLE:
+            style = cdoc.intern_style(elem.attrib[W_VAL])
+            cdoc.document.add_style_as_used(elem.attrib[W_VAL])
+        elif tag == W_SZ:
+            size = int(elem.attrib[W_VAL])
+        elif tag == W_VERT_ALIGN:
+            value = elem.attrib[W_VAL]
+
+            if value == 'superscript':
+                flags |= RUN_FLAGS['superscript']
+
+            if value == 'subscript':
+                flags |= RUN_FLAGS['subscript']
+
+    for n in runs:
+        cdoc.run_size[n] = size
+        cdoc.run_flags[n] = flags
+        cdoc.run_style[n] = style
+
+
+def _build_run(cdoc, paragraph, element):
+    texts = []
+    rpr = None
+
+    for elem in element:
+        tag = elem.tag
+
+        if tag == W_T:
+            texts.append(cdoc.add_run(TEXT, paragraph, elem.text))
+        elif tag == W_R_PR:
+            rpr = elem
+        elif tag == W_R:
+            _build_run(cdoc, paragraph, elem)
+        elif tag == W_BR:
+            cdoc.add_run(BREAK, paragraph, elem.attrib.get(W_TYPE, 'textWrapping'))
+        elif tag == W_SYM:
+            character = elem.attrib[W_CHAR]
+            cdoc.add_run(SYMBOL, paragraph, doc.Symbol.SYMBOLS.get(character, character))
+        elif tag == W_FOOTNOTE_REFERENCE:
+            cdoc.add_run(FOOTNOTE, paragraph, elem.attrib[W_ID])
+        elif tag == W_ENDNOTE_REFERENCE:
+            cdoc.add_run(ENDNOTE, paragraph, elem.attrib[W_ID])
+        elif tag == W_COMMENT_REFERENCE:
+            cdoc.add_run(COMMENT, paragraph, elem.attrib[W_ID])
+        elif tag == W_DRAWING:
+            blip = next(elem.iterdescendants(A_BLIP), None)
+
+            if blip is not None:
+                cdoc.add_run(IMAGE, paragraph, blip.attrib[R_EMBED])
+        elif tag == MC_ALTERNATE_CONTENT:
+            txtbx = elem.find('.//' + W_TXBX_CONTENT)
+
+            if txtbx is not None:
+                for el in txtbx:
+                    if el.tag == W_P:
+                        _build_paragraph(cdoc, el, paragraph, IN_TEXTBOX)
+
+    if rpr is not None and len(texts) > 0:
+        _run_properties(cdoc, texts, rpr)
+
+
+def _build_smarttag(cdoc, paragraph, tag_elem):
+    for elem in tag_elem:
+        if elem.tag == W_R:
+            _build_run(cdoc, paragraph, elem)
+
+        if elem.tag == W_SMART_TAG:
+            _build_smarttag(cdoc, paragraph, elem)
+
+
+def _build_paragraph(cdoc, par, parent=-1, flags=0):
+    idx = cdoc.add_paragraph(parent, flags)
+
+    for elem in par:
+        tag = elem.tag
+
+        if tag == W_P_PR:
+            for el in elem:
+                if el.tag == W_P_STYLE:
+                    cdoc.paragraph_style[idx] = cdoc.intern_style(el.attrib[W_VAL])
+                    cdoc.document.add_style_as_used(el.attrib[W_VAL])
+                elif el.tag == W_NUM_PR:
+                    if el.find(W_NUM_ID) is not None:
+                        cdoc.paragraph_flags[idx] |= LIST
+                elif el.tag == W_FRAME_PR:
+                    if el.attrib.get(W_DROP_CAP, '').lower() in ['drop', 'margin']:
+                        cdoc.paragraph_flags[idx] |= DROPCAP
+                elif el.tag == W_R_PR:
+                    style = el.find(W_R_STYLE)
+
+                    if style is not None:
+                        cdoc.document.add_style_as_used(style.attrib[W_VAL])
+        elif tag == W_R:
+            _build_run(cdoc, idx, elem)
+        elif tag == M_O_MATH or tag == M_O_MATH_PARA:
+            cdoc.add_run(MATH, idx, None)
+        elif tag == W_COMMENT_RANGE_START or tag == W_COMMENT_RANGE_END:
+            cdoc.add_run(COMMENT, idx, elem.attrib[W_ID])
+        elif tag == W_HYPERLINK:
+            if R_ID in elem.attrib:
+                _build_run(cdoc, idx, elem)
+        elif tag == W_SMART_TAG:
+            _build_smarttag(cdoc, idx, elem)
+
+    return idx
+
+
+def _build_table(cdoc, tbl):
+    style = 0
+    tbl_pr = tbl.find(W_TBL_PR)
+
+    if tbl_pr is not None:
+        tbl_style = tbl_pr.find(W_TBL_STYLE)
+
+        if tbl_style is not None:
+            style = cdoc.intern_style(tbl_style.attrib[W_VAL])
+            cdoc.document.add_style_as_used(tbl_style.attrib[W_VAL])
+
+    for tr in tbl.iterchildren(W_TR):
+        for tc in tr.iterchildren(W_TC):
+            vmerge = tc.find('{}/{}'.format(W_TC_PR, W_V_MERGE))
+
+            # Merged cells are not in the document model
+            if vmerge is not None and W_VAL not in vmerge.attrib:
+                continue
+
+            for p in tc.iterchildren(W_P):
+                idx = _build_paragraph(cdoc, p, flags=IN_TABLE)
+
+                if cdoc.paragraph_style[idx] == 0:
+                    cdoc.paragraph_style[idx] = style
+
+
+def build_columnar(source):
+    """Builds columnar document from 'document.xml'.
+
+    Document is parsed incrementally, the same way as :func:`ooxml.parse.iterparse_document`
+    does it.
+
+    :Args:
+      - source: File name or file like object with content of the 'document.xml'
+
+    :Returns:
+      Returns object of type :class:`ColumnarDocument`. Styles are not parsed.
+    """
+
+    cdoc = ColumnarDocument()
+
+    for _, elem in etree.iterparse(source, events=('end', ), tag=(W_P, W_TBL, W_SDT)):
+        body = elem.getparent()
+
+        if body is None or body.tag != W_BODY:
+            continue
+
+        if elem.tag == W_P:
+            _build_paragraph(cdoc, elem)
+        elif elem.tag == W_TBL:
+            _build_table(cdoc, elem)
+
+        cdoc.elements += 1
+
+        elem.clear()
+
+        while elem.getprevious() is not None:
+            del body[0]
+
+    # Paragraphs in text boxes without their own style inherit style of the outer paragraph
+    for idx, parent in enumerate(cdoc.paragraph_parent):
+        if parent != -1 and cdoc.paragraph_style[idx] == 0:
+            cdoc.paragraph_style[idx] = cdoc.paragraph_style[parent]
+
+    return cdoc
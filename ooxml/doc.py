@@ -7,9 +7,45 @@
 """
 
 import six
+import logging
 import collections
 
 
+logger = logging.getLogger('ooxml')
+
+
+class Properties(dict):
+    """Immutable dictionary holding parsed run or paragraph properties.
+
+    Most of the runs in a document share only a handful of different formattings. Parser is
+    interning properties using :meth:`Document.intern_properties` so all the elements with the
+    same formatting reference the same object. Because of that properties can not be changed. If
+    you need to change them create new properties and assign them to the element.
+
+    .. code-block:: python
+
+        elem.rpr = Properties(dict(elem.rpr, b=True))
+
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('Properties can not be changed.')
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return (Properties, (dict(self), ))
+
+    def __repr__(self):
+        return 'Properties({})'.format(dict.__repr__(self))
+
+
 class Style(object):
     """Style object represent OOXML defined style.
 
@@ -44,6 +80,102 @@ class Style(object):
         return -1
 
 
+class ResolvedStyle(object):
+    """Style with all the values inherited from the styles it is based on.
+
+    :Attributes:
+      - style (:class:`Style`): Resolved style
+      - chain (list): Style and all the styles it is based on, starting with the style itself
+      - style_ids (list): Identifiers of the styles in the chain, starting with the top parent
+      - font_size (int): Font size defined by the style or by it's parents. -1 if it is not defined.
+      - rpr (:class:`Properties`): Run properties merged from all the styles in the chain
+      - ppr (:class:`Properties`): Paragraph properties merged from all the styles in the chain
+    """
+
+    def __init__(self, style, chain):
+        self.style = style
+        self.chain = chain
+        self.style_ids = [st.style_id for st in reversed(chain)]
+        self.font_size = -1
+
+        for st in chain:
+            font_size = st.get_font_size()
+
+            if font_size != -1:
+                self.font_size = font_size
+                break
+
+        rpr, ppr = {}, {}
+
+        for st in reversed(chain):
+            rpr.update(st.rpr)
+            ppr.update(st.ppr)
+
+        self.rpr = Properties(rpr)
+        self.ppr = Properties(ppr)
+
+
+def resolve_style(styles, style):
+    """Resolves style by following the styles it is based on.
+
+    Chain stops when parent style does not exist or when style is based on itself through
+    other styles.
+
+    :Args:
+      - styles (:class:`StylesCollection`): Defined styles
+      - style (:class:`Style`): Style to resolve
+
+    :Returns:
+      Returns object of type :class:`ResolvedStyle`.
+    """
+
+    chain = [style]
+    seen = set([style.style_id])
+
+    while style.based_on:
+        if style.based_on in seen:
+            logger.warning('Style %s is based on itself.', style.based_on)
+            break
+
+        style = styles.styles.get(style.based_on, None)
+
+        if not style:
+            break
+
+        chain.append(style)
+        seen.add(style.style_id)
+
+    return ResolvedStyle(chain[0], chain)
+
+
+class StylesDict(dict):
+    """Dictionary of styles which counts its changes.
+
+    :class:`StylesCollection` caches styles by name and resolved styles. Version is increased
+    every time dictionary is changed so the collection knows when to rebuild its caches.
+    """
+
+    version = 0
+
+    def _changed(method):
+        def _wrapper(self, *args, **kwargs):
+            self.version += 1
+            return method(self, *args, **kwargs)
+
+        _wrapper.__name__ = method.__name__
+        return _wrapper
+
+    __setitem__ = _changed(dict.__setitem__)
+    __delitem__ = _changed(dict.__delitem__)
+    clear = _changed(dict.clear)
+    pop = _changed(dict.pop)
+    popitem = _changed(dict.popitem)
+    setdefault = _changed(dict.setdefault)
+    update = _changed(dict.update)
+
+    del _changed
+
+
 class StylesCollection:
     """Collection of defined styles.
 
@@ -52,113 +184,325 @@ class StylesCollection:
     def __init__(self):
         self.reset()
 
+    def add(self, style):
+        """Adds style to the collection.
+
+        Style with the same identifier is replaced.
+
+        :Args:
+          - style (:class:`ooxml.doc.Style`): Style to add
+        """
+
+        self.styles[style.style_id] = style
+
+    def _check_version(self):
+        # Styles can also be changed directly in the dictionary so caches are cleared when it changes
+        if self._version != self.styles.version:
+            self._names = None
+            self._resolved = {}
+            self._version = self.styles.version
+
+    def _get_names(self):
+        self._check_version()
+
+        if self._names is None:
+            self._names = {}
+
+            for st in self.styles.values():
+                if st:
+                    self._names.setdefault(st.name, st)
+
+        return self._names
+
+    def resolve(self, style_id):
+        """Returns style with all the values inherited from the styles it is based on.
+
+        Styles are resolved only once. Use :meth:`resolve_all` to resolve all of them after
+        styles have been parsed.
+
+        :Args:
+          - style_id (str): Unique identifier of the style
+
+        :Returns:
+          Returns object of type :class:`ResolvedStyle` or None if style does not exist.
+        """
+
+        self._check_version()
+
+        resolved = self._resolved.get(style_id, None)
+
+        if resolved is None:
+            style = self.styles.get(style_id, None)
+
+            if not style:
+                return None
+
+            resolved = self._resolved[style_id] = resolve_style(self, style)
+
+        return resolved
+
+    def resolve_all(self):
+        "Resolves all the defined styles."
+
+        self._resolved = {}
+
+        for style_id in self.styles:
+            self.resolve(style_id)
+
     def get_by_name(self, name, style_type = None):
         """Find style by it's descriptive name.
 
+        If style is not found and style type is given, default style for that type is returned.
+
         :Returns:
           Returns found style of type :class:`ooxml.doc.Style`.
         """
-        for st in self.styles.values():
-            if st:
-                if st.name == name:
-                    return st
+        st = self._get_names().get(name, None)
 
         if style_type and not st:
-            st = self.styles.get(self.default_styles[style_type], None)            
+            st = self.styles.get(self.default_styles[style_type], None)
         return st
 
     def get_by_id(self, style_id, style_type = None):
         """Find style by it's unique identifier
 
+        If style is not found and style type is given, default style for that type is returned.
+
         :Returns:
           Returns found style of type :class:`ooxml.doc.Style`.
         """
 
-        for st in self.styles.values():
-            if st:
-                if st.style_id == style_id:
-                    return st
+        st = self.styles.get(style_id, None)
+
+        if st:
+            return st
 
         if style_type:
             return self.styles.get(self.default_styles[style_type], None)
         return None
     
     def reset(self):
-        self.styles = {}
+        self.styles = StylesDict()
         self.default_styles = {}
+        self._names = None
+        self._version = 0
+        self._resolved = {}
+
+
+def _lazy_part(name, part):
+    """Returns property for the attribute holding content of a document part.
+
+    If loader for the part was registered with :meth:`Document.add_part_loader`, part is parsed
+    on first access to the attribute.
+    """
+
+    attr_name = '_' + name
+
+    def _get(self):
+        loader = self._part_loaders.pop(part, None)
+
+        if loader is not None:
+            loader(self)
+
+        return getattr(self, attr_name)
+
+    def _set(self, value):
+        setattr(self, attr_name, value)
+
+    return property(_get, _set)
+
+
+def _all_parts(name):
+    """Returns property for the attribute which is also filled when the parts are parsed.
+
+    All the parts which have not been parsed yet are parsed before the attribute is returned, so
+    the value is the same as when the parts are not parsed on demand.
+    """
+
+    attr_name = '_' + name
+
+    def _get(self):
+        if self._part_loaders:
+            self.load_parts()
+
+        return getattr(self, attr_name)
+
+    def _set(self, value):
+        setattr(self, attr_name, value)
+
+    return property(_get, _set)
+
+
+def find_possible_headers(style_font_sizes, usage_font_size):
+    """Finds font sizes which could be used for headers.
+
+    Font sizes used by less than 10% of the text are possible headers, unless they are smaller
+    than the biggest font size used for normal text.
+
+    :Args:
+      - style_font_sizes (list): Font sizes of the used styles. -1 if style has no font size.
+      - usage_font_size (dict): Amount of text using each font size
+
+    :Returns:
+      Returns tuple with possible header font sizes from styles, possible header font sizes,
+      font sizes used for normal text and the most used font size (None if no text was found).
+    """
+
+    _headers = []
+    _text = []
+    max_count = sum(six.itervalues(usage_font_size))
+
+    for font_size in style_font_sizes:
+        if font_size != -1 and font_size not in _headers:
+            _headers.append(font_size)
+
+    possible_headers_style = [x for x in reversed(sorted(_headers))]
+
+    _text_list = collections.Counter()
+
+    for font_size, amount in six.iteritems(usage_font_size):
+        if float(amount) / max_count <= 0.1:                
+            if font_size not in _headers:
+                _headers.append(font_size)
+        else:
+            # This will require some cleanup
+            _text.append(font_size)
+            _text_list[font_size] = amount
+
+    possible_headers = [x for x in reversed(sorted(_headers))]
+    possible_text = [x for x in reversed(sorted(_text))]
+
+    # remove all possible headers which are bigger than biggest normal font size
+    if len(possible_text) > 0:
+        for value in possible_headers[:]:
+            if possible_text[0] >= value:
+                possible_headers.remove(value)
+#            possible_headers_style.remove(value)
+
+    _mc = _text_list.most_common(1)
+
+    if len(_mc) > 0:
+        return possible_headers_style, possible_headers, possible_text, _mc[0][0]
+
+    return possible_headers_style, possible_headers, possible_text, None
 
 
 class Document(object):
-    "Represents OOXML document."
+    """Represents OOXML document.
+
+    Comments, footnotes, endnotes, numbering and relationships can be parsed on demand. In that
+    case they are parsed on first access to the attribute. Styles and font sizes used in them are
+    also part of :attr:`used_styles` and :attr:`used_font_size`, so all the parts are parsed on
+    first access to these two attributes.
+    """
+
+    relationships = _lazy_part('relationships', 'relationships')
+    footnotes = _lazy_part('footnotes', 'footnotes')
+    endnotes = _lazy_part('endnotes', 'endnotes')
+    comments = _lazy_part('comments', 'comments')
+    numbering = _lazy_part('numbering', 'numbering')
+    abstruct_numbering = _lazy_part('abstruct_numbering', 'numbering')
+    used_styles = _all_parts('used_styles')
+    used_font_size = _all_parts('used_font_size')
 
     def __init__(self):
         super(Document, self).__init__()
 
         self.reset()
 
+    def add_part_loader(self, part, loader):
+        """Register function which will parse part of the document on first access.
+
+        :Args:
+          - part (str): Name of the part. One of "relationships", "footnotes", "endnotes", "comments" or "numbering".
+          - loader (function): Function which accepts document as argument
+        """
+
+        self._part_loaders[part] = loader
+
+    def load_parts(self):
+        "Parse all the parts of the document which have not been parsed yet."
+
+        for part in list(self._part_loaders):
+            loader = self._part_loaders.pop(part, None)
+
+            if loader is not None:
+                loader(self)
+
     def add_style_as_used(self, name):
-        if name not in self.used_styles:
-            self.used_styles.append(name)
+        # Called by the parsers, so private attribute is used to not parse all the parts
+        if name not in self._used_styles:
+            self._used_styles.append(name)
+
+    def intern_properties(self, values):
+        """Returns shared immutable properties with the same content.
+
+        :Args:
+          - values (dict): Parsed properties
+
+        :Returns:
+          Returns object of type :class:`Properties`.
+        """
+
+        props = Properties(values)
+
+        return self.properties.setdefault(props, props)
 
     def add_font_as_used(self, sz):
         fsz = int(sz) / 2
-        self.used_font_size[fsz] += 1
+        self._used_font_size[fsz] += 1
 
     def get_styles(self, name):
-        styles = []
-        while True:                     
-            style = self.styles.get_by_id(name)
+        """Returns style and all the styles it is based on.
 
-            styles.append(style)
+        :Returns:
+          List of style objects, starting with the style itself. Empty list if style does not exist.
+        """
+        resolved = self.styles.resolve(name)
 
-            if style.based_on == '':
-                return styles
+        if resolved is None:
+            return []
 
-            name = style.based_on
+        return list(resolved.chain)
 
-    def _calculate_possible_headers(self):
-        _headers = []
-        _text = []
-        max_count = sum(six.itervalues(self.usage_font_size))
+    def invalidate_weights(self):
+        """Clears cached weights and text lengths of the elements.
 
-        from .serialize import _get_font_size
+        Usage of font sizes is cleared too because it is calculated together with the weights.
+        """
 
-        for name in self.used_styles:
-            _style = self.styles.get_by_id(name)
-            font_size = _get_font_size(self, _style)
+        self.weights = {}
+        self.text_lengths = {}
+        self.usage_font_size = collections.Counter()
 
-            if font_size != -1 and font_size not in _headers:
-                _headers.append(font_size)
+    def __getstate__(self):
+        # Loaders can not be pickled so all the parts are parsed before that
+        self.load_parts()
 
-        self.possible_headers_style = [x for x in reversed(sorted(_headers))]
+        state = dict(self.__dict__)
 
-        _text_list = collections.Counter()
+        # Cached values are indexed by ids of the elements and they are not valid in another process
+        state['weights'] = {}
+        state['text_lengths'] = {}
 
-        for font_size, amount in six.iteritems(self.usage_font_size):
-            if float(amount) / max_count <= 0.1:                
-                if font_size not in _headers:
-                    _headers.append(font_size)
-            else:
-                # This will require some cleanup
-                _text.append(font_size)
-                _text_list[font_size] = amount
+        return state
 
-        self.possible_headers = [x for x in reversed(sorted(_headers))]
-        self.possible_text = [x for x in reversed(sorted(_text))]
+    def _calculate_possible_headers(self):
+        from .serialize import _get_font_size
 
-        # remove all possible headers which are bigger than biggest normal font size
-        if len(self.possible_text) > 0:
-            for value in self.possible_headers[:]:
-                if self.possible_text[0] >= value:
-                    self.possible_headers.remove(value)
-#                    self.possible_headers_style.remove(value)
+        style_font_sizes = [_get_font_size(self, self.styles.get_by_id(name)) for name in self.used_styles]
 
-        _mc = _text_list.most_common(1)
+        headers_style, headers, text, base_font_size = find_possible_headers(style_font_sizes, self.usage_font_size)
 
-        if len(_mc) > 0:
-            self.base_font_size = _mc[0][0]
+        self.possible_headers_style = headers_style
+        self.possible_headers = headers
+        self.possible_text = text
+
+        if base_font_size is not None:
+            self.base_font_size = base_font_size
 
     def reset(self):
+        self._part_loaders = {}
         self.elements = []
         self.relationships = {'document': {}, 'endnotes': {}, 'footnotes': {}}
         self.footnotes = {}
@@ -170,13 +514,19 @@ class Document(object):
         self.default_style = None
         self.used_styles = []
         self.used_font_size = collections.Counter()
+        self.properties = {}
 
         self.usage_font_size = collections.Counter()
+        self.weights = {}
+        self.text_lengths = {}
         self.possible_headers_style = []
         self.possible_headers = []
         self.possible_text = []
         self.base_font_size = -1
 
+        self.merge_runs = False
+        self.merged_runs = 0
+
 
 class CommentContent:
     def __init__(self, cid):
@@ -187,8 +537,18 @@ class CommentContent:
         self.author = None
 
 
+# Shared properties for the elements which do not have them
+EMPTY_PROPERTIES = Properties()
+
+
 class Element(object):
-    "Basic element paresed in the OOXML document."
+    """Basic element paresed in the OOXML document.
+
+    Documents can have millions of elements so all the elements define __slots__ and they don't
+    have instance dictionary. Elements without properties share :data:`EMPTY_PROPERTIES`.
+    """
+
+    __slots__ = ()
 
     def reset(self):
         pass
@@ -203,6 +563,10 @@ class Paragraph(Element):
     Paragraph can also hold other elements. Besides that, list items and dropcaps are also defined by
     this element.
     """
+
+    # style_id is set only when paragraph has a style
+    __slots__ = ('elements', 'numid', 'ilvl', 'rpr', 'ppr', 'possible_header', 'style_id', 'document')
+
     def __init__(self):
         super(Paragraph, self).__init__()
 
@@ -216,10 +580,11 @@ class Paragraph(Element):
         self.numid = None
         self.ilvl = None
 
-        self.rpr = {}
-        self.ppr = {}
+        self.rpr = EMPTY_PROPERTIES
+        self.ppr = EMPTY_PROPERTIES
 
         self.possible_header = False
+        self.document = None
 
     def is_dropcap(self):
         return 'dropcap' in self.ppr and self.ppr['dropcap']
@@ -228,12 +593,16 @@ class Paragraph(Element):
 class Text(Element):
     "Represents Text element which can be found inside of other Paragraph elements."
 
+    __slots__ = ('text', 'rpr', 'parent')
+
+    # Text never has paragraph properties
+    ppr = EMPTY_PROPERTIES
+
     def __init__(self, text='', parent=None):
         super(Text, self).__init__()
 
         self.text = text
-        self.rpr = {}
-        self.ppr = {}
+        self.rpr = EMPTY_PROPERTIES
         self.parent = None
 
 
@@ -244,13 +613,15 @@ class Text(Element):
 class Link(Element):
     "Represents link element holding reference to internal or external link."
 
+    __slots__ = ('elements', 'rid', 'rpr', 'ppr')
+
     def __init__(self, rid):
         super(Link, self).__init__()
 
         self.elements = []
         self.rid = rid
-        self.rpr = {}
-        self.ppr = {}
+        self.rpr = EMPTY_PROPERTIES
+        self.ppr = EMPTY_PROPERTIES
 
 
     def value(self):
@@ -261,6 +632,8 @@ class Link(Element):
 class Image(Element):
     "Represent image element."
 
+    __slots__ = ('rid', )
+
     def __init__(self, rid):
         super(Image, self).__init__()
 
@@ -273,6 +646,8 @@ class Image(Element):
 class TableCell(Element):
     "Represent one cell in a table."
 
+    __slots__ = ('grid_span', 'row_span', 'vmerge', 'elements')
+
     def __init__(self):
         super(TableCell, self).__init__()
 
@@ -289,6 +664,9 @@ class TableCell(Element):
 class Table(Element):
     "Represents table element."
 
+    # style_id is set only when table has a style
+    __slots__ = ('rows', 'style_id')
+
     def __init__(self):
         super(Table, self).__init__()
 
@@ -301,6 +679,8 @@ class Table(Element):
 class Comment(Element):
     "Represents comment element."
 
+    __slots__ = ('cid', 'comment_type')
+
     def __init__(self, cid, comment_type):
         super(Comment, self).__init__()
 
@@ -314,6 +694,8 @@ class Comment(Element):
 class Footnote(Element):
     "Represents footnote element."
 
+    __slots__ = ('rid', )
+
     def __init__(self, rid):
         super(Footnote, self).__init__()
 
@@ -326,6 +708,8 @@ class Footnote(Element):
 class Endnote(Element):
     "Represents endnote element."
 
+    __slots__ = ('rid', )
+
     def __init__(self, rid):
         super(Endnote, self).__init__()
 
@@ -338,6 +722,8 @@ class Endnote(Element):
 class TextBox(Element):
     "Represents TextBox element."
 
+    __slots__ = ('elements', )
+
     def __init__(self, elements):
         super(TextBox, self).__init__()
 
@@ -353,6 +739,8 @@ class Symbol(Element):
     For some symbols it can do transformation into unicode element.
     """
 
+    __slots__ = ('font', 'character')
+
     SYMBOLS = {
         'F020': u'\u0020',
         'F021': u'\u270F',        
@@ -455,7 +843,8 @@ class TOC(Element):
     """Represents Table Of Contents element.
 
     We don't do much with this element at the moment."""    
-    pass
+
+    __slots__ = ()
 
 
 class Break(Element):
@@ -464,6 +853,8 @@ class Break(Element):
     At the moment we support Line Break (textWrapping) and Page Break (page).
     """
 
+    __slots__ = ('break_type', )
+
     def __init__(self, break_type='textWrapping'):
         self.break_type = break_type
 
@@ -476,6 +867,8 @@ class Math(Element):
 
     Math elements are not supported at the moment. We just parse them and create empty element."""
 
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -486,6 +879,8 @@ class Math(Element):
 class SmartTag(Element):
     "Represents SmartTag element."
 
+    __slots__ = ('elements', 'element')
+
     def __init__(self):
         self.elements = []
         self.element = ''
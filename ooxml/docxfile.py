@@ -42,8 +42,14 @@ class DOCXFile(object):
         self.zf = zipfile.ZipFile(self.file_name, 'r')
         self._doc = None
 
-    def parse(self):
-        self._doc = parse_from_file(self)
+    def parse(self, engine='tree', lazy=False, workers=1, merge_runs=False, stats=None):
+        self._doc = parse_from_file(self, engine=engine, lazy=lazy, workers=workers, merge_runs=merge_runs,
+                                    stats=stats)
+
+    def open_file(self, file_name):
+        "Returns file like object for reading file from the archive."
+
+        return self.zf.open('word/{}'.format(file_name))
 
     def read_file(self, file_name):
         return self.zf.open('word/{}'.format(file_name)).read()
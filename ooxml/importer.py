@@ -6,10 +6,13 @@
 
 """
 
+import sys
 import six
 import collections
 import logging
 
+from lxml import etree
+
 from .doc import (Paragraph, Table, TableCell, Link, TextBox, TOC, Break)
 from .serialize import _get_font_size
 
@@ -18,15 +21,27 @@ logger = logging.getLogger('ooxml')
 POSSIBLE_HEADER_SIZE = 24
 
 
-def text_length(elem):
+def text_length(elem, doc=None):
     """Returns length of the content in this element.
 
-    Return value is not correct but it is **good enough***.
+    Return value is not correct but it is **good enough***. If document is given, length is
+    cached in it.
     """
 
     if not elem:
         return 0
 
+    if doc is not None:
+        cached = doc.text_lengths.get(id(elem), None)
+
+        if cached is not None:
+            return cached[1]
+
+        value = text_length(elem)
+        doc.text_lengths[id(elem)] = (elem, value)
+
+        return value
+
     value = elem.value()
 
     try:
@@ -52,7 +67,30 @@ def parse_html_string(s):
     return html_tree
 
 
-def _calculate(doc, elem, style_id):
+def _count_font_size(doc, elem, style_id, length):
+    if hasattr(elem, 'rpr') and 'sz' in elem.rpr:
+        font_size = int(elem.rpr['sz'])/2
+        doc.usage_font_size[font_size] += length
+    elif style_id is not None:
+        resolved = doc.styles.resolve(style_id)
+        font_size = resolved.font_size if resolved else -1
+
+        if font_size != -1:
+            doc.usage_font_size[font_size] += length
+    else:
+        st = doc.styles.get_by_id(style_id, 'paragraph')
+        font_size = doc.styles.resolve(st.style_id).font_size
+
+        if font_size != -1:
+            doc.usage_font_size[font_size] += length
+        else:
+            if doc.default_style:
+                if 'sz' in doc.default_style.rpr:
+                    font_size = int(doc.default_style.rpr['sz'])/2
+                    doc.usage_font_size[font_size] += length
+
+
+def _calculate(doc, elem, style_id, count_sizes):
     weight = 0
     value = elem.value()
 
@@ -61,59 +99,68 @@ def _calculate(doc, elem, style_id):
 
     if value:
         if type(value) in [type(u' '), type(' ')]:
-            weight += len(value.strip())
-
-            if hasattr(elem, 'rpr') and 'sz' in elem.rpr:
-                font_size = int(elem.rpr['sz'])/2
-                doc.usage_font_size[font_size] += weight
-            elif style_id is not None:
-                font_size = -1
-                # should check all styles
-                for style in doc.get_styles(style_id):
-                    if 'sz' in style.rpr:
-                        font_size = int(style.rpr['sz'])/2
-                        break
+            length = len(value.strip())
+            weight += length
 
-                if font_size != -1:
-                    doc.usage_font_size[font_size] += weight
-            else:
-                st = doc.styles.get_by_id(style_id, 'paragraph')
-                font_size = -1
-
-                for style in doc.get_styles(st.style_id):
-                    if 'sz' in style.rpr:
-                        font_size = int(style.rpr['sz'])/2
-                        break
-
-                if font_size != -1:
-                    doc.usage_font_size[font_size] += weight
-                else:
-                    if doc.default_style:
-                        if 'sz' in doc.default_style.rpr:
-                            font_size = int(doc.default_style.rpr['sz'])/2
-                            doc.usage_font_size[font_size] += weight
+            if count_sizes:
+                _count_font_size(doc, elem, style_id, length)
 
         if isinstance(elem, Table):
             for column in value:
                 for cell in column:
-                    weight += _calculate(doc, cell, style_id)
+                    weight += _calculate(doc, cell, style_id, count_sizes)
 
+        # Value of these elements are their elements, font sizes are counted only once below
         if isinstance(elem, TableCell) or isinstance(elem, Link) or isinstance(elem, TextBox):
             for el in value:
-                weight += _calculate(doc, el, style_id)
+                weight += _calculate(doc, el, style_id, False)
 
     if hasattr(elem, 'elements'):
         for e in elem.elements:
-            weight += _calculate(doc, e, style_id)
+            weight += _calculate(doc, e, style_id, count_sizes)
 
     return weight
 
 
 def calculate_weight(doc, elem):
-    weight = _calculate(doc, elem, None)
-    # TODO
-    # - update global list of font sizes
-    return weight
+    """Returns weight of the element.
+
+    Weights of the top level elements are calculated by :func:`calculate_weights` and cached in
+    the document. Weights of other elements, or of all the elements before that, are calculated
+    every time. It does not change usage of font sizes in the document.
+
+    :Args:
+      - doc (:class:`ooxml.doc.Document`): Document object
+      - elem (:class:`ooxml.doc.Element`): Element
+
+    :Returns:
+      Weight as integer.
+    """
+
+    cached = doc.weights.get(id(elem), None)
+
+    if cached is not None:
+        return cached[1]
+
+    return _calculate(doc, elem, None, False)
+
+
+def calculate_weights(doc):
+    """Calculates weights of all the top level elements in the document.
+
+    Weights are calculated only once and usage of font sizes in the document is updated at the
+    same time. Use :meth:`ooxml.doc.Document.invalidate_weights` if elements were changed after this.
+
+    :Args:
+      - doc (:class:`ooxml.doc.Document`): Document object
+    """
+
+    if doc.weights:
+        return
+
+    for elem in doc.elements:
+        # Element is kept in the cache so its id can not be reused by another element
+        doc.weights[id(elem)] = (elem, _calculate(doc, elem, None, True))
 
 
 def is_header(doc, name):
@@ -334,7 +381,7 @@ def mark_styles(ctx, doc, elements):
             if ctx.options['header_as_text']:
                 if hasattr(elem, 'rpr') and 'sz' in elem.rpr:
 
-                    t_length = text_length(elem)
+                    t_length = text_length(elem, doc)
 
                     if  t_length < ctx.options['header_as_text_length'] and t_length >= ctx.options['header_as_text_length_minimum']:
                         markers.append({'name': '', 'weight': weight, 'index': pos, 'font_size': int(elem.rpr['sz']) / 2})
@@ -344,7 +391,7 @@ def mark_styles(ctx, doc, elements):
             if ctx.options['header_as_bold_centered']:
                 if not_using_styles:
                     if hasattr(elem, 'rpr') and ('jc' in elem.ppr or 'b' in elem.rpr or 'i' in elem.rpr):
-                        if text_length(elem) < 30:
+                        if text_length(elem, doc) < 30:
 
                             elements[pos].possible_header = True
 
@@ -358,7 +405,7 @@ def mark_styles(ctx, doc, elements):
                     # TODO
                     # check if this is empty element
                     if hasattr(e, 'rpr') and 'sz' in e.rpr:
-                        t_length = text_length(elem)
+                        t_length = text_length(elem, doc)
                         if  t_length < ctx.options['header_as_text_length'] and t_length >= ctx.options['header_as_text_length_minimum']: 
                             fnt_size = int(e.rpr['sz'])/2
 
@@ -373,6 +420,7 @@ def mark_styles(ctx, doc, elements):
 
 
 def split_document(ctx, doc): 
+    calculate_weights(doc)
     markers = mark_styles(ctx, doc, doc.elements)
     doc._calculate_possible_headers()
 
@@ -401,70 +449,217 @@ def split_document(ctx, doc):
     return important
 
 
-def get_chapters(doc, options=None, serialize_options=None):
-    from lxml import etree
+# Elements created by the serializers and elements they can hold without HTML parser
+# changing the structure of the chapter
+_INLINE_TAGS = frozenset(['span', 'b', 'i', 'u', 's', 'strike', 'em', 'strong', 'small', 'big', 'sup', 'sub', 'a', 'br', 'img'])
+_BLOCK_TAGS = frozenset(['div', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'ul', 'ol'])
+_VOID_TAGS = frozenset(['br', 'img'])
+
+_HTML_CHILDREN = {
+    'div': _INLINE_TAGS | _BLOCK_TAGS,
+    'td': _INLINE_TAGS | _BLOCK_TAGS,
+    'li': _INLINE_TAGS | _BLOCK_TAGS,
+    'table': frozenset(['tr']),
+    'tr': frozenset(['td']),
+    'ul': frozenset(['li']),
+    'ol': frozenset(['li']),
+    'a': _INLINE_TAGS - frozenset(['a']),
+    # Text boxes are inside of paragraphs, parser closes the paragraph before them
+    'p': _INLINE_TAGS | frozenset(['div'])
+}
+
+for _tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6'] + list(_INLINE_TAGS - frozenset(['a'])):
+    _HTML_CHILDREN[_tag] = _INLINE_TAGS
+
+
+def _indent_html(elem, level, pretty_print, empty):
+    """Adds whitespace to the tree the same way pretty printing does.
+
+    Elements with empty text or tail are added to the list. Returns False if the tree has
+    elements which HTML parser would move around.
+    """
+
+    allowed = _HTML_CHILDREN.get(elem.tag, None)
+
+    if allowed is None:
+        return False
+
+    is_mixed = elem.text is not None
+    in_paragraph = elem.tag == 'p'
+    has_div = False
+
+    if elem.text == '':
+        empty.append(elem)
+
+    for child in elem:
+        if child.tag not in allowed:
+            return False
+
+        if in_paragraph:
+            # Only text boxes at the end of the paragraph are moved out of it
+            if child.tag == 'div':
+                has_div = True
+            elif has_div:
+                return False
+
+            if has_div and child.tail and child.tail.strip():
+                return False
+
+        if child.tail is not None:
+            is_mixed = True
+
+            if child.tail == '':
+                empty.append(child)
+
+        if child.tag in _VOID_TAGS and (child.text is not None or len(child) > 0):
+            return False
+
+    if len(elem) == 0:
+        return True
+
+    # lxml does not add whitespace to elements with text inside of them
+    pretty_print = pretty_print and not is_mixed
+
+    for child in elem:
+        if not _indent_html(child, level + 1, pretty_print, empty):
+            return False
+
+    if pretty_print:
+        elem.text = '\n' + '  ' * (level + 1)
+
+        for child in elem:
+            child.tail = elem.text
+
+        child.tail = '\n' + '  ' * level
+
+    return True
+
+
+def _close_paragraphs(root):
+    "Moves text boxes and everything after them out of the paragraph."
+
+    for div in list(root.iterfind('.//p/div')):
+        par = div.getparent()
+
+        # Already moved together with the text box before it
+        if par.tag != 'p':
+            continue
+
+        parent = par.getparent()
+        moved = par[par.index(div):]
+        tail = par.tail
+        par.tail = None
+
+        idx = parent.index(par)
+
+        for n, child in enumerate(moved):
+            parent.insert(idx + n + 1, child)
+
+        if tail is not None:
+            moved[-1].tail = (moved[-1].tail or '') + tail
+
+
+def _html_body(root, pretty_print):
+    """Returns body of the chapter from the serialized elements.
+
+    Chapter used to be serialized, parsed again with HTML parser and serialized once more. Whitespace
+    from the first serialization stays in the parsed tree, so it is added to the tree here and the
+    rest of the changes done by the parser are repeated. Returns None if the parser would change
+    the tree in other ways.
+    """
+
+    empty = []
+
+    # Parser puts text outside of the elements into paragraphs
+    if len(root) == 0 or root.text is not None or any(child.tail is not None for child in root):
+        return None
+
+    if not _indent_html(root, 0, pretty_print, empty):
+        return None
+
+    # Parser drops empty text and whitespace at the beginning of the body
+    for elem in empty:
+        if elem.text == '':
+            elem.text = None
+
+        if elem.tail == '':
+            elem.tail = None
+
+    _close_paragraphs(root)
+
+    root.text = None
+    root.tag = 'body'
+
+    return root
+
+
+def _serialize_chapter(doc, idx, els, is_frontmatter, serialize_options):
     from . import serialize
 
-    context = ImporterContext(options)
+    ctx = serialize.Context(doc, serialize_options)
+    root = serialize.build_elements(ctx, doc, els)
+    pretty_print = ctx.options.get('pretty_print', True)
 
-    def _serialize_chapter(idx, els, is_frontmatter):
-        s =  serialize.serialize_elements(doc, els, options=serialize_options)
+    if len(root) == 0 and root.text is None:
+        return ('', six.b('<body></body>'))
 
-        if s.startswith(six.b('<div/>')):
-            return ('', six.b('<body></body>'))
+    body = _html_body(root, pretty_print)
 
-        root = parse_html_string(s[5:-6])
-        body = root.find('.//body')
-        chapter_title = ''
+    if body is None:
+        s = etree.tostring(root, pretty_print=pretty_print, encoding="utf-8", xml_declaration=False)
 
-        if not is_frontmatter:
-            if body[0].tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']: 
-                need_classes = True if body[0].tag == 'h1' else False
+        # Strip the root element. Pretty printed content ends with a new line after it.
+        body = parse_html_string(s.rstrip()[len('<div>'):-len('</div>')]).find('.//body')
 
-                body[0].tag = 'h1'
-                # get text content of first header
-                chapter_title = body[0].text_content().strip()
-                # clears it up and set new content
-                # this is when we have different html tags in the header
-                # this also clears attributes
+    chapter_title = ''
 
-                _style = body[0].attrib.get('style', None)
-                _class = body[0].attrib.get('class', None)
+    if not is_frontmatter:
+        if body[0].tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']: 
+            need_classes = True if body[0].tag == 'h1' else False
 
-                body[0].clear()
+            body[0].tag = 'h1'
+            # get text content of first header
+            chapter_title = ''.join(body[0].itertext()).strip()
+            # clears it up and set new content
+            # this is when we have different html tags in the header
+            # this also clears attributes
 
-                body[0].text = chapter_title
+            _style = body[0].attrib.get('style', None)
+            _class = body[0].attrib.get('class', None)
 
-                if need_classes:
-                    if _style:
-                        body[0].set('style', _style)
+            body[0].clear()
 
-                    if _class:
-                        body[0].set('class', _class)
-            else:
-                if idx > 0:  
-                    title =  etree.Element('h1')
+            body[0].text = chapter_title
 
-                    title.text = 'Unknown'
-                    chapter_title = ''
-                    body.insert(0, title)
+            if need_classes:
+                if _style:
+                    body[0].set('style', _style)
+
+                if _class:
+                    body[0].set('class', _class)
         else:
-            h1_headers = body.find('.//h1')
-            if h1_headers is not None:
-                for h1 in h1_headers:
-                    h1.tag = 'h2'
+            if idx > 0:  
+                title =  etree.Element('h1')
 
-        return (chapter_title, etree.tostring(body, pretty_print=True, encoding="utf-8", xml_declaration=False))
+                title.text = 'Unknown'
+                chapter_title = ''
+                body.insert(0, title)
+    else:
+        h1_headers = body.find('.//h1')
+        if h1_headers is not None:
+            for h1 in h1_headers:
+                h1.tag = 'h2'
 
-    chapters = split_document(context, doc)
+    return (chapter_title, etree.tostring(body, pretty_print=True, encoding="utf-8", xml_declaration=False))
 
-    if context.options.get('scale_font_size', False):
-        if doc.base_font_size != -1:
-            serialize_options['scale_to_size'] = doc.base_font_size
-        elif len(doc.possible_text) > 0:
-            serialize_options['scale_to_size'] = doc.possible_text[-1]
 
-    export_chapters = []
+def _chapter_ranges(doc, chapters):
+    """Returns position of every chapter in the list of document elements.
+
+    :Returns:
+      Yields tuples (idx, start, end, is_frontmatter).
+    """
+
     idx = 0
 
     if chapters:
@@ -472,8 +667,7 @@ def get_chapters(doc, options=None, serialize_options=None):
         if len(chapters) > 0:
             if chapters[0]['index'] != 0:
                 # The idea is that front matter should not have a chapter title
-                chap = _serialize_chapter(idx, doc.elements[:chapters[0]['index']-1], True)
-                export_chapters.append((u'', chap[1]))
+                yield (idx, 0, chapters[0]['index']-1, True)
                 idx += 1
 
             if len(chapters) > 1 and chapters[0]['index'] == chapters[1]['index']:
@@ -481,17 +675,115 @@ def get_chapters(doc, options=None, serialize_options=None):
 
         for n in range(len(chapters)-1):
             if chapters[n]['index'] == chapters[n+1]['index']-1:
-                _html = _serialize_chapter(idx, [doc.elements[chapters[n]['index']]], False)
+                yield (idx, chapters[n]['index'], chapters[n]['index']+1, False)
             else:
-                _html = _serialize_chapter(idx, doc.elements[chapters[n]['index']:chapters[n+1]['index']], False)
+                yield (idx, chapters[n]['index'], chapters[n+1]['index'], False)
                 # BOD HAS THIS COMMENTED
-                #_html = _serialize_chapter(idx, doc.elements[chapters[n]['index']:chapters[n+1]['index']-1], False)
+                #yield (idx, chapters[n]['index'], chapters[n+1]['index']-1, False)
             idx += 1
 
-            export_chapters.append(_html)
+        yield (idx, chapters[-1]['index'], len(doc.elements), False)
+    else:
+        yield (idx, 0, len(doc.elements), False)
+
+
+# Document and options used by the worker processes
+_worker_document = None
+_worker_options = None
+
+
+def _init_worker(doc, serialize_options):
+    global _worker_document, _worker_options
+
+    _worker_document = doc
+    _worker_options = serialize_options
+
+
+def _serialize_chapter_in_worker(idx, start, end, is_frontmatter):
+    return _serialize_chapter(_worker_document, idx, _worker_document.elements[start:end], is_frontmatter, _worker_options)
 
-        export_chapters.append(_serialize_chapter(idx, doc.elements[chapters[-1]['index']:], False))
+
+def _iter_chapters_in_pool(doc, ranges, serialize_options, workers):
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = collections.deque()
+
+    # Document is sent to every worker only once, chapters are then sent as a range of elements
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(doc, serialize_options)) as executor:
+        for chapter_range in ranges:
+            pending.append(executor.submit(_serialize_chapter_in_worker, *chapter_range))
+
+            # Limit number of serialized chapters waiting to be returned
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_chapters(doc, options=None, serialize_options=None, workers=1):
+    """Splits the document into chapters and serializes them one by one.
+
+    Chapters are returned as soon as they are serialized, so only one of them has to be
+    kept in memory.
+
+    .. code-block:: python
+
+        for title, content in importer.iter_chapters(dfile.document):
+            zf.writestr(..., content)
+
+    With more than one worker chapters are serialized concurrently in a pool of processes and
+    returned in the same order. Every worker gets its own copy of the document so hooks and
+    serializers in serialize_options must be picklable, for instance functions defined on
+    the module level. Footnotes and endnotes are numbered from 1 in every chapter in both cases.
+    More than one worker requires Python 3.7 or newer, older versions raise RuntimeError.
+
+    :Args:
+      - doc (:class:`ooxml.doc.Document`): Document object
+      - options (dict): Optional dictionary with :class:`ImporterContext` options
+      - serialize_options (dict): Optional dictionary with :class:`ooxml.serialize.Context` options
+      - workers (int): Number of processes used for serialization. 1 by default.
+
+    :Returns:
+      Yields tuples (title, content) where content is HTML of the chapter in bytes.
+    """
+
+    if workers > 1 and sys.version_info < (3, 7):
+        # Pool of processes can not send the document to the workers only once
+        raise RuntimeError('Serializing chapters with more than one worker requires Python 3.7 or newer.')
+
+    context = ImporterContext(options)
+
+    chapters = split_document(context, doc)
+
+    if context.options.get('scale_font_size', False):
+        if doc.base_font_size != -1:
+            serialize_options['scale_to_size'] = doc.base_font_size
+        elif len(doc.possible_text) > 0:
+            serialize_options['scale_to_size'] = doc.possible_text[-1]
+
+    ranges = list(_chapter_ranges(doc, chapters))
+
+    if workers > 1 and len(ranges) > 1:
+        serialized = _iter_chapters_in_pool(doc, ranges, serialize_options, workers)
     else:
-        export_chapters.append(_serialize_chapter(idx, doc.elements, False))
+        serialized = (_serialize_chapter(doc, idx, doc.elements[start:end], is_frontmatter, serialize_options)
+                      for idx, start, end, is_frontmatter in ranges)
+
+    for (_, _, _, is_frontmatter), chapter in six.moves.zip(ranges, serialized):
+        if is_frontmatter:
+            chapter = (u'', chapter[1])
+
+        yield chapter
+
+
+def get_chapters(doc, options=None, serialize_options=None, workers=1):
+    """Splits the document into chapters.
+
+    Same as :func:`iter_chapters` but returns all the chapters in a list.
+
+    :Returns:
+      List of tuples (title, content).
+    """
 
-    return export_chapters
+    return list(iter_chapters(doc, options=options, serialize_options=serialize_options, workers=workers))
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""Qualified names of OOXML elements and attributes.
+
+Names are built only once, when the module is imported. Parsers should use these constants
+instead of formatting names for every element they check.
+
+.. code-block:: python
+
+    from ooxml.names import W_P
+
+    if elem.tag == W_P:
+        pass
+
+Constant name is made of namespace prefix and local name converted to upper case. For instance
+**w:footnoteReference** is available as :data:`W_FOOTNOTE_REFERENCE`.
+
+.. moduleauthor:: Aleksandar Erkalovic <aerkalov@gmail.com>
+
+"""
+
+from . import NAMESPACES
+
+
+def qname(prefix, name):
+    """Returns qualified name for the element or attribute.
+
+    >>> qname('w', 'rStyle')
+    '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}rStyle'
+    """
+    return '{{{}}}{}'.format(NAMESPACES[prefix], name)
+
+
+# Document
+
+W_BODY = qname('w', 'body')
+W_P = qname('w', 'p')
+W_R = qname('w', 'r')
+W_T = qname('w', 't')
+W_BR = qname('w', 'br')
+W_SYM = qname('w', 'sym')
+W_TBL = qname('w', 'tbl')
+W_TR = qname('w', 'tr')
+W_TC = qname('w', 'tc')
+W_SDT = qname('w', 'sdt')
+W_HYPERLINK = qname('w', 'hyperlink')
+W_SMART_TAG = qname('w', 'smartTag')
+W_DRAWING = qname('w', 'drawing')
+W_TXBX_CONTENT = qname('w', 'txbxContent')
+W_FOOTNOTE_REFERENCE = qname('w', 'footnoteReference')
+W_ENDNOTE_REFERENCE = qname('w', 'endnoteReference')
+W_COMMENT_REFERENCE = qname('w', 'commentReference')
+W_COMMENT_RANGE_START = qname('w', 'commentRangeStart')
+W_COMMENT_RANGE_END = qname('w', 'commentRangeEnd')
+
+M_O_MATH = qname('m', 'oMath')
+M_O_MATH_PARA = qname('m', 'oMathPara')
+
+MC_ALTERNATE_CONTENT = qname('mc', 'AlternateContent')
+MC_FALLBACK = qname('mc', 'Fallback')
+
+A_BLIP = qname('a', 'blip')
+
+# Properties
+
+W_P_PR = qname('w', 'pPr')
+W_R_PR = qname('w', 'rPr')
+W_P_STYLE = qname('w', 'pStyle')
+W_R_STYLE = qname('w', 'rStyle')
+W_NUM_PR = qname('w', 'numPr')
+W_ILVL = qname('w', 'ilvl')
+W_NUM_ID = qname('w', 'numId')
+W_JC = qname('w', 'jc')
+W_IND = qname('w', 'ind')
+W_FRAME_PR = qname('w', 'framePr')
+W_COLOR = qname('w', 'color')
+W_RTL = qname('w', 'rtl')
+W_SZ = qname('w', 'sz')
+W_B = qname('w', 'b')
+W_I = qname('w', 'i')
+W_U = qname('w', 'u')
+W_STRIKE = qname('w', 'strike')
+W_VERT_ALIGN = qname('w', 'vertAlign')
+W_SMALL_CAPS = qname('w', 'smallCaps')
+
+W_TBL_PR = qname('w', 'tblPr')
+W_TBL_STYLE = qname('w', 'tblStyle')
+W_TC_PR = qname('w', 'tcPr')
+W_GRID_SPAN = qname('w', 'gridSpan')
+W_V_MERGE = qname('w', 'vMerge')
+
+# Styles
+
+W_STYLE = qname('w', 'style')
+W_NAME = qname('w', 'name')
+W_BASED_ON = qname('w', 'basedOn')
+W_R_PR_DEFAULT = qname('w', 'rPrDefault')
+
+# Comments, footnotes and endnotes
+
+W_COMMENT = qname('w', 'comment')
+W_FOOTNOTE = qname('w', 'footnote')
+W_ENDNOTE = qname('w', 'endnote')
+
+# Numbering
+
+W_ABSTRACT_NUM = qname('w', 'abstractNum')
+W_LVL = qname('w', 'lvl')
+W_NUM = qname('w', 'num')
+W_NUM_FMT = qname('w', 'numFmt')
+
+# Relationships
+
+PR_RELATIONSHIP = qname('pr', 'Relationship')
+
+# Attributes
+
+W_VAL = qname('w', 'val')
+W_ID = qname('w', 'id')
+W_TYPE = qname('w', 'type')
+W_LEFT = qname('w', 'left')
+W_RIGHT = qname('w', 'right')
+W_FIRST_LINE = qname('w', 'firstLine')
+W_DROP_CAP = qname('w', 'dropCap')
+W_FONT = qname('w', 'font')
+W_CHAR = qname('w', 'char')
+W_ELEMENT = qname('w', 'element')
+W_AUTHOR = qname('w', 'author')
+W_DATE = qname('w', 'date')
+W_STYLE_ID = qname('w', 'styleId')
+W_DEFAULT = qname('w', 'default')
+W_ABSTRACT_NUM_ID = qname('w', 'abstractNumId')
+
+R_ID = qname('r', 'id')
+R_EMBED = qname('r', 'embed')
@@ -6,11 +6,30 @@
 
 """
 
+import timeit
 import logging
+import contextlib
+import collections
 
+import six
 from lxml import etree
 
 from . import doc, NAMESPACES
+from .names import (A_BLIP, MC_ALTERNATE_CONTENT, M_O_MATH, M_O_MATH_PARA, PR_RELATIONSHIP, R_EMBED, R_ID,
+                    W_ABSTRACT_NUM, W_ABSTRACT_NUM_ID, W_AUTHOR, W_B, W_BASED_ON, W_BODY, W_BR, W_CHAR, W_COLOR,
+                    W_COMMENT, W_COMMENT_RANGE_END, W_COMMENT_RANGE_START, W_COMMENT_REFERENCE, W_DATE, W_DEFAULT,
+                    W_DRAWING, W_DROP_CAP, W_ELEMENT, W_ENDNOTE, W_ENDNOTE_REFERENCE, W_FIRST_LINE, W_FONT, W_FOOTNOTE,
+                    W_FOOTNOTE_REFERENCE, W_FRAME_PR, W_GRID_SPAN, W_HYPERLINK, W_I, W_ID, W_ILVL, W_IND, W_JC, W_LEFT,
+                    W_LVL, W_NAME, W_NUM, W_NUM_FMT, W_NUM_ID, W_NUM_PR, W_P, W_P_PR, W_P_STYLE, W_R, W_RIGHT, W_RTL,
+                    W_R_PR, W_R_PR_DEFAULT, W_R_STYLE, W_SDT, W_SMALL_CAPS, W_SMART_TAG, W_STRIKE, W_STYLE, W_STYLE_ID,
+                    W_SYM, W_SZ, W_T, W_TBL, W_TBL_PR, W_TBL_STYLE, W_TC, W_TC_PR, W_TR, W_TXBX_CONTENT, W_TYPE, W_U,
+                    W_VAL, W_VERT_ALIGN, W_V_MERGE)
+
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
 
 
 logger = logging.getLogger('ooxml')
@@ -19,7 +38,8 @@ logger = logging.getLogger('ooxml')
 def _name(name):
     """Returns full name for the attribute.
 
-    It checks predefined namespaces used in OOXML documents.
+    It checks predefined namespaces used in OOXML documents. Parsers use precompiled names
+    from :mod:`ooxml.names` instead of this function.
 
     >>> _name('{{{w}}}rStyle')
     '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}rStyle'
@@ -27,148 +47,141 @@ def _name(name):
     return name.format(**NAMESPACES)
 
 
+def parse_xml(content):
+    """Returns root element of the parsed XML content.
+
+    Content which has already been parsed is returned as it is.
+
+    :Args:
+      - content: XML content as bytes or already parsed element
+    """
+
+    if etree.iselement(content):
+        return content
+
+    return etree.fromstring(content)
+
+
 def is_on(value):
     return value in ['true', 'on', '1']
 
 
+# Run properties which are turned on or off
+RUN_TOGGLES = {
+    W_RTL: 'rtl',
+    W_B: 'b',
+    W_I: 'i',
+    W_U: 'u',
+    W_STRIKE: 'strike',
+    W_SMALL_CAPS: 'small_caps'
+}
+
+
 def parse_previous_properties(document, paragraph, prop):
+    """Parse run properties.
+
+    Children of the properties element are checked only once. Parsed properties are merged with
+    already existing properties of the element and interned using
+    :meth:`ooxml.doc.Document.intern_properties`.
+    """
+
     if not paragraph:
         return
 
-    style = prop.find(_name('{{{w}}}rStyle'))
+    rpr = dict(paragraph.rpr)
+    style = sz = None
 
-    if style is not None:
-        paragraph.rpr['style'] = style.attrib[_name('{{{w}}}val')]
-        document.add_style_as_used(paragraph.rpr['style'])
+    for elem in prop:
+        tag = elem.tag
 
-    color = prop.find(_name('{{{w}}}color'))
+        if tag in RUN_TOGGLES:
+            # todo
+            # check b = on and not off
+            if is_on(elem.attrib.get(W_VAL, 'on')):
+                rpr[RUN_TOGGLES[tag]] = True
+        elif tag == W_R_STYLE:
+            style = rpr['style'] = elem.attrib[W_VAL]
+        elif tag == W_COLOR:
+            rpr['color'] = elem.attrib[W_VAL]
+        elif tag == W_SZ:
+            sz = rpr['sz'] = elem.attrib[W_VAL]
+        elif tag == W_VERT_ALIGN:
+            value = elem.attrib[W_VAL]
 
-    if color is not None:
-        paragraph.rpr['color'] = color.attrib[_name('{{{w}}}val')]
+            if value == 'superscript':
+                rpr['superscript'] = True
 
-    rtl = prop.find(_name('{{{w}}}rtl'))
+            if value == 'subscript':
+                rpr['subscript'] = True
 
-    if rtl is not None:
-        if is_on(rtl.attrib.get(_name('{{{w}}}val'), 'on')):
-            paragraph.rpr['rtl'] = True
+    paragraph.rpr = document.intern_properties(rpr)
 
-    sz = prop.find(_name('{{{w}}}sz'))
+    if style is not None:
+        document.add_style_as_used(style)
 
     if sz is not None:
-        paragraph.rpr['sz'] = sz.attrib[_name('{{{w}}}val')]
-
         if isinstance(paragraph, doc.Text):
             if not ('dropcap' in paragraph.ppr and paragraph.ppr['dropcap']):
                 if paragraph.parent and hasattr(paragraph.parent, 'ppr') and (not ('dropcap' in paragraph.parent.ppr and paragraph.parent.ppr['dropcap'])):
-                    document.add_font_as_used(paragraph.rpr['sz'])
+                    document.add_font_as_used(sz)
         elif isinstance(paragraph, doc.Paragraph):
             if not ('dropcap' in paragraph.ppr and paragraph.ppr['dropcap']):
-                document.add_font_as_used(paragraph.rpr['sz'])
+                document.add_font_as_used(sz)
         else:
-            document.add_font_as_used(paragraph.rpr['sz'])
-
-    # parse bold
-    b = prop.find(_name('{{{w}}}b'))
-
-    if b is not None:
-        if is_on(b.attrib.get(_name('{{{w}}}val'), 'on')):
-            paragraph.rpr['b'] = True
-
-    # parse italic
-    i = prop.find(_name('{{{w}}}i'))
-
-    if i is not None:
-        if is_on(i.attrib.get(_name('{{{w}}}val'), 'on')):
-            paragraph.rpr['i'] = True
-
-    # parse underline
-    u = prop.find(_name('{{{w}}}u'))
-
-    if u is not None:
-        if is_on(u.attrib.get(_name('{{{w}}}val'), 'on')):
-            paragraph.rpr['u'] = True
+            document.add_font_as_used(sz)
 
-    # parse underline
-    strike = prop.find(_name('{{{w}}}strike'))
 
-    if strike is not None:
-        # todo
-        # check b = on and not off
-        if is_on(strike.attrib.get(_name('{{{w}}}val'), 'on')):
-            paragraph.rpr['strike'] = True
-
-    vert_align = prop.find(_name('{{{w}}}vertAlign'))
-
-    if vert_align is not None:
-        value = vert_align.attrib[_name('{{{w}}}val')]
-
-        if value == 'superscript':
-            paragraph.rpr['superscript'] = True
-
-        if value == 'subscript':
-            paragraph.rpr['subscript'] = True
-
-    small_caps = prop.find(_name('{{{w}}}smallCaps'))
-
-    if small_caps is not None:
-        if is_on(small_caps.attrib.get(_name('{{{w}}}val'), 'on')):
-            paragraph.rpr['small_caps'] = True
+def parse_paragraph_properties(doc, paragraph, prop):
+    """Parse paragraph properties.
 
+    Children of the properties element are checked only once. Run properties defined for the
+    paragraph are parsed after all the paragraph properties.
+    """
 
-def parse_paragraph_properties(doc, paragraph, prop):
     if not paragraph:
         return
 
-    style = prop.find(_name('{{{w}}}pStyle'))
-
-    if style is not None:
-        paragraph.style_id = style.attrib[_name('{{{w}}}val')]
-        doc.add_style_as_used(paragraph.style_id)
-
-    numpr = prop.find(_name('{{{w}}}numPr'))
+    ppr = dict(paragraph.ppr)
+    rpr = None
 
-    if numpr is not None:
-        ilvl = numpr.find(_name('{{{w}}}ilvl'))
+    for elem in prop:
+        tag = elem.tag
 
-        if ilvl is not None:
-            paragraph.ilvl = int(ilvl.attrib[_name('{{{w}}}val')])
+        if tag == W_P_STYLE:
+            paragraph.style_id = elem.attrib[W_VAL]
+            doc.add_style_as_used(paragraph.style_id)
+        elif tag == W_NUM_PR:
+            for el in elem:
+                if el.tag == W_ILVL:
+                    paragraph.ilvl = int(el.attrib[W_VAL])
+                elif el.tag == W_NUM_ID:
+                    paragraph.numid = int(el.attrib[W_VAL])
+        elif tag == W_JC:
+            ppr['jc'] = elem.attrib[W_VAL]
+        elif tag == W_IND:
+            # w:ind - left leftChars right hanging firstLine
+            ind = {}
 
-        numid = numpr.find(_name('{{{w}}}numId'))
+            if W_LEFT in elem.attrib:
+                ind['left'] = elem.attrib[W_LEFT]
 
-        if numid is not None:
-            paragraph.numid = int(numid.attrib[_name('{{{w}}}val')])
+            if W_RIGHT in elem.attrib:
+                ind['right'] = elem.attrib[W_RIGHT]
 
-    jc = prop.find(_name('{{{w}}}jc'))
+            if W_FIRST_LINE in elem.attrib:
+                ind['first_line'] = elem.attrib[W_FIRST_LINE]
 
-    if jc is not None:
-        paragraph.ppr['jc'] = jc.attrib[_name('{{{w}}}val')]
+            ppr['ind'] = doc.intern_properties(ind)
+        elif tag == W_FRAME_PR:
+            if W_DROP_CAP in elem.attrib:
+                drop_cap = elem.attrib[W_DROP_CAP]
 
-    # w:ind - left leftChars right hanging firstLine
+                if drop_cap.lower() in ['drop', 'margin']:
+                    ppr['dropcap'] = True
+        elif tag == W_R_PR:
+            rpr = elem
 
-    ind = prop.find(_name('{{{w}}}ind'))
-
-    if ind is not None:
-        paragraph.ppr['ind'] = {}
-
-        if _name('{{{w}}}left') in ind.attrib:
-            paragraph.ppr['ind']['left'] = ind.attrib[_name('{{{w}}}left')]
-
-        if _name('{{{w}}}right') in ind.attrib:
-            paragraph.ppr['ind']['right'] = ind.attrib[_name('{{{w}}}right')]
-
-        if _name('{{{w}}}firstLine') in ind.attrib:
-            paragraph.ppr['ind']['first_line'] = ind.attrib[_name('{{{w}}}firstLine')]
-
-    frame_pr = prop.find(_name('{{{w}}}framePr'))
-
-    if frame_pr is not None:
-        if _name('{{{w}}}dropCap') in frame_pr.attrib:
-            drop_cap = frame_pr.attrib[_name('{{{w}}}dropCap')]
-
-            if drop_cap.lower() in ['drop', 'margin']:
-                paragraph.ppr['dropcap'] = True
-
-    rpr = prop.find(_name('{{{w}}}rPr'))
+    paragraph.ppr = doc.intern_properties(ppr)
 
     if rpr is not None:
         parse_previous_properties(doc, paragraph, rpr)
@@ -180,11 +193,10 @@ def parse_drawing(document, container, elem):
     We don't do much with drawing element. We can find embeded image but we don't do more than that.
     """
 
-    _blip = elem.xpath('.//a:blip', namespaces=NAMESPACES)
+    blip = next(elem.iterdescendants(A_BLIP), None)
 
-    if len(_blip) > 0:
-        blip = _blip[0]
-        _rid = blip.attrib[_name('{{{r}}}embed')]
+    if blip is not None:
+        _rid = blip.attrib[R_EMBED]
 
         img = doc.Image(_rid)
         container.elements.append(img)
@@ -193,7 +205,7 @@ def parse_drawing(document, container, elem):
 def parse_footnote(document, container, elem):
     "Parse the footnote element."
 
-    _rid = elem.attrib[_name('{{{w}}}id')]
+    _rid = elem.attrib[W_ID]
     foot = doc.Footnote(_rid)
     container.elements.append(foot)
 
@@ -201,94 +213,97 @@ def parse_footnote(document, container, elem):
 def parse_endnote(document, container, elem):
     "Parse the endnote element."
 
-    _rid = elem.attrib[_name('{{{w}}}id')]
+    _rid = elem.attrib[W_ID]
     note = doc.Endnote(_rid)
     container.elements.append(note)
 
 
 def parse_alternate(document, container, elem):
-    txtbx = elem.find('.//' + _name('{{{w}}}txbxContent'))
+    txtbx = elem.find('.//' + W_TXBX_CONTENT)
     paragraphs = []
 
     if txtbx is None:
         return
 
     for el in txtbx:
-        if el.tag == _name('{{{w}}}p'):
+        if el.tag == W_P:
             paragraphs.append(parse_paragraph(document, el))
 
     textbox = doc.TextBox(paragraphs)
     container.elements.append(textbox)
 
 
-def parse_text(document, container, element):
-    "Parse text element."
+def parse_break(document, container, elem):
+    "Parse the break element."
 
-    txt = None
+    if W_TYPE in elem.attrib:
+        brk = doc.Break(elem.attrib[W_TYPE])
+    else:
+        brk = doc.Break()
 
-    alternate = element.find(_name('{{{mc}}}AlternateContent'))
+    container.elements.append(brk)
 
-    if alternate is not None:
-        parse_alternate(document, container, alternate)
 
-    br = element.find(_name('{{{w}}}br'))
+def parse_symbol(document, container, elem):
+    "Parse the symbol element."
 
-    if br is not None:
-        if _name('{{{w}}}type') in br.attrib:
-            _type = br.attrib[_name('{{{w}}}type')]
-            brk = doc.Break(_type)
-        else:
-            brk = doc.Break()
+    _font = elem.attrib[W_FONT]
+    _char = elem.attrib[W_CHAR]
 
-        container.elements.append(brk)
+    container.elements.append(doc.Symbol(font=_font, character=_char))
 
-    t = element.find(_name('{{{w}}}t'))
 
-    if t is not None:
-        txt = doc.Text(t.text)
-        txt.parent = container
+def parse_comment_reference(document, container, elem):
+    "Parse the comment reference element."
 
-        container.elements.append(txt)
+    _m = doc.Comment(elem.attrib[W_ID], 'reference')
+    container.elements.append(_m)
 
-    rpr = element.find(_name('{{{w}}}rPr'))
 
-    if rpr is not None:
-        # Notice it is using txt as container
-        parse_previous_properties(document, txt, rpr)
-
-    for r in element.findall(_name('{{{w}}}r')):
-        parse_text(document, container, r)
-
-    foot = element.find(_name('{{{w}}}footnoteReference'))
-
-    if foot is not None:
-        parse_footnote(document, container, foot)
-
-    end = element.find(_name('{{{w}}}endnoteReference'))
+def parse_text(document, container, element):
+    """Parse text element.
 
-    if end is not None:
-        parse_endnote(document, container, end)
+    Children of the run are parsed in the order they are defined in the document. Every w:t child
+    creates new :class:`ooxml.doc.Text` element and all of them share the run properties.
+    """
 
-    sym = element.find(_name('{{{w}}}sym'))
+    texts = []
+    rpr = None
 
-    if sym is not None:
-        _font = sym.attrib[_name('{{{w}}}font')]
-        _char = sym.attrib[_name('{{{w}}}char')]
+    for elem in element:
+        if elem.tag == W_T:
+            txt = doc.Text(elem.text)
+            txt.parent = container
 
-        container.elements.append(doc.Symbol(font=_font, character=_char))
+            container.elements.append(txt)
+            texts.append(txt)
+        elif elem.tag == W_R_PR:
+            rpr = elem
+        else:
+            handler = RUN_HANDLERS.get(elem.tag, None)
 
-    image = element.find(_name('{{{w}}}drawing'))
+            if handler is not None:
+                handler(document, container, elem)
 
-    if image is not None:
-        parse_drawing(document, container, image)
+    if rpr is not None and len(texts) > 0:
+        # Notice it is using txt as container
+        parse_previous_properties(document, texts[0], rpr)
 
-    refe = element.find(_name('{{{w}}}commentReference'))
+        for txt in texts[1:]:
+            txt.rpr = texts[0].rpr
 
-    if refe is not None:
-        _m = doc.Comment(refe.attrib[_name('{{{w}}}id')], 'reference')
-        container.elements.append(_m)
 
-    return
+# Parsers for the elements found inside of the run
+RUN_HANDLERS = {
+    MC_ALTERNATE_CONTENT: parse_alternate,
+    W_BR: parse_break,
+    W_R: parse_text,
+    W_FOOTNOTE_REFERENCE: parse_footnote,
+    W_ENDNOTE_REFERENCE: parse_endnote,
+    W_SYM: parse_symbol,
+    W_DRAWING: parse_drawing,
+    W_COMMENT_REFERENCE: parse_comment_reference
+}
 
 
 def parse_smarttag(document, container, tag_elem):
@@ -296,13 +311,13 @@ def parse_smarttag(document, container, tag_elem):
 
     tag = doc.SmartTag()
 
-    tag.element = tag_elem.attrib[_name('{{{w}}}element')]
+    tag.element = tag_elem.attrib[W_ELEMENT]
 
     for elem in tag_elem:
-        if elem.tag == _name('{{{w}}}r'):
+        if elem.tag == W_R:
             parse_text(document, tag, elem)
 
-        if elem.tag == _name('{{{w}}}smartTag'):
+        if elem.tag == W_SMART_TAG:
             parse_smarttag(document, tag, elem)
 
     container.elements.append(tag)
@@ -310,6 +325,52 @@ def parse_smarttag(document, container, tag_elem):
     return
 
 
+def coalesce_runs(container):
+    """Merges adjacent text elements with the same run properties.
+
+    Word often splits text with the same formatting into many runs, because of spell checking or
+    revision marks. Text of these runs is joined into the first text element. Links and smart tags
+    inside of the container are merged too.
+
+    :Args:
+      - container: Paragraph, link or smart tag element
+
+    :Returns:
+      Returns number of text elements which were removed.
+    """
+
+    elements = []
+    texts = None
+    merged = 0
+
+    for elem in container.elements:
+        if isinstance(elem, (doc.Link, doc.SmartTag)):
+            merged += coalesce_runs(elem)
+
+        if type(elem) is doc.Text:
+            if texts is not None and elem.rpr == elements[-1].rpr:
+                texts.append(elem.text)
+                merged += 1
+                continue
+        elif texts is None:
+            elements.append(elem)
+            continue
+
+        if texts is not None and len(texts) > 1:
+            elements[-1].text = u''.join(text for text in texts if text)
+
+        elements.append(elem)
+        texts = [elem.text] if type(elem) is doc.Text else None
+
+    if texts is not None and len(texts) > 1:
+        elements[-1].text = u''.join(text for text in texts if text)
+
+    if merged:
+        container.elements = elements
+
+    return merged
+
+
 def parse_paragraph(document, par):
     """Parse paragraph element.
 
@@ -320,31 +381,31 @@ def parse_paragraph(document, par):
     paragraph.document = document
 
     for elem in par:
-        if elem.tag == _name('{{{w}}}pPr'):
+        if elem.tag == W_P_PR:
             parse_paragraph_properties(document, paragraph, elem)
 
-        if elem.tag == _name('{{{w}}}r'):
+        if elem.tag == W_R:
             parse_text(document, paragraph, elem)
 
-        if elem.tag == _name('{{{m}}}oMath'):
+        if elem.tag == M_O_MATH:
             _m = doc.Math()
             paragraph.elements.append(_m)
 
-        if elem.tag == _name('{{{m}}}oMathPara'):
+        if elem.tag == M_O_MATH_PARA:
             _m = doc.Math()
             paragraph.elements.append(_m)
 
-        if elem.tag == _name('{{{w}}}commentRangeStart'):
-            _m = doc.Comment(elem.attrib[_name('{{{w}}}id')], 'start')
+        if elem.tag == W_COMMENT_RANGE_START:
+            _m = doc.Comment(elem.attrib[W_ID], 'start')
             paragraph.elements.append(_m)
 
-        if elem.tag == _name('{{{w}}}commentRangeEnd'):
-            _m = doc.Comment(elem.attrib[_name('{{{w}}}id')], 'end')
+        if elem.tag == W_COMMENT_RANGE_END:
+            _m = doc.Comment(elem.attrib[W_ID], 'end')
             paragraph.elements.append(_m)
 
-        if elem.tag == _name('{{{w}}}hyperlink'):
+        if elem.tag == W_HYPERLINK:
             try:
-                t = doc.Link(elem.attrib[_name('{{{r}}}id')])
+                t = doc.Link(elem.attrib[R_ID])
 
                 parse_text(document, t, elem)
 
@@ -352,9 +413,12 @@ def parse_paragraph(document, par):
             except:
                 logger.error('Error with with hyperlink [%s].', str(elem.attrib.items()))
 
-        if elem.tag == _name('{{{w}}}smartTag'):
+        if elem.tag == W_SMART_TAG:
             parse_smarttag(document, paragraph, elem)
 
+    if document.merge_runs:
+        document.merged_runs += coalesce_runs(paragraph)
+
     return paragraph
 
 
@@ -364,10 +428,10 @@ def parse_table_properties(doc, table, prop):
     if not table:
         return
 
-    style = prop.find(_name('{{{w}}}tblStyle'))
+    style = prop.find(W_TBL_STYLE)
 
     if style is not None:
-        table.style_id = style.attrib[_name('{{{w}}}val')]
+        table.style_id = style.attrib[W_VAL]
         doc.add_style_as_used(table.style_id)
 
 
@@ -377,52 +441,55 @@ def parse_table_column_properties(doc, cell, prop):
     if not cell:
         return
 
-    grid = prop.find(_name('{{{w}}}gridSpan'))
+    grid = prop.find(W_GRID_SPAN)
 
     if grid is not None:
-        cell.grid_span = int(grid.attrib[_name('{{{w}}}val')])
+        cell.grid_span = int(grid.attrib[W_VAL])
 
-    vmerge = prop.find(_name('{{{w}}}vMerge'))
+    vmerge = prop.find(W_V_MERGE)
 
     if vmerge is not None:
-        if _name('{{{w}}}val') in vmerge.attrib:
-            cell.vmerge = vmerge.attrib[_name('{{{w}}}val')]
+        if W_VAL in vmerge.attrib:
+            cell.vmerge = vmerge.attrib[W_VAL]
         else:
             cell.vmerge = ""
 
 
-def parse_table(document, tbl):
-    "Parse table element."
+def _change(rows, pos_x):
+    "Increases row span of the cell above vertically merged cell."
+
+    if len(rows) == 1:
+        return rows
 
-    def _change(rows, pos_x):
-        if len(rows) == 1:
-            return rows
+    count_x = 1
 
-        count_x = 1
+    for x in rows[-1]:
+        if count_x == pos_x:
+            x.row_span += 1
 
-        for x in rows[-1]:
-            if count_x == pos_x:
-                x.row_span += 1
+        count_x += x.grid_span
 
-            count_x += x.grid_span
+    return rows
 
-        return rows
+
+def parse_table(document, tbl):
+    "Parse table element."
 
     table = doc.Table()
 
-    tbl_pr = tbl.find(_name('{{{w}}}tblPr'))
+    tbl_pr = tbl.find(W_TBL_PR)
 
     if tbl_pr is not None:
         parse_table_properties(document, table, tbl_pr)
 
-    for tr in tbl.xpath('./w:tr', namespaces=NAMESPACES):
+    for tr in tbl.iterchildren(W_TR):
         columns = []
         pos_x = 0
 
-        for tc in tr.xpath('./w:tc', namespaces=NAMESPACES):
+        for tc in tr.iterchildren(W_TC):
             cell = doc.TableCell()
 
-            tc_pr = tc.find(_name('{{{w}}}tcPr'))
+            tc_pr = tc.find(W_TC_PR)
 
             if tc_pr is not None:
                 parse_table_column_properties(doc, cell, tc_pr)
@@ -433,7 +500,7 @@ def parse_table(document, tbl):
             if cell.vmerge is not None and cell.vmerge == "":
                 table.rows = _change(table.rows, pos_x)
             else:
-                for p in tc.xpath('./w:p', namespaces=NAMESPACES):
+                for p in tc.iterchildren(W_P):
                     cell.elements.append(parse_paragraph(document, p))
 
                 columns.append(cell)
@@ -443,31 +510,480 @@ def parse_table(document, tbl):
     return table
 
 
-def parse_document(xmlcontent):
+def parse_body_element(document, elem):
+    """Parse one of the top level elements placed inside of the document body.
+
+    :Returns:
+      Returns parsed element or None if this kind of element is not supported.
+    """
+
+    if elem.tag == W_P:
+        return parse_paragraph(document, elem)
+
+    if elem.tag == W_TBL:
+        return parse_table(document, elem)
+
+    if elem.tag == W_SDT:
+        return doc.TOC()
+
+    return None
+
+
+def parse_document(xmlcontent, merge_runs=False):
     """Parse document with content.
 
     Content is placed in file 'document.xml'.
+
+    :Args:
+      - xmlcontent (str): Content of the 'document.xml'
+      - merge_runs (bool): Merge adjacent runs with the same formatting using :func:`coalesce_runs`.
     """
 
-    document = etree.fromstring(xmlcontent)
+    document = parse_xml(xmlcontent)
 
-    body = document.xpath('.//w:body', namespaces=NAMESPACES)[0]
+    body = document.find('.//' + W_BODY)
 
     document = doc.Document()
+    document.merge_runs = merge_runs
 
     for elem in body:
-        if elem.tag == _name('{{{w}}}p'):
-            document.elements.append(parse_paragraph(document, elem))
+        element = parse_body_element(document, elem)
+
+        if element is not None:
+            document.elements.append(element)
 
-        if elem.tag == _name('{{{w}}}tbl'):
-            document.elements.append(parse_table(document, elem))
+    return document
+
+
+def iterparse_document(source, merge_runs=False):
+    """Parse document incrementally.
+
+    Works the same as :func:`parse_document` but it never holds entire XML tree in the memory.
+    Top level elements of the document body are parsed as soon as they are closed and their XML
+    subtree is thrown away after that. Peak memory usage is roughly one top level element plus the
+    document model.
+
+    :Args:
+      - source: File name or file like object with content of the 'document.xml'
+      - merge_runs (bool): Merge adjacent runs with the same formatting using :func:`coalesce_runs`.
+
+    :Returns:
+      Returns parsed document of type :class:`ooxml.doc.Document`
+    """
+
+    document = doc.Document()
+    document.merge_runs = merge_runs
 
-        if elem.tag == _name('{{{w}}}sdt'):
-            document.elements.append(doc.TOC())
+    for _, elem in etree.iterparse(source, events=('end', ), tag=(W_P, W_TBL, W_SDT)):
+        body = elem.getparent()
+
+        # Paragraphs inside of tables and other elements are parsed together with their parent
+        if body is None or body.tag != W_BODY:
+            continue
+
+        element = parse_body_element(document, elem)
+
+        if element is not None:
+            document.elements.append(element)
+
+        # Throw away what we have already parsed
+        elem.clear()
+
+        while elem.getprevious() is not None:
+            del body[0]
 
     return document
 
 
+class _PropertiesElement(object):
+    "Lightweight replacement for the XML element used for the properties."
+
+    __slots__ = ('tag', 'attrib', 'children')
+
+    def __init__(self, tag, attrib):
+        self.tag = tag
+        self.attrib = attrib
+        self.children = []
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def find(self, tag):
+        for child in self.children:
+            if child.tag == tag:
+                return child
+
+        return None
+
+
+class _PropertiesBuilder(object):
+    """Builds tree of :class:`_PropertiesElement` elements.
+
+    Properties are parsed only by checking tags, attributes and children of the elements. Creating
+    real XML tree for them would be much slower.
+    """
+
+    def __init__(self):
+        self.stack = []
+        self.root = None
+
+    def start(self, tag, attrib):
+        elem = _PropertiesElement(tag, attrib)
+
+        if self.stack:
+            self.stack[-1].children.append(elem)
+        else:
+            self.root = elem
+
+        self.stack.append(elem)
+
+    def end(self, tag):
+        self.stack.pop()
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self.root
+
+
+class _Capture(object):
+    """Builds small XML tree for the element and passes it to the callback.
+
+    Used for the elements which are parsed using the existing parser functions. Properties are
+    collected using :class:`_PropertiesBuilder`.
+    """
+
+    def __init__(self, tag, attrib, callback, properties=False):
+        self.builder = _PropertiesBuilder() if properties else etree.TreeBuilder()
+        self.builder.start(tag, attrib)
+        self.callback = callback
+        self.depth = 1
+
+
+class _ParagraphFrame(object):
+    def __init__(self, target, callback):
+        self.paragraph = doc.Paragraph()
+        self.paragraph.document = target.document
+        self.callback = callback
+
+    def child(self, target, tag, attrib):
+        paragraph = self.paragraph
+
+        if tag == W_R:
+            return _RunFrame(paragraph)
+
+        if tag == W_P_PR:
+            return _Capture(tag, attrib, lambda elem: parse_paragraph_properties(target.document, paragraph, elem), True)
+
+        if tag == M_O_MATH or tag == M_O_MATH_PARA:
+            paragraph.elements.append(doc.Math())
+        elif tag == W_COMMENT_RANGE_START:
+            paragraph.elements.append(doc.Comment(attrib[W_ID], 'start'))
+        elif tag == W_COMMENT_RANGE_END:
+            paragraph.elements.append(doc.Comment(attrib[W_ID], 'end'))
+        elif tag == W_HYPERLINK:
+            if R_ID in attrib:
+                return _RunFrame(doc.Link(attrib[R_ID]), paragraph.elements.append)
+
+            logger.error('Error with with hyperlink [%s].', str(list(attrib.items())))
+        elif tag == W_SMART_TAG:
+            return _SmartTagFrame(paragraph, attrib)
+
+        return None
+
+    def close(self, target):
+        if target.document.merge_runs:
+            target.document.merged_runs += coalesce_runs(self.paragraph)
+
+        self.callback(self.paragraph)
+
+
+class _RunFrame(object):
+    def __init__(self, container, callback=None):
+        self.container = container
+        self.callback = callback
+        self.texts = []
+        self.rpr = None
+
+    def child(self, target, tag, attrib):
+        if tag == W_T:
+            txt = doc.Text(None)
+            txt.parent = self.container
+
+            self.container.elements.append(txt)
+            self.texts.append(txt)
+
+            # Text element is skipped and its content is collected by the target
+            target._text = txt
+
+            return None
+
+        if tag == W_R:
+            return _RunFrame(self.container)
+
+        if tag == W_R_PR:
+            return _Capture(tag, attrib, self._set_properties, True)
+
+        handler = RUN_HANDLERS.get(tag, None)
+
+        if handler is not None:
+            return _Capture(tag, attrib, lambda elem: handler(target.document, self.container, elem))
+
+        return None
+
+    def _set_properties(self, elem):
+        self.rpr = elem
+
+    def close(self, target):
+        texts = self.texts
+
+        if self.rpr is not None and len(texts) > 0:
+            parse_previous_properties(target.document, texts[0], self.rpr)
+
+            for txt in texts[1:]:
+                txt.rpr = texts[0].rpr
+
+        if self.callback is not None:
+            self.callback(self.container)
+
+
+class _SmartTagFrame(object):
+    def __init__(self, container, attrib):
+        self.container = container
+        self.tag = doc.SmartTag()
+        self.tag.element = attrib[W_ELEMENT]
+
+    def child(self, target, tag, attrib):
+        if tag == W_R:
+            return _RunFrame(self.tag)
+
+        if tag == W_SMART_TAG:
+            return _SmartTagFrame(self.tag, attrib)
+
+        return None
+
+    def close(self, target):
+        self.container.elements.append(self.tag)
+
+
+class _TableFrame(object):
+    def __init__(self, callback):
+        self.table = doc.Table()
+        self.callback = callback
+        self.has_properties = False
+
+    def child(self, target, tag, attrib):
+        if tag == W_TR:
+            return _RowFrame(self.table)
+
+        if tag == W_TBL_PR and not self.has_properties:
+            self.has_properties = True
+
+            return _Capture(tag, attrib, lambda elem: parse_table_properties(target.document, self.table, elem), True)
+
+        return None
+
+    def close(self, target):
+        self.callback(self.table)
+
+
+class _RowFrame(object):
+    def __init__(self, table):
+        self.table = table
+        self.columns = []
+        self.pos_x = 0
+
+    def child(self, target, tag, attrib):
+        if tag == W_TC:
+            return _CellFrame(self)
+
+        return None
+
+    def close(self, target):
+        self.table.rows.append(self.columns)
+
+
+class _CellFrame(object):
+    def __init__(self, row):
+        self.row = row
+        self.cell = doc.TableCell()
+        self.has_properties = False
+        self.merged = None
+
+    def _check_merged(self):
+        # Position and merging are known only after cell properties have been parsed
+        if self.merged is None:
+            self.row.pos_x += self.cell.grid_span
+            self.merged = self.cell.vmerge is not None and self.cell.vmerge == ""
+
+            if self.merged:
+                self.row.table.rows = _change(self.row.table.rows, self.row.pos_x)
+
+        return self.merged
+
+    def child(self, target, tag, attrib):
+        if tag == W_TC_PR and not self.has_properties:
+            self.has_properties = True
+
+            return _Capture(tag, attrib, lambda elem: parse_table_column_properties(doc, self.cell, elem), True)
+
+        if tag == W_P and not self._check_merged():
+            return _ParagraphFrame(target, self.cell.elements.append)
+
+        return None
+
+    def close(self, target):
+        if not self._check_merged():
+            self.row.columns.append(self.cell)
+
+
+class _BodyFrame(object):
+    def child(self, target, tag, attrib):
+        elements = target.document.elements
+
+        if tag == W_P:
+            return _ParagraphFrame(target, elements.append)
+
+        if tag == W_TBL:
+            return _TableFrame(elements.append)
+
+        if tag == W_SDT:
+            elements.append(doc.TOC())
+
+        return None
+
+    def close(self, target):
+        pass
+
+
+class _RootFrame(object):
+    def child(self, target, tag, attrib):
+        if tag == W_BODY and not target.has_body:
+            target.has_body = True
+
+            return _BodyFrame()
+
+        # Body does not have to be direct child of the root element
+        return None if target.has_body else self
+
+    def close(self, target):
+        pass
+
+
+class DocumentTarget(object):
+    """Parser target which builds the document model while the XML is parsed.
+
+    Model is created from the start, end and data events without building the XML tree first.
+    Elements which are parsed by the existing parser functions, like properties, images and text
+    boxes, are collected into small XML trees and passed to these functions. Elements which are
+    not part of the document model are skipped.
+
+    .. code-block:: python
+
+        target = DocumentTarget()
+        document = etree.parse(source, etree.XMLParser(target=target))
+
+    :Args:
+      - merge_runs (bool): Merge adjacent runs with the same formatting using :func:`coalesce_runs`.
+    """
+
+    def __init__(self, merge_runs=False):
+        self.document = doc.Document()
+        self.document.merge_runs = merge_runs
+
+        self.has_body = False
+        self._stack = []
+        self._frame = None
+        self._skip = 0
+        self._capture = None
+        self._text = None
+
+    def start(self, tag, attrib):
+        if self._skip:
+            self._skip += 1
+            # Only text before the first child element is the text of the element
+            self._text = None
+            return
+
+        capture = self._capture
+
+        if capture is not None:
+            capture.depth += 1
+            capture.builder.start(tag, attrib)
+            return
+
+        frame = self._frame
+
+        if frame is None:
+            frame = _RootFrame()
+        else:
+            frame = frame.child(self, tag, attrib)
+
+        if frame is None:
+            self._skip = 1
+        elif type(frame) is _Capture:
+            self._capture = frame
+        else:
+            self._stack.append(self._frame)
+            self._frame = frame
+
+    def end(self, tag):
+        if self._skip:
+            self._skip -= 1
+            self._text = None
+            return
+
+        capture = self._capture
+
+        if capture is not None:
+            capture.builder.end(tag)
+            capture.depth -= 1
+
+            if capture.depth == 0:
+                self._capture = None
+                capture.callback(capture.builder.close())
+
+            return
+
+        frame = self._frame
+        self._frame = self._stack.pop()
+
+        # Frames can be shared by nested elements
+        if frame is not self._frame:
+            frame.close(self)
+
+    def data(self, data):
+        txt = self._text
+
+        if txt is not None:
+            txt.text = data if txt.text is None else txt.text + data
+        elif self._capture is not None and not self._skip:
+            self._capture.builder.data(data)
+
+    def close(self):
+        return self.document
+
+
+def targetparse_document(source, merge_runs=False):
+    """Parse document using lxml parser target.
+
+    Works the same as :func:`parse_document` but document model is built directly from the parser
+    events using :class:`DocumentTarget`. XML tree for the entire document is never created.
+
+    :Args:
+      - source: File name or file like object with content of the 'document.xml'
+      - merge_runs (bool): Merge adjacent runs with the same formatting using :func:`coalesce_runs`.
+
+    :Returns:
+      Returns parsed document of type :class:`ooxml.doc.Document`
+    """
+
+    parser = etree.XMLParser(target=DocumentTarget(merge_runs))
+
+    return etree.parse(source, parser)
+
+
 def parse_relationship(document, xmlcontent, rel_type):
     """Parse relationship document.
 
@@ -476,10 +992,10 @@ def parse_relationship(document, xmlcontent, rel_type):
     Relationships are placed in file '_rels/document.xml.rels'.
     """
 
-    doc = etree.fromstring(xmlcontent)
+    doc = parse_xml(xmlcontent)
 
     for elem in doc:
-        if elem.tag == _name('{{{pr}}}Relationship'):
+        if elem.tag == PR_RELATIONSHIP:
             rel = {'target': elem.attrib['Target'],
                    'type': elem.attrib['Type'],
                    'target_mode': elem.attrib.get('TargetMode', 'Internal')}
@@ -493,12 +1009,12 @@ def parse_style(document, xmlcontent):
     Styles are defined in file 'styles.xml'.
     """
 
-    styles = etree.fromstring(xmlcontent)
+    styles = parse_xml(xmlcontent)
 
-    _r = styles.xpath('.//w:rPrDefault', namespaces=NAMESPACES)
+    _r = next(styles.iterdescendants(W_R_PR_DEFAULT), None)
 
-    if len(_r) > 0:
-        rpr = _r[0].find(_name('{{{w}}}rPr'))
+    if _r is not None:
+        rpr = _r.find(W_R_PR)
 
         if rpr is not None:
             st = doc.Style()
@@ -506,44 +1022,46 @@ def parse_style(document, xmlcontent):
             document.default_style = st
 
     # rest of the styles
-    for style in styles.xpath('.//w:style', namespaces=NAMESPACES):
+    for style in styles.iterdescendants(W_STYLE):
         st = doc.Style()
 
-        st.style_id = style.attrib[_name('{{{w}}}styleId')]
+        st.style_id = style.attrib[W_STYLE_ID]
 
-        style_type = style.attrib[_name('{{{w}}}type')]
+        style_type = style.attrib[W_TYPE]
         if style_type is not None:
             st.style_type = style_type
 
-        if _name('{{{w}}}default') in style.attrib:
-            is_default = style.attrib[_name('{{{w}}}default')]
+        if W_DEFAULT in style.attrib:
+            is_default = style.attrib[W_DEFAULT]
             if is_default is not None:
                 st.is_default = is_default == '1'
 
-        name = style.find(_name('{{{w}}}name'))
+        name = style.find(W_NAME)
         if name is not None:
-            st.name = name.attrib[_name('{{{w}}}val')]
+            st.name = name.attrib[W_VAL]
 
-        based_on = style.find(_name('{{{w}}}basedOn'))
+        based_on = style.find(W_BASED_ON)
 
         if based_on is not None:
-            st.based_on = based_on.attrib[_name('{{{w}}}val')]
+            st.based_on = based_on.attrib[W_VAL]
 
-        document.styles.styles[st.style_id] = st
+        document.styles.add(st)
 
         if st.is_default:
             document.styles.default_styles[st.style_type] = st.style_id
 
-        rpr = style.find(_name('{{{w}}}rPr'))
+        rpr = style.find(W_R_PR)
 
         if rpr is not None:
             parse_previous_properties(document, st, rpr)
 
-        ppr = style.find(_name('{{{w}}}pPr'))
+        ppr = style.find(W_P_PR)
 
         if ppr is not None:
             parse_paragraph_properties(document, st, ppr)
 
+    document.styles.resolve_all()
+
 
 def parse_comments(document, xmlcontent):
     """Parse comments document.
@@ -551,20 +1069,20 @@ def parse_comments(document, xmlcontent):
     Comments are defined in file 'comments.xml'
     """
 
-    comments = etree.fromstring(xmlcontent)
+    comments = parse_xml(xmlcontent)
     document.comments = {}
 
-    for comment in comments.xpath('.//w:comment', namespaces=NAMESPACES):
+    for comment in comments.iterdescendants(W_COMMENT):
         # w:author
         # w:id
         # w: date
-        comment_id = comment.attrib[_name('{{{w}}}id')]
+        comment_id = comment.attrib[W_ID]
 
         comm = doc.CommentContent(comment_id)
-        comm.author = comment.attrib.get(_name('{{{w}}}author'), None)
-        comm.date = comment.attrib.get(_name('{{{w}}}date'), None)
+        comm.author = comment.attrib.get(W_AUTHOR, None)
+        comm.date = comment.attrib.get(W_DATE, None)
 
-        comm.elements = [parse_paragraph(document, para) for para in comment.xpath('.//w:p', namespaces=NAMESPACES)]
+        comm.elements = [parse_paragraph(document, para) for para in comment.iterdescendants(W_P)]
 
         document.comments[comment_id] = comm
 
@@ -575,19 +1093,19 @@ def parse_footnotes(document, xmlcontent):
     Footnotes are defined in file 'footnotes.xml'
     """
 
-    footnotes = etree.fromstring(xmlcontent)
+    footnotes = parse_xml(xmlcontent)
     document.footnotes = {}
 
-    for footnote in footnotes.xpath('.//w:footnote', namespaces=NAMESPACES):
-        _type = footnote.attrib.get(_name('{{{w}}}type'), None)
+    for footnote in footnotes.iterdescendants(W_FOOTNOTE):
+        _type = footnote.attrib.get(W_TYPE, None)
 
         # don't know what to do with these now
         if _type in ['separator', 'continuationSeparator', 'continuationNotice']:
             continue
 
-        paragraphs = [parse_paragraph(document, para) for para in footnote.xpath('.//w:p', namespaces=NAMESPACES)]
+        paragraphs = [parse_paragraph(document, para) for para in footnote.iterdescendants(W_P)]
 
-        document.footnotes[footnote.attrib[_name('{{{w}}}id')]] = paragraphs
+        document.footnotes[footnote.attrib[W_ID]] = paragraphs
 
 
 def parse_endnotes(document, xmlcontent):
@@ -596,13 +1114,13 @@ def parse_endnotes(document, xmlcontent):
     Endnotes are defined in file 'endnotes.xml'
     """
 
-    endnotes = etree.fromstring(xmlcontent)
+    endnotes = parse_xml(xmlcontent)
     document.endnotes = {}
 
-    for note in endnotes.xpath('.//w:endnote', namespaces=NAMESPACES):
-        paragraphs = [parse_paragraph(document, para) for para in note.xpath('.//w:p', namespaces=NAMESPACES)]
+    for note in endnotes.iterdescendants(W_ENDNOTE):
+        paragraphs = [parse_paragraph(document, para) for para in note.iterdescendants(W_P)]
 
-        document.endnotes[note.attrib[_name('{{{w}}}id')]] = paragraphs
+        document.endnotes[note.attrib[W_ID]] = paragraphs
 
 
 def parse_numbering(document, xmlcontent):
@@ -611,36 +1129,338 @@ def parse_numbering(document, xmlcontent):
     Numbering is defined in file 'numbering.xml'.
     """
 
-    numbering = etree.fromstring(xmlcontent)
+    numbering = parse_xml(xmlcontent)
 
     document.abstruct_numbering = {}
     document.numbering = {}
 
-    for abstruct_num in numbering.xpath('.//w:abstractNum', namespaces=NAMESPACES):
+    for abstruct_num in numbering.iterdescendants(W_ABSTRACT_NUM):
         numb = {}
-        for lvl in abstruct_num.xpath('./w:lvl', namespaces=NAMESPACES):
-            ilvl = int(lvl.attrib[_name('{{{w}}}ilvl')])
+        for lvl in abstruct_num.iterchildren(W_LVL):
+            ilvl = int(lvl.attrib[W_ILVL])
 
-            fmt = lvl.find(_name('{{{w}}}numFmt'))
-            numb[ilvl] = {'numFmt': fmt.attrib[_name('{{{w}}}val')]}
+            fmt = lvl.find(W_NUM_FMT)
+            numb[ilvl] = {'numFmt': fmt.attrib[W_VAL]}
 
-        document.abstruct_numbering[abstruct_num.attrib[_name('{{{w}}}abstractNumId')]] = numb
+        document.abstruct_numbering[abstruct_num.attrib[W_ABSTRACT_NUM_ID]] = numb
 
-    for num in numbering.xpath('.//w:num', namespaces=NAMESPACES):
-        num_id = num.attrib[_name('{{{w}}}numId')]
+    for num in numbering.iterdescendants(W_NUM):
+        num_id = num.attrib[W_NUM_ID]
 
-        abs_num = num.find(_name('{{{w}}}abstractNumId'))
+        abs_num = num.find(W_ABSTRACT_NUM_ID)
 
         if abs_num is not None:
-            number_id = abs_num.attrib[_name('{{{w}}}val')]
+            number_id = abs_num.attrib[W_VAL]
             document.numbering[int(num_id)] = number_id
 
 
-def parse_from_file(file_object):
+# Parts of the OOXML file which are parsed after the document and styles. Every part has a list
+# of files with (file name, description, parser, extra arguments for the parser).
+DOCUMENT_PARTS = [
+    ('relationships', [('_rels/document.xml.rels', 'document relationships', parse_relationship, ('document', )),
+                       ('_rels/endnotes.xml.rels', 'endnotes relationships', parse_relationship, ('endnotes', )),
+                       ('_rels/footnotes.xml.rels', 'footnotes relationships', parse_relationship, ('footnotes', ))]),
+    ('comments', [('comments.xml', 'comments', parse_comments, ())]),
+    ('footnotes', [('footnotes.xml', 'footnotes', parse_footnotes, ())]),
+    ('endnotes', [('endnotes.xml', 'endnotes', parse_endnotes, ())]),
+    ('numbering', [('numbering.xml', 'numbering', parse_numbering, ())])
+]
+
+
+class ConcurrentReader(object):
+    """Reads and parses files from the OOXML file using thread pool.
+
+    Files are decompressed and parsed in the background as soon as the reader is created.
+    :meth:`read_file` returns parsed XML tree, which all the part parsers accept instead of
+    the file content.
+
+    :Args:
+      - file_object (:class:`ooxml.docx.DOCXFile`): OOXML file object
+      - executor (:class:`concurrent.futures.Executor`): Executor used for reading the files
+      - file_names (list): Files which should be read in the background
+    """
+
+    def __init__(self, file_object, executor, file_names):
+        self.file_object = file_object
+        self.files = dict((file_name, executor.submit(self._read, file_name)) for file_name in file_names)
+
+    def _read(self, file_name):
+        return parse_xml(self.file_object.read_file(file_name))
+
+    def read_file(self, file_name):
+        if file_name in self.files:
+            return self.files[file_name].result()
+
+        return self.file_object.read_file(file_name)
+
+
+def _read_xml(file_object, file_name):
+    """Read and parse XML file from the OOXML file.
+
+    Returns root element, decompressed size, decompress time and parse time.
+    """
+
+    start = timeit.default_timer()
+    content = file_object.read_file(file_name)
+    decompressed = timeit.default_timer()
+
+    # Concurrent reader returns already parsed files
+    size = None if etree.iselement(content) else len(content)
+    content = parse_xml(content)
+
+    return content, size, decompressed - start, timeit.default_timer() - decompressed
+
+
+def _parse_part(document, file_object, file_name, description, parse_func, args=(), stats=None):
+    "Read and parse one file from the OOXML file."
+
+    if stats is None:
+        stats = NO_STATS
+
+    try:
+        content, size, decompress, parse = _read_xml(file_object, file_name)
+
+        start = timeit.default_timer()
+        parse_func(document, content, *args)
+
+        stats.add_file(file_name, size, decompress, parse, timeit.default_timer() - start)
+    except KeyError:
+        logger.warning('Could not read %s.', description)
+
+
+def _part_loader(file_object, part, files, stats):
+    "Returns function which reads and parses files of the document part."
+
+    def _load(document):
+        with stats.phase(part):
+            for file_name, description, parse_func, args in files:
+                _parse_part(document, file_object, file_name, description, parse_func, args, stats)
+
+    return _load
+
+
+def _count_elements(elements, counter):
+    "Counts elements and all their child elements by the name of their class."
+
+    stack = list(elements)
+
+    while stack:
+        elem = stack.pop()
+        counter[type(elem).__name__] += 1
+
+        if isinstance(elem, doc.Table):
+            for row in elem.rows:
+                stack.extend(row)
+        else:
+            stack.extend(getattr(elem, 'elements', None) or ())
+
+
+class ParseStats(object):
+    """Collects timings and memory usage while the OOXML file is parsed.
+
+    Stats are collected when the object is given to :func:`parse_from_file`. Every phase of parsing
+    has its own time and peak memory. Phases are "document", "styles" and the document parts from
+    :data:`DOCUMENT_PARTS`. Parts parsed on demand are added to the stats when they are parsed.
+
+    .. code-block:: python
+
+        stats = ParseStats(trace_memory=True)
+        dfile = ooxml.read_from_file('document.docx', stats=stats)
+
+        six.print_(stats.format_report())
+
+    For every file we save decompressed size, time needed to decompress it, to parse the XML and to
+    build the document model. Engines "iterparse" and "target" decompress and parse 'document.xml'
+    while they build the model, so only build time is known for it. With more than one worker
+    files are decompressed and parsed in the background and their size is not known.
+
+    Memory is measured with :mod:`tracemalloc`, which makes parsing a lot slower. It is not available
+    with Python 2.
+
+    :Args:
+      - trace_memory (bool): Measure peak memory of every phase. False by default.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory and tracemalloc is not None
+        self.files = collections.OrderedDict()
+        self.phases = collections.OrderedDict()
+        self.elements = collections.Counter()
+        self.merged_runs = 0
+
+    def add_file(self, file_name, size, decompress, parse, build):
+        """Saves timings for one file.
+
+        :Args:
+          - file_name (str): Name of the file
+          - size (int): Decompressed size of the file in bytes or None if it is not known
+          - decompress (float): Seconds needed to decompress the file or None if it is not known
+          - parse (float): Seconds needed to parse the XML or None if it is not known
+          - build (float): Seconds needed to build the document model
+        """
+
+        self.files[file_name] = {'size': size, 'decompress': decompress, 'parse': parse, 'build': build}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Context manager which measures time and peak memory of the phase.
+
+        :Args:
+          - name (str): Name of the phase
+        """
+
+        started, baseline = False, 0
+
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                # Peak can be reset only since Python 3.9
+                if hasattr(tracemalloc, 'reset_peak'):
+                    tracemalloc.reset_peak()
+
+                baseline = tracemalloc.get_traced_memory()[0]
+            else:
+                tracemalloc.start()
+                started = True
+
+        start = timeit.default_timer()
+
+        try:
+            yield
+        finally:
+            stats = {'time': timeit.default_timer() - start, 'peak_memory': None}
+
+            if self.trace_memory:
+                stats['peak_memory'] = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+                if started:
+                    tracemalloc.stop()
+
+            self.phases[name] = stats
+
+    def count_elements(self, document):
+        """Counts elements of the document by their class.
+
+        Elements in the parts of the document which have not been parsed yet are not counted.
+
+        :Args:
+          - document (:class:`ooxml.doc.Document`): Document object
+        """
+
+        self.elements.clear()
+
+        _count_elements(document.elements, self.elements)
+
+        for part in ['footnotes', 'endnotes']:
+            if part not in document._part_loaders:
+                for paragraphs in six.itervalues(getattr(document, part)):
+                    _count_elements(paragraphs, self.elements)
+
+        if 'comments' not in document._part_loaders:
+            for comment in six.itervalues(document.comments):
+                _count_elements(comment.elements, self.elements)
+
+        self.merged_runs = document.merged_runs
+
+    def report(self):
+        """Returns collected stats.
+
+        :Returns:
+          Dictionary with keys "files", "phases", "elements" and "merged_runs". Times are in
+          seconds and sizes in bytes.
+        """
+
+        return {'files': dict((name, dict(value)) for name, value in six.iteritems(self.files)),
+                'phases': dict((name, dict(value)) for name, value in six.iteritems(self.phases)),
+                'elements': dict(self.elements),
+                'merged_runs': self.merged_runs}
+
+    def format_report(self):
+        """Returns collected stats as a printable table.
+
+        Times are in milliseconds, sizes and memory in kilobytes.
+        """
+
+        def _ms(value):
+            return '-' if value is None else '{:.3f}'.format(value * 1000)
+
+        def _kb(value):
+            return '-' if value is None else '{:.1f}'.format(value / 1024.0)
+
+        lines = ['{:<32} {:>12} {:>14} {:>12} {:>12}'.format('file', 'size (kB)', 'decompress (ms)', 'parse (ms)', 'build (ms)')]
+
+        for name, value in six.iteritems(self.files):
+            lines.append('{:<32} {:>12} {:>14} {:>12} {:>12}'.format(name, _kb(value['size']), _ms(value['decompress']),
+                                                                 _ms(value['parse']), _ms(value['build'])))
+
+        lines.append('')
+        lines.append('{:<32} {:>12} {:>14}'.format('phase', 'time (ms)', 'peak (kB)'))
+
+        for name, value in six.iteritems(self.phases):
+            lines.append('{:<32} {:>12} {:>14}'.format(name, _ms(value['time']), _kb(value['peak_memory'])))
+
+        lines.append('')
+        lines.append('{:<32} {:>12}'.format('element', 'count'))
+
+        for name, count in self.elements.most_common():
+            lines.append('{:<32} {:>12}'.format(name, count))
+
+        if self.merged_runs:
+            lines.append('{:<32} {:>12}'.format('merged runs', self.merged_runs))
+
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format_report()
+
+
+class _NoStats(object):
+    "Stats object used when stats are not collected. Phase is a context manager which does nothing."
+
+    def add_file(self, file_name, size, decompress, parse, build):
+        pass
+
+    def phase(self, name):
+        return self
+
+    def count_elements(self, document):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NO_STATS = _NoStats()
+
+
+def parse_from_file(file_object, engine='tree', lazy=False, workers=1, merge_runs=False, stats=None):
     """Parses existing OOXML file.
 
+    Relationships, comments, footnotes, endnotes and numbering can be parsed on demand. In lazy
+    mode they are read from the file and parsed on first access to the document attribute.
+    Styles used only in these parts are marked as used when the part is parsed. File object must
+    not be closed before that.
+
+    With more than one worker files are decompressed and their XML is parsed concurrently using
+    :class:`ConcurrentReader`. Document model is still built in the same order as without workers.
+
+    Adjacent runs with the same formatting can be merged into one text element while parsing.
+    Number of merged runs is saved in the document as merged_runs.
+
+    Timings, memory usage and number of parsed elements are collected when :class:`ParseStats`
+    object is given.
+
     :Args:
       - file_object (:class:`ooxml.docx.DOCXFile`): OOXML file object
+      - engine (str): Engine used to parse 'document.xml'. Default engine "tree" parses entire XML
+        tree at once, "iterparse" parses it incrementally using :func:`iterparse_document` and
+        "target" builds the document model from the parser events using :func:`targetparse_document`.
+      - lazy (bool): Parse document parts on demand. False by default.
+      - workers (int): Number of threads used for reading and parsing XML files. 1 by default.
+      - merge_runs (bool): Merge adjacent runs with the same formatting. False by default.
+      - stats (:class:`ParseStats`): Object collecting stats. None by default.
 
     :Returns:
       Returns parsed document of type :class:`ooxml.doc.Document`
@@ -648,58 +1468,67 @@ def parse_from_file(file_object):
 
     logger.info('Parsing %s file.', file_object.file_name)
 
-    # Read the files
-    doc_content = file_object.read_file('document.xml')
+    if workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        file_names = ['styles.xml']
+
+        if engine == 'tree':
+            file_names.insert(0, 'document.xml')
+
+        if not lazy:
+            file_names += [file_name for _, files in DOCUMENT_PARTS for file_name, _, _, _ in files]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            reader = ConcurrentReader(file_object, executor, file_names)
+
+            return _parse_files(file_object, reader, engine, lazy, merge_runs, stats)
+
+    return _parse_files(file_object, file_object, engine, lazy, merge_runs, stats)
+
+
+def _parse_files(file_object, reader, engine, lazy, merge_runs, stats=None):
+    """Parses all the files from the OOXML file.
+
+    Files which are not parsed on demand are read using reader.
+    """
+
+    if stats is None:
+        stats = NO_STATS
 
     # Parse the document
-    document = parse_document(doc_content)
+    with stats.phase('document'):
+        size, decompress, parse = None, None, None
 
-    try:
-        style_content = file_object.read_file('styles.xml')
-        parse_style(document, style_content)
-    except KeyError:
-        logger.warning('Could not read styles.')
+        if engine == 'tree':
+            doc_content, size, decompress, parse = _read_xml(reader, 'document.xml')
 
-    try:
-        doc_rel_content = file_object.read_file('_rels/document.xml.rels')
-        parse_relationship(document, doc_rel_content, 'document')
-    except KeyError:
-        logger.warning('Could not read document relationships.')
+            start = timeit.default_timer()
+            document = parse_document(doc_content, merge_runs)
+        elif engine == 'iterparse':
+            start = timeit.default_timer()
 
-    try:
-        doc_rel_content = file_object.read_file('_rels/endnotes.xml.rels')
-        parse_relationship(document, doc_rel_content, 'endnotes')
-    except KeyError:
-        logger.warning('Could not read endnotes relationships.')
+            with file_object.open_file('document.xml') as doc_stream:
+                document = iterparse_document(doc_stream, merge_runs)
+        elif engine == 'target':
+            start = timeit.default_timer()
 
-    try:
-        doc_rel_content = file_object.read_file('_rels/footnotes.xml.rels')
-        parse_relationship(document, doc_rel_content, 'footnotes')
-    except KeyError:
-        logger.warning('Could not read footnotes relationships.')
+            with file_object.open_file('document.xml') as doc_stream:
+                document = targetparse_document(doc_stream, merge_runs)
+        else:
+            raise ValueError('Unknown parse engine "{}".'.format(engine))
 
-    try:
-        comments_content = file_object.read_file('comments.xml')
-        parse_comments(document, comments_content)
-    except KeyError:
-        logger.warning('Could not read comments.')
+        stats.add_file('document.xml', size, decompress, parse, timeit.default_timer() - start)
 
-    try:
-        footnotes_content = file_object.read_file('footnotes.xml')
-        parse_footnotes(document, footnotes_content)
-    except KeyError:
-        logger.warning('Could not read footnotes.')
+    with stats.phase('styles'):
+        _parse_part(document, reader, 'styles.xml', 'styles', parse_style, stats=stats)
 
-    try:
-        endnotes_content = file_object.read_file('endnotes.xml')
-        parse_endnotes(document, endnotes_content)
-    except KeyError:
-        logger.warning('Could not read endnotes.')
+    for part, files in DOCUMENT_PARTS:
+        if lazy:
+            document.add_part_loader(part, _part_loader(file_object, part, files, stats))
+        else:
+            _part_loader(reader, part, files, stats)(document)
 
-    try:
-        numbering_content = file_object.read_file('numbering.xml')
-        parse_numbering(document, numbering_content)
-    except KeyError:
-        logger.warning('Could not read numbering.')
+    stats.count_elements(document)
 
     return document
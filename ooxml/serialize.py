@@ -26,10 +26,18 @@ Hooks:
     def hook_paragraph(ctx, document, elem):
         pass
 
+Hooks can be wrapped with :class:`Hook` to be called only for the elements with certain style,
+class or run properties.
+
+Time spent in serializers and hooks can be measured with :class:`Profiler`.
+
 """
 
 import os.path
 import six
+import copy
+import inspect
+import timeit
 import collections
 import math
 
@@ -54,15 +62,12 @@ def _get_font_size(document, style):
       Returns font size as a number. -1 if it can not get font size.
     """
 
-    font_size = style.get_font_size()
+    resolved = document.styles.resolve(style.style_id)
 
-    if  font_size == -1:
-        if style.based_on:
-            based_on = document.styles.get_by_id(style.based_on)
-            if based_on:
-                return _get_font_size(document, based_on)
+    if resolved is None or resolved.style is not style:
+        resolved = doc.resolve_style(document.styles, style)
 
-    return font_size
+    return resolved.font_size
 
 def _get_based_on(styles, name):
     for _, values in styles.items():
@@ -209,7 +214,8 @@ def open_list(ctx, document, par, root, elem):
 
 #        if ctx.numid is not None and par.numid > ctx.numid:
 #            if ctx.numid != None:   
-        if par.numid > ctx.numid:
+        # None is smaller than any number, like it is in Python 2
+        if ctx.numid is None or par.numid > ctx.numid:
             fmt = _get_numbering(document, par.numid, par.ilvl)
             _ls = etree.SubElement(root, _get_numbering_tag(fmt))
             fire_hooks(ctx, document, par, _ls, ctx.get_hook(_get_numbering_tag(fmt)))
@@ -231,6 +237,75 @@ def open_list(ctx, document, par, root, elem):
     return root
 
 
+class _TextBuffer(object):
+    """Collects text which is added to an element and to its last child.
+
+    Text of the lxml element is set only once, when the buffer is flushed. Adding text of every run
+    directly to the element creates a new string every time and it is slow for paragraphs with
+    thousands of runs.
+
+    Buffer has to be flushed before someone else changes the element and synced after that.
+    """
+
+    def __init__(self, elem):
+        self.elem = elem
+        self.last = None
+        self.text = None
+        self.last_text = None
+        self.last_tail = None
+
+        self.sync()
+
+    def sync(self):
+        "Flush the buffer and find the last child of the element again."
+
+        self.flush()
+
+        try:
+            self.last = self.elem[-1]
+        except IndexError:
+            self.last = None
+
+    def flush(self):
+        if self.text is not None:
+            self.elem.text = u''.join(self.text)
+            self.text = None
+
+        if self.last_text is not None:
+            self.last.text = u''.join(self.last_text)
+            self.last_text = None
+
+        if self.last_tail is not None:
+            self.last.tail = u''.join(self.last_tail)
+            self.last_tail = None
+
+    def has_tail(self):
+        return self.last_tail is not None or self.last.tail is not None
+
+    def add_text(self, value):
+        if self.text is None:
+            self.text = [self.elem.text or u'']
+
+        self.text.append(u'{}'.format(value))
+
+    def add_last_text(self, value):
+        if self.last_text is None:
+            self.last_text = [self.last.text or u'']
+
+        self.last_text.append(u'{}'.format(value))
+
+    def add_last_tail(self, value):
+        if self.last_tail is None:
+            self.last_tail = [self.last.tail or u'']
+
+        self.last_tail.append(u'{}'.format(value))
+
+    def append(self, child):
+        self.flush()
+        self.elem.append(child)
+        self.last = child
+
+
 ###############################################################################
 ## SERIALIZER HOOKS
 ###############################################################################
@@ -272,24 +347,24 @@ def serialize_link(ctx, document, elem, root):
     """
 
     _a = etree.SubElement(root, 'a')
+    buf = _TextBuffer(_a)
+    dispatch = ctx.dispatch
 
     for el in elem.elements:
-        _ser = ctx.get_serializer(el)
+        _ser = dispatch[type(el)]
 
         if _ser:
+            buf.flush()
             _td = _ser(ctx, document, el, _a)
+            buf.sync()
         else:
             if isinstance(el, doc.Text):
-                children = list(_a)
-
-                if len(children) == 0:
-                    _text = _a.text or u''
-
-                    _a.text = u'{}{}'.format(_text, el.value())
+                if buf.last is None:
+                    buf.add_text(el.value())
                 else:
-                    _text = children[-1].tail or u''
+                    buf.add_last_tail(el.value())
 
-                    children[-1].tail = u'{}{}'.format(_text, el.value())
+    buf.flush()
    
     if elem.rid in document.relationships[ctx.options['relationship']]:
         _a.set('href', document.relationships[ctx.options['relationship']][elem.rid].get('target', ''))
@@ -319,10 +394,106 @@ def serialize_image(ctx, document, elem, root):
     return root
 
 
+class Hook(object):
+    """Hook which is called only for the elements matching the filter.
+
+    Filter is declared when the hook is created, so hooks don't have to check every element
+    themselves. Hooks filtered by style are found using the style of the element, without calling
+    the other style hooks at all.
+
+    .. code-block:: python
+
+        opts = {
+            'hooks': {
+                'p': [Hook(check_for_quote, style_id='Quote'), Hook(check_for_bold, rpr=['b'])]
+            }
+        }
+
+    :Args:
+      - func: Hook function
+      - style_id: Style identifier or list of style identifiers of the element
+      - element_class: Class or tuple of classes of the element
+      - rpr: Keys which must be in the run properties of the element
+    """
+
+    def __init__(self, func, style_id=None, element_class=None, rpr=None):
+        self.func = func
+
+        if style_id is None or isinstance(style_id, six.string_types):
+            self.style_ids = style_id and frozenset([style_id])
+        else:
+            self.style_ids = frozenset(style_id)
+
+        self.element_class = element_class
+        self.rpr = (rpr, ) if isinstance(rpr, six.string_types) else tuple(rpr or ())
+
+    def check(self, elem):
+        "Checks element class and run properties of the element."
+
+        if self.element_class is not None and not isinstance(elem, self.element_class):
+            return False
+
+        if self.rpr:
+            rpr = getattr(elem, 'rpr', None) or {}
+
+            for key in self.rpr:
+                if key not in rpr:
+                    return False
+
+        return True
+
+    def __call__(self, ctx, document, elem, element):
+        return self.func(ctx, document, elem, element)
+
+
+class HookList(list):
+    """List of hooks compiled for fast filtering.
+
+    For every style used by :class:`Hook` filters we prepare list of hooks which should be called for
+    elements with that style. Hooks are called in the same order they were defined in.
+
+    :Args:
+      - hooks (list): Hook functions and :class:`Hook` objects
+    """
+
+    def __init__(self, hooks):
+        super(HookList, self).__init__(hooks)
+
+        def _style_ids(hook):
+            return getattr(hook, 'style_ids', None)
+
+        self.default = [hook for hook in self if not _style_ids(hook)]
+        self.by_style = {}
+
+        for hook in self:
+            for style_id in _style_ids(hook) or ():
+                self.by_style[style_id] = [h for h in self if not _style_ids(h) or style_id in _style_ids(h)]
+
+        self.has_checks = any(isinstance(hook, Hook) and (hook.element_class is not None or hook.rpr) for hook in self)
+
+    def select(self, elem):
+        """Returns hooks which should be called for the element.
+
+        :Args:
+          - elem (:class:`ooxml.doc.Element`): Element which we serialized
+        """
+
+        hooks = self.default
+
+        if self.by_style:
+            hooks = self.by_style.get(getattr(elem, 'style_id', None), hooks)
+
+        if self.has_checks:
+            return [hook for hook in hooks if not isinstance(hook, Hook) or hook.check(elem)]
+
+        return hooks
+
+
 def fire_hooks(ctx, document, elem, element, hooks):
     """Fire hooks on newly created element.
 
-    For each newly created element we will try to find defined hooks and execute them.
+    For each newly created element we will try to find defined hooks and execute them. If hooks
+    are compiled into :class:`HookList` only hooks matching the element are called.
 
     :Args:
       - ctx (:class:`Context`): Context object
@@ -335,6 +506,9 @@ def fire_hooks(ctx, document, elem, element, hooks):
     if not hooks:
         return
 
+    if type(hooks) is HookList:
+        hooks = hooks.select(elem)
+
     for hook in hooks:
         hook(ctx, document, elem, element)
 
@@ -489,17 +663,12 @@ def get_all_styles(document, style):
       List of style objects.
     """
 
-    classes = []
+    resolved = document.styles.resolve(style.style_id)
 
-    while True:
-        classes.insert(0, get_style_name(style))
-
-        if style.based_on:
-            style = document.styles.get_by_id(style.based_on)
-        else:
-            break
+    if resolved is None or resolved.style is not style:
+        resolved = doc.resolve_style(document.styles, style)
 
-    return classes
+    return list(resolved.style_ids)
 
 
 def get_css_classes(document, style):
@@ -517,8 +686,8 @@ def get_css_classes(document, style):
     >>> get_css_classes(doc, st)
     'header1 normal'
     """
-    lst = [st.lower() for st in get_all_styles(document, style)[-1:]] + \
-        ['{}-fontsize'.format(st.lower()) for st in get_all_styles(document, style)[-1:]]
+    style_ids = get_all_styles(document, style)[-1:]
+    lst = [st.lower() for st in style_ids] + ['{}-fontsize'.format(st.lower()) for st in style_ids]
 
     return ' '.join(lst)
 
@@ -550,14 +719,19 @@ def serialize_paragraph(ctx, document, par, root, embed=True):
     if style:
         max_font_size = _get_font_size(document, style)
 
+    buf = _TextBuffer(elem)
+    dispatch = ctx.dispatch
+
     for el in par.elements:
-        _serializer =  ctx.get_serializer(el)
+        _serializer = dispatch[type(el)]
 
         if _serializer:
+            buf.flush()
             _serializer(ctx, document, el, elem)
+            buf.sync()
 
         if isinstance(el, doc.Text):
-            children = list(elem)
+            last = buf.last
             _text_style = get_style_css(ctx, el)
             _text_class = el.rpr.get('style', '').lower()
 
@@ -624,43 +798,36 @@ def serialize_paragraph(ctx, document, par, root, embed=True):
 
             was_inserted = False
 
-            if len(children) > 0:
-                _child_style = children[-1].get('style') or ''
-                _child_class = children[-1].get('class', '')
+            if last is not None:
+                _child_style = last.get('style') or ''
+                _child_class = last.get('class', '')
 
-                if new_element.tag == children[-1].tag and ((_text_class == _child_class or _child_class == '') and (_text_style == _child_style or _child_style == '')) and children[-1].tail is None:
-                    txt = children[-1].text or ''
-                    txt2 = new_element.text or ''
-                    children[-1].text = u'{}{}'.format(txt, txt2)  
+                if new_element.tag == last.tag and ((_text_class == _child_class or _child_class == '') and (_text_style == _child_style or _child_style == '')) and not buf.has_tail():
+                    buf.add_last_text(new_element.text or '')
                     was_inserted = True
 
                 if not was_inserted:
                     if _style == _text_style  and new_element.tag == 'span' and (_text_class == _child_class or _child_class == ''):
-                        _e = children[-1]
-
-                        txt = _e.tail or ''
-                        _e.tail = u'{}{}'.format(txt, new_element.text)
+                        buf.add_last_tail(new_element.text)
                         was_inserted = True
   
                     if not was_inserted and new_element.tag == 'span' and (_text_class != _child_class):
-                        _e = children[-1]
-                        txt = _e.tail or ''
-                        _e.tail = u'{}{}'.format(txt, new_element.text)
+                        buf.add_last_tail(new_element.text)
                         was_inserted = True       
 
             if not was_inserted:
-                _child_class = new_element.get('class', '')
-                try:
-                    _child_class = children[-1].get('class', '')
-                except:
+                if last is not None:
+                    _child_class = last.get('class', '')
+                else:
                     _child_class = ''
 
                 if _style ==  _text_style  and new_element.tag == 'span' and (_text_class == _child_class):
-                    txt = elem.text or ''
-                    elem.text = u'{}{}'.format(txt, new_element.text)
+                    buf.add_text(new_element.text)
                 else:
                     if new_element.text != u'':
-                        elem.append(new_element)
+                        buf.append(new_element)
+
+    buf.flush()
     
     if not par.is_dropcap() and par.ilvl == None:
         if style:
@@ -802,23 +969,24 @@ def serialize_smarttag(ctx, document, el, root):
     else:
         _span = root
 
+    buf = _TextBuffer(_span)
+    dispatch = ctx.dispatch
+
     for elem in el.elements:
-        _ser = ctx.get_serializer(elem)
+        _ser = dispatch[type(elem)]
 
         if _ser:
+            buf.flush()
             _td = _ser(ctx, document, elem, _span)
+            buf.sync()
         else:
             if isinstance(elem, doc.Text):
-                children = list(_span)
-
-                if len(children) == 0:
-                    _text = _span.text or u''
-
-                    _span.text = u'{}{}'.format(_text, elem.text)
+                if buf.last is None:
+                    buf.add_text(elem.text)
                 else:
-                    _text = children[-1].tail or u''
+                    buf.add_last_tail(elem.text)
 
-                    children[-1].tail = u'{}{}'.format(_text, elem.text)
+    buf.flush()
 
     fire_hooks(ctx, document, el, _span, ctx.get_hook('smarttag'))
 
@@ -862,7 +1030,7 @@ def serialize_table(ctx, document, table, root):
 
             for elem in cell.elements:
                 if isinstance(elem, doc.Paragraph):
-                    _ser = ctx.get_serializer(elem)
+                    _ser = ctx.dispatch[type(elem)]
                     _td = _ser(ctx, document, elem, _td, embed=False)
 
             if ctx.ilvl != None:
@@ -885,8 +1053,10 @@ def serialize_textbox(ctx, document, txtbox, root):
     _div = etree.SubElement(root, 'div')
     _div.set('class', 'textbox')
 
+    dispatch = ctx.dispatch
+
     for elem in txtbox.elements:
-        _ser = ctx.get_serializer(elem)
+        _ser = dispatch[type(elem)]
 
         if _ser:
             _ser(ctx, document, elem, _div)
@@ -1056,10 +1226,173 @@ DEFAULT_OPTIONS = {
     'smarttag_span': False,
     'comment_span': False,
     'pretty_print': True,
-    'relationship': 'document'
+    'relationship': 'document',
+    'profiler': None
 }
 
 
+class SerializerDispatch(dict):
+    """Maps element types to their serializers.
+
+    Serializer for the type is found by checking the classes in its method resolution order, so
+    subclasses of the document elements use serializer of their parent class unless they have their
+    own. Type is resolved only on the first lookup and the result is cached, including types without
+    a serializer.
+
+    .. code-block:: python
+
+        dispatch = SerializerDispatch(serializers)
+        _ser = dispatch[type(elem)]
+
+    :Args:
+      - serializers (dict): Serializers for the element types
+    """
+
+    def __init__(self, serializers):
+        super(SerializerDispatch, self).__init__()
+
+        self.serializers = serializers
+
+    def __missing__(self, cls):
+        serializer = None
+
+        for base in inspect.getmro(cls):
+            if base in self.serializers:
+                serializer = self.serializers[base]
+                break
+
+        self[cls] = serializer
+
+        return serializer
+
+
+class Profiler(object):
+    """Collects timing of the serializers and hooks.
+
+    Profiler is enabled by passing it to the serialization as an option. Every serializer and hook
+    found by the context is then wrapped with a function measuring it, so there is no overhead
+    when profiler is not used. Same profiler can be used for more serializations, for instance for
+    all chapters of the book.
+
+    .. code-block:: python
+
+        profiler = serialize.Profiler()
+        serialize.serialize(document, {'profiler': profiler})
+
+        six.print_(profiler.format_report())
+
+    Time of the serializer includes time spent in serializers of its child elements and in hooks.
+    Profiler does not work with chapters serialized in more worker processes.
+    """
+
+    def __init__(self):
+        self.serializers = {}
+        self.hooks = {}
+
+    def wrap(self, stats, key, func):
+        """Returns function which calls func and adds its timing to the stats.
+
+        :Args:
+          - stats (dict): Dictionary with collected timings
+          - key (str): Name under which timing is collected
+          - func: Function to measure
+        """
+
+        def _wrapper(*args, **kwargs):
+            start = timeit.default_timer()
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = timeit.default_timer() - start
+                value = stats.get(key, None)
+
+                if value is None:
+                    stats[key] = [1, duration, duration]
+                else:
+                    value[0] += 1
+                    value[1] += duration
+
+                    if duration > value[2]:
+                        value[2] = duration
+
+        return _wrapper
+
+    def wrap_serializer(self, cls, func):
+        "Returns serializer which is measured under the name of element class."
+
+        return self.wrap(self.serializers, cls.__name__, func)
+
+    def wrap_hook(self, name, hook):
+        "Returns hook which is measured under the name of the hook and hook function."
+
+        if isinstance(hook, Hook):
+            hook = copy.copy(hook)
+            hook.func = self.wrap_hook(name, hook.func)
+
+            return hook
+
+        key = '{}: {}'.format(name, getattr(hook, '__name__', type(hook).__name__))
+
+        return self.wrap(self.hooks, key, hook)
+
+    def report(self):
+        """Returns collected timings.
+
+        :Returns:
+          Dictionary with keys 'serializers' and 'hooks'. Each one has dictionary with calls, total and
+          max time in seconds for every serialized element type or hook.
+        """
+
+        def _report(stats):
+            return dict((key, {'calls': calls, 'total': total, 'max': maximum})
+                        for key, (calls, total, maximum) in six.iteritems(stats))
+
+        return {'serializers': _report(self.serializers), 'hooks': _report(self.hooks)}
+
+    def format_report(self):
+        """Returns collected timings as a printable table.
+
+        Rows are sorted by total time. Times are in milliseconds.
+        """
+
+        lines = ['{:<40} {:>10} {:>12} {:>10}'.format('name', 'calls', 'total (ms)', 'max (ms)')]
+
+        for title, stats in [('serializers', self.serializers), ('hooks', self.hooks)]:
+            lines.append(title)
+
+            for key, (calls, total, maximum) in sorted(six.iteritems(stats), key=lambda item: -item[1][1]):
+                lines.append('  {:<38} {:>10} {:>12.3f} {:>10.3f}'.format(key, calls, total * 1000, maximum * 1000))
+
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format_report()
+
+
+class ProfilingDispatch(SerializerDispatch):
+    """Maps element types to serializers which are measured by the profiler.
+
+    :Args:
+      - serializers (dict): Serializers for the element types
+      - profiler (:class:`Profiler`): Profiler collecting the timings
+    """
+
+    def __init__(self, serializers, profiler):
+        super(ProfilingDispatch, self).__init__(serializers)
+
+        self.profiler = profiler
+
+    def __missing__(self, cls):
+        serializer = super(ProfilingDispatch, self).__missing__(cls)
+
+        if serializer is not None:
+            serializer = self.profiler.wrap_serializer(cls, serializer)
+            self[cls] = serializer
+
+        return serializer
+
+
 class Context:
     """Context object used during the serialization.
 
@@ -1069,9 +1402,13 @@ class Context:
       - document (:class:`ooxml.doc.Document`): Document object
       - options (dict): Optional dictionary with options
 
+    Serializers are resolved only once for every element type using :class:`SerializerDispatch`.
+    Serializers should not be changed after the context was created.
+
     Options:
-      - serializers (dict):!
-      - hooks (dict):
+      - serializers (dict): Serializers for the element types. Subclasses use serializer of their parent class.
+      - hooks (dict): Lists of hooks for the generated elements. Check :class:`Hook` for filtered hooks.
+      - profiler (:class:`Profiler`): None is a default option. If defined timing of serializers and hooks is collected
       - header (:class:`HeaderContext`): Reference to a class
       - scale_to_size: None is a default option. If defined as int will be used as base font size for the text
       - empty_paragraph_as_nbsp: False is a default option. If True it will insert &nbsp; inside of empty paragraphs
@@ -1083,16 +1420,29 @@ class Context:
         if options:
             for opt_key, opt_value in six.iteritems(options):
                 if type(opt_value) == type({}):
+                    # Don't change default options
+                    self.options[opt_key] = dict(self.options[opt_key])
                     self.options[opt_key].update(opt_value)
                 else:
                     self.options[opt_key] = opt_value
 
+        self.profiler = self.options.get('profiler', None)
+
+        if self.profiler is not None:
+            self.dispatch = ProfilingDispatch(self.options['serializers'], self.profiler)
+        else:
+            self.dispatch = SerializerDispatch(self.options['serializers'])
+
+        self._hooks = {}
+
         self.reset()
         self.header.init(document)
 
     def get_hook(self, name):
         """Get reference to a specific hook.
 
+        Hooks are compiled into :class:`HookList` the first time they are needed.
+
         :Args:
           - name (str): Hook name
 
@@ -1100,7 +1450,20 @@ class Context:
           List with defined hooks. None if it is not found.
         """
 
-        return self.options['hooks'].get(name, None)
+        try:
+            return self._hooks[name]
+        except KeyError:
+            hooks = self.options['hooks'].get(name, None)
+
+            if hooks:
+                if self.profiler is not None:
+                    hooks = [self.profiler.wrap_hook(name, hook) for hook in hooks]
+
+                hooks = HookList(hooks)
+
+            self._hooks[name] = hooks
+
+            return hooks
 
     def get_serializer(self, node):
         """Returns serializer for specific element.
@@ -1109,15 +1472,11 @@ class Context:
           - node (:class:`ooxml.doc.Element`): Element object 
 
         :Returns:
-          Returns reference to a function which will be used for serialization.
+          Returns reference to a function which will be used for serialization. None if element
+          does not have a serializer.
         """
 
-        return self.options['serializers'].get(type(node), None)
-
-        if type(node) in self.options['serializers']:
-            return self.options['serializers'][type(node)]
-
-        return None
+        return self.dispatch[type(node)]
 
     def reset(self):
         self.ilvl = None
@@ -1191,16 +1550,7 @@ def serialize_styles(document, prefix='', options=None):
 
     # get style content for all styles
     for style_id in set(all_styles):
-        style = document.styles.get_by_id(style_id)
-        styles = []
-
-        while True:
-            styles.insert(0, style)
-
-            if style.based_on:
-                style = document.styles.get_by_id(style.based_on)
-            else:
-                break
+        styles = list(reversed(document.styles.resolve(style_id).chain))
 
         content = "\n".join([get_style_css(ctx, st, embed=False, fontsize=1) for st in styles])
         css_content += "{0} .{1} {{ {2} }}\n\n".format(prefix, style_id.lower(), content)
@@ -1212,6 +1562,31 @@ def serialize_styles(document, prefix='', options=None):
 
 # Serialize list of elements into HTML
 
+def build_elements(ctx, document, elements):
+    """Serialize list of elements into lxml tree.
+
+    :Args:
+      - ctx (:class:`Context`): Context object
+      - document (:class:`ooxml.doc.Document`): Document object
+      - elements (list): List of elements
+
+    :Returns:
+      Returns root element of type **div** holding HTML representation of the elements.
+    """
+    tree_root = root = etree.Element('div')
+
+    for elem in elements:
+        _ser = ctx.get_serializer(elem)
+
+        if _ser:
+            root = _ser(ctx, document, elem, root)
+
+    # TODO:
+    # - create footnotes now
+
+    return tree_root
+
+
 def serialize_elements(document, elements, options=None):
     """Serialize list of elements into HTML string.
 
@@ -1225,7 +1600,54 @@ def serialize_elements(document, elements, options=None):
     """    
     ctx = Context(document, options)
 
+    tree_root = build_elements(ctx, document, elements)
+
+    return etree.tostring(tree_root, pretty_print=ctx.options.get('pretty_print', True), encoding="utf-8", xml_declaration=False)
+
+
+def _write_children(output, tree_root, count, pretty_print):
+    """Writes first count elements of the tree root to the file object and removes them from the tree."""
+
+    for _ in range(count):
+        elem = tree_root[0]
+
+        if pretty_print and elem.tail is None:
+            # Serialize it inside of the root element to get the same indentation as in the entire tree
+            wrapper = etree.Element('div')
+            wrapper.append(elem)
+
+            output.write(etree.tostring(wrapper, pretty_print=True, encoding="utf-8", xml_declaration=False)[6:-7])
+        else:
+            tree_root.remove(elem)
+
+            output.write(etree.tostring(elem, encoding="utf-8", xml_declaration=False))
+
+
+def write_elements(document, elements, output, options=None):
+    """Serialize list of elements into HTML and write it to the file object.
+
+    Output is the same as the one from :func:`serialize_elements` but HTML of every top level element
+    is written as soon as it is serialized and it is removed from the tree. Opened list is kept in
+    the tree until it is closed. Hooks should not keep references to already written elements
+    and change them later.
+
+    .. code-block:: python
+
+        with open('document.html', 'wb') as f:
+            serialize.write_elements(document, document.elements, f)
+
+    :Args:
+      - document (:class:`ooxml.doc.Document`): Document object
+      - elements (list): List of elements
+      - output (file): File object opened in binary mode
+      - options (dict): Optional dictionary with :class:`Context` options
+    """
+
+    ctx = Context(document, options)
+    pretty_print = ctx.options.get('pretty_print', True)
+
     tree_root = root = etree.Element('div')
+    is_empty = True
 
     for elem in elements:
         _ser = ctx.get_serializer(elem)
@@ -1233,10 +1655,36 @@ def serialize_elements(document, elements, options=None):
         if _ser:
             root = _ser(ctx, document, elem, root)
 
-    # TODO:
-    # - create footnotes now
+        # Last element could still be changed by the next one, for instance when we are in the list
+        if len(tree_root) > 1:
+            if is_empty:
+                output.write(six.b('<div>\n') if pretty_print else six.b('<div>'))
+                is_empty = False
 
-    return etree.tostring(tree_root, pretty_print=ctx.options.get('pretty_print', True), encoding="utf-8", xml_declaration=False)
+            _write_children(output, tree_root, len(tree_root) - 1, pretty_print)
+
+    if is_empty and len(tree_root) == 0:
+        output.write(six.b('<div/>\n') if pretty_print else six.b('<div/>'))
+        return
+
+    if is_empty:
+        output.write(six.b('<div>\n') if pretty_print else six.b('<div>'))
+
+    _write_children(output, tree_root, len(tree_root), pretty_print)
+
+    output.write(six.b('</div>\n') if pretty_print else six.b('</div>'))
+
+
+def write(document, output, options=None):
+    """Serialize entire document into HTML and write it to the file object.
+
+    :Args:
+      - document (:class:`ooxml.doc.Document`): Document object
+      - output (file): File object opened in binary mode
+      - options (dict): Optional dictionary with :class:`Context` options
+    """
+
+    write_elements(document, document.elements, output, options)
 
 
 def serialize(document, options=None):
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""Extract plain text from the document.
+
+Text is read directly from 'document.xml' using lxml parser target. Document model is not built
+and styles or other parts of the document are not read at all. Use it when you only need text of
+the document, for instance for indexing.
+
+.. code-block:: python
+
+    import ooxml
+
+    text = ooxml.extract_text('document.docx')
+
+.. moduleauthor:: Aleksandar Erkalovic <aerkalov@gmail.com>
+
+"""
+
+from lxml import etree
+
+from .names import MC_FALLBACK, W_BR, W_P, W_SDT, W_T, W_VAL, W_V_MERGE
+
+# Size of the chunks read from 'document.xml'
+CHUNK_SIZE = 64 * 1024
+
+
+class _TextTarget(object):
+    """Parser target collecting text of the paragraphs.
+
+    Paragraphs inside of text boxes are collected after the paragraph holding the text box. Table
+    of contents and fallback content for the text boxes are skipped, the same way parser does it.
+    """
+
+    def __init__(self):
+        self.paragraphs = []
+        self._stack = []
+        self._texts = None
+        self._pending = []
+        self._in_text = False
+        self._depth = 0
+        self._skip = None
+
+    def start(self, tag, attrib):
+        self._depth += 1
+
+        if self._skip is not None:
+            return
+
+        if tag == W_P:
+            self._stack.append((self._texts, self._pending))
+            self._texts = []
+            self._pending = []
+        elif self._texts is None:
+            # Table of contents is not part of the document model
+            if tag == W_SDT:
+                self._skip = self._depth
+            # Vertically merged cells are not part of the document model. Skip entire cell.
+            elif tag == W_V_MERGE and W_VAL not in attrib:
+                self._skip = self._depth - 2
+        elif tag == W_T:
+            self._in_text = True
+        elif tag == W_BR:
+            self._texts.append(u'\n')
+        elif tag == MC_FALLBACK:
+            self._skip = self._depth
+
+    def end(self, tag):
+        depth = self._depth
+        self._depth -= 1
+
+        if self._skip is not None:
+            if self._skip == depth:
+                self._skip = None
+
+            return
+
+        if tag == W_T:
+            self._in_text = False
+        elif tag == W_P:
+            text = u''.join(self._texts)
+            pending = self._pending
+            self._texts, self._pending = self._stack.pop()
+
+            if self._texts is None:
+                self.paragraphs.append(text)
+                self.paragraphs.extend(pending)
+            else:
+                self._pending.append(text)
+                self._pending.extend(pending)
+
+    def data(self, data):
+        if self._in_text and self._skip is None:
+            self._texts.append(data)
+
+    def close(self):
+        return None
+
+
+def iter_paragraphs(source, chunk_size=CHUNK_SIZE):
+    """Returns generator which yields text of every paragraph in the document.
+
+    Paragraphs inside of tables and text boxes are included. Paragraphs are yielded as soon as
+    they are parsed and only part of the file is kept in the memory. Line breaks are returned as
+    new lines.
+
+    :Args:
+      - source: File like object with content of the 'document.xml'
+      - chunk_size (int): Number of bytes read at once
+
+    :Returns:
+      Generator which yields text of the paragraphs.
+    """
+
+    target = _TextTarget()
+    parser = etree.XMLParser(target=target, huge_tree=True)
+
+    while True:
+        chunk = source.read(chunk_size)
+
+        if not chunk:
+            break
+
+        parser.feed(chunk)
+
+        if target.paragraphs:
+            for text in target.paragraphs:
+                yield text
+
+            del target.paragraphs[:]
+
+    parser.close()
+
+    for text in target.paragraphs:
+        yield text
+
+
+def extract_text(file_name, separator=u'\n'):
+    """Returns text of the OOXML file.
+
+    Only 'document.xml' is read. Footnotes, endnotes and comments are not included.
+
+    :Args:
+      - file_name (str): Path to OOXML file
+      - separator (str): String placed between the paragraphs
+
+    :Returns:
+      Returns text of all the paragraphs.
+    """
+    from .docxfile import DOCXFile
+
+    dfile = DOCXFile(file_name)
+
+    try:
+        with dfile.open_file('document.xml') as source:
+            return separator.join(iter_paragraphs(source))
+    finally:
+        dfile.close()
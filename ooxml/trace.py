@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+"""Trace the conversion in Chrome trace event format.
+
+While the tracer is running, reading of the OOXML file, parsing of the document and its parts,
+splitting of the document into chapters, serialization of the chapters and calls of
+:func:`lxml.etree.tostring` made by the serializer and the importer are recorded as spans.
+Saved JSON file can be opened in Perfetto (https://ui.perfetto.dev) or in chrome://tracing.
+
+.. code-block:: python
+
+    from ooxml import trace
+
+    with trace.Tracer() as tracer:
+        dfile = ooxml.read_from_file('document.docx')
+        chapters = importer.get_chapters(dfile.document)
+
+    tracer.save('trace.json')
+
+Tracing of every paragraph, table and run is very slow and gives huge traces, so the parse
+functions called for every element are traced only with ``Tracer(detailed=True)``.
+
+Traced functions are replaced with wrappers only while the tracer is running and original
+functions are restored after that, so there is no overhead when tracing is not used. Functions
+from :mod:`lxml` are wrapped only in the ooxml modules, other users of lxml are not affected.
+Only one tracer can run at the same time. Chapters serialized in worker processes are not traced.
+Calls which raise an exception are also recorded, with the error in the arguments of the span.
+
+.. moduleauthor:: Aleksandar Erkalovic <aerkalov@gmail.com>
+
+"""
+
+import os
+import json
+import timeit
+import threading
+
+import six
+from lxml import etree
+
+from . import parse, importer, serialize, docxfile
+
+
+def _count(name, value):
+    return {name: len(value)}
+
+
+def _elements(args, result):
+    return _count('elements', result.elements)
+
+
+def _part(name):
+    "Returns function which counts items in the document part after it was parsed."
+
+    return lambda args, result: _count(name, getattr(args[0], name))
+
+
+# Functions which return arguments of the span from the arguments and result of the traced function
+SPAN_ARGS = {
+    'DOCXFile.reset': lambda args, result: {'file': args[0].file_name},
+    'DOCXFile.read_file': lambda args, result: {'file': args[1], 'size': len(result)},
+    'parse_from_file': _elements,
+    'parse_document': _elements,
+    'iterparse_document': _elements,
+    'targetparse_document': _elements,
+    'parse_paragraph': _elements,
+    'parse_table': lambda args, result: _count('rows', result.rows),
+    'parse_style': lambda args, result: _count('styles', args[0].styles.styles),
+    'parse_comments': _part('comments'),
+    'parse_footnotes': _part('footnotes'),
+    'parse_endnotes': _part('endnotes'),
+    'parse_numbering': _part('numbering'),
+    'split_document': lambda args, result: _count('chapters', result),
+    'mark_styles': lambda args, result: {'elements': len(args[2]), 'markers': len(result)},
+    'find_important': lambda args, result: {'headers': len(args[2]), 'chapters': len(result)},
+    '_serialize_chapter': lambda args, result: {'chapter': args[1], 'elements': len(args[2])},
+    'etree.tostring': lambda args, result: _count('size', result)
+}
+
+# Parse functions traced by default, they are called once for the document or its part
+PARSE_FUNCTIONS = ['parse_from_file', 'parse_document', 'iterparse_document', 'targetparse_document', 'parse_style',
+                   'parse_relationship', 'parse_comments', 'parse_footnotes', 'parse_endnotes', 'parse_numbering']
+
+# Modules which call lxml.etree.tostring
+TOSTRING_MODULES = [importer, serialize]
+
+# Tracer which is running at the moment
+_active = None
+
+
+class _Etree(object):
+    "Used instead of :mod:`lxml.etree` in the traced module, with traced tostring."
+
+    def __init__(self, tostring):
+        self.tostring = tostring
+
+    def __getattr__(self, name):
+        return getattr(etree, name)
+
+
+class Tracer(object):
+    """Records spans of the conversion as trace events.
+
+    Every span is saved as complete event with the name of the traced function, its start and
+    duration in microseconds and arguments with number of elements it worked on.
+
+    Tracer replaces functions in the ooxml modules, so it traces every conversion running in the
+    process at that time. It is not safe to start or stop it while another thread is converting
+    a document.
+
+    :Args:
+      - detailed (bool): Also trace parsing of every paragraph, table and run
+    """
+
+    def __init__(self, detailed=False):
+        self.detailed = detailed
+        self.events = []
+        self._patches = []
+        self._start = 0
+
+    def add_span(self, name, category, start, end, args=None):
+        """Adds complete event to the trace.
+
+        :Args:
+          - name (str): Name of the span
+          - category (str): Category of the span
+          - start (float): Start time from :func:`timeit.default_timer`
+          - end (float): End time from :func:`timeit.default_timer`
+          - args (dict): Optional arguments of the span
+        """
+
+        event = {'name': name,
+                 'cat': category,
+                 'ph': 'X',
+                 'ts': (start - self._start) * 1000000,
+                 'dur': (end - start) * 1000000,
+                 'pid': os.getpid(),
+                 'tid': threading.current_thread().ident}
+
+        if args:
+            event['args'] = args
+
+        self.events.append(event)
+
+    def wrap(self, func, name, category):
+        """Returns function which calls func and records its span.
+
+        :Args:
+          - func: Traced function
+          - name (str): Name of the span
+          - category (str): Category of the span
+        """
+
+        get_args = SPAN_ARGS.get(name, None)
+
+        def _wrapper(*args, **kwargs):
+            start = timeit.default_timer()
+            error = None
+
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                end = timeit.default_timer()
+
+                if error is not None:
+                    span_args = {'error': '{}: {}'.format(type(error).__name__, error)}
+                else:
+                    span_args = get_args(args, result) if get_args else None
+
+                self.add_span(name, category, start, end, span_args)
+
+            return result
+
+        _wrapper.__name__ = getattr(func, '__name__', name)
+        _wrapper.__doc__ = getattr(func, '__doc__', None)
+
+        return _wrapper
+
+    def _replace(self, container, key, value):
+        if isinstance(container, (dict, list)):
+            self._patches.append((container, key, container[key]))
+            container[key] = value
+        else:
+            self._patches.append((container, key, getattr(container, key)))
+            setattr(container, key, value)
+
+    def _install(self):
+        wrapped = {}
+
+        for name, func in list(six.iteritems(vars(parse))):
+            if not callable(func) or getattr(func, '__module__', None) != parse.__name__:
+                continue
+
+            if name in PARSE_FUNCTIONS or (self.detailed and name.startswith('parse_')):
+                wrapped[func] = self.wrap(func, name, 'parse')
+                self._replace(parse, name, wrapped[func])
+
+        # DOCXFile has its own reference to the parse function
+        self._replace(docxfile, 'parse_from_file', parse.parse_from_file)
+
+        # Parsers are also referenced from the tables
+        for tag, func in list(six.iteritems(parse.RUN_HANDLERS)):
+            if func in wrapped:
+                self._replace(parse.RUN_HANDLERS, tag, wrapped[func])
+
+        for _, files in parse.DOCUMENT_PARTS:
+            for n, (file_name, description, parse_func, args) in enumerate(files):
+                self._replace(files, n, (file_name, description, wrapped.get(parse_func, parse_func), args))
+
+        for name in ['split_document', 'mark_styles', 'find_important', '_serialize_chapter']:
+            self._replace(importer, name, self.wrap(getattr(importer, name), name, 'importer'))
+
+        for name in ['reset', 'read_file']:
+            method = vars(docxfile.DOCXFile)[name]
+            self._replace(docxfile.DOCXFile, name, self.wrap(method, 'DOCXFile.' + name, 'docxfile'))
+
+        tostring = self.wrap(etree.tostring, 'etree.tostring', 'lxml')
+
+        for module in TOSTRING_MODULES:
+            self._replace(module, 'etree', _Etree(tostring))
+
+    def start(self):
+        "Starts tracing."
+
+        global _active
+
+        if _active is not None:
+            raise RuntimeError('Tracer is already running.')
+
+        _active = self
+        self._start = timeit.default_timer()
+
+        try:
+            self._install()
+        except Exception:
+            self.stop()
+            raise
+
+    def stop(self):
+        "Stops tracing and restores original functions."
+
+        global _active
+
+        while self._patches:
+            container, key, value = self._patches.pop()
+
+            if isinstance(container, (dict, list)):
+                container[key] = value
+            else:
+                setattr(container, key, value)
+
+        _active = None
+
+    def __enter__(self):
+        self.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def to_dict(self):
+        """Returns trace in Chrome trace event format.
+
+        Events are sorted by start time. Outer span starting at the same time as inner span goes
+        first, so viewers nest them correctly.
+
+        :Returns:
+          Dictionary which can be serialized to JSON.
+        """
+
+        return {'traceEvents': sorted(self.events, key=lambda event: (event['ts'], -event['dur'])), 'displayTimeUnit': 'ms'}
+
+    def save(self, file_name):
+        """Saves trace as JSON file.
+
+        :Args:
+          - file_name (str): Path to the new file
+        """
+
+        with open(file_name, 'w') as f:
+            json.dump(self.to_dict(), f)
@@ -3,25 +3,23 @@ import logging
 
 import ooxml
 from ooxml import parse, serialize, importer
+from ooxml.serialize import Hook
 
 logging.basicConfig(filename='ooxml.log', level=logging.INFO)
 
 def check_for_header(ctx, document, el, elem):
-    if hasattr(el, 'style_id'):
-        if el.style_id == 'Title':
-            elem.tag = 'h1'
+    if getattr(el, 'style_id', None) == 'Title':
+        elem.tag = 'h1'
 
 def check_for_quote(ctx, document, el, elem):
-    if hasattr(el, 'style_id'):
-        if el.style_id == 'Quote':
-            elem.set('class', elem.get('class', '') + ' our_quote')
+    elem.set('class', elem.get('class', '') + ' our_quote')
 
 file_name = '../files/03_hooks.docx'
 dfile = ooxml.read_from_file(file_name)
 
 opts = {
     'hooks': {
-       'p': [check_for_quote, check_for_header]
+       'p': [Hook(check_for_quote, style_id='Quote'), check_for_header]
     }
 }
 
@@ -0,0 +1,130 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from ooxml import batch
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'samples', 'files', '02_split.docx')
+
+_convert_file = batch.convert_file
+
+
+def _hang_on_broken(file_name, options=None, serialize_options=None, timeout=None):
+    "Hangs the worker without checking the alarm, like a long call into lxml."
+
+    if file_name.endswith('broken.docx'):
+        time.sleep(60)
+
+    return _convert_file(file_name, options, serialize_options)
+
+
+def _unpicklable_on_broken(file_name, options=None, serialize_options=None, timeout=None):
+    result = _convert_file(file_name, options, serialize_options)
+
+    if file_name.endswith('broken.docx'):
+        return result._replace(css=lambda: None)
+
+    return result
+
+
+def _fake_convert(file_name, options=None, serialize_options=None, timeout=None):
+    "Files 'crash...' kill the worker, file 'name:seconds' is converted in that many seconds."
+
+    if file_name.startswith('crash'):
+        os._exit(1)
+
+    if ':' in file_name:
+        time.sleep(float(file_name.split(':')[1]))
+
+    return batch.BatchResult(file_name, [], '', {'size': 0, 'time': 0.0, 'elements': 0, 'chapters': 0, 'error': None})
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.broken = os.path.join(self.directory, 'broken.docx')
+
+        with open(self.broken, 'wb') as f:
+            f.write(b'not a zip file')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_convert_file(self):
+        result = batch.convert_file(SAMPLE)
+
+        self.assertEqual(result.path, SAMPLE)
+        self.assertIsNone(result.stats['error'])
+        self.assertEqual(result.stats['chapters'], len(result.chapters))
+        self.assertTrue(result.stats['chapters'] > 1)
+        self.assertTrue(len(result.css) > 0)
+
+    def test_convert_file_error(self):
+        result = batch.convert_file(self.broken)
+
+        self.assertIsNone(result.chapters)
+        self.assertIn('zip', result.stats['error'].lower())
+
+    def test_convert(self):
+        results = list(batch.convert([SAMPLE, self.broken, SAMPLE], workers=2, max_pending=2))
+
+        self.assertEqual(sorted(result.path for result in results), sorted([SAMPLE, self.broken, SAMPLE]))
+        self.assertEqual(len([result for result in results if result.stats['error']]), 1)
+
+    @patch('ooxml.batch.convert_file', _hang_on_broken)
+    def test_convert_timeout(self):
+        "File stuck in the worker should be stopped by the parent process."
+
+        start = time.time()
+        results = list(batch.convert([self.broken, SAMPLE, SAMPLE], workers=2, timeout=1))
+
+        self.assertLess(time.time() - start, 30)
+        self.assertEqual(sorted(result.path for result in results), sorted([SAMPLE, self.broken, SAMPLE]))
+
+        errors = dict((result.path, result.stats['error']) for result in results if result.stats['error'])
+
+        self.assertEqual(list(errors), [self.broken])
+        self.assertIn('ConversionTimeout', errors[self.broken])
+
+    @patch('ooxml.batch.convert_file', _unpicklable_on_broken)
+    def test_convert_result_error(self):
+        "Error in one of the results should not stop the batch."
+
+        results = list(batch.convert([self.broken, SAMPLE], workers=1))
+
+        self.assertEqual(sorted(result.path for result in results), sorted([SAMPLE, self.broken]))
+        self.assertTrue([result for result in results if result.path == SAMPLE][0].chapters)
+        self.assertIsNotNone([result for result in results if result.path == self.broken][0].stats['error'])
+
+    @patch('ooxml.batch.convert_file', _fake_convert)
+    def test_convert_crash(self):
+        "Every file should be returned once, also files which were in the pool when it broke."
+
+        results = list(batch.convert(['crash', 'slow:2', 'crash2'], workers=3, timeout=30))
+
+        self.assertEqual(sorted(result.path for result in results), ['crash', 'crash2', 'slow:2'])
+
+        errors = dict((result.path, result.stats['error']) for result in results if result.stats['error'])
+
+        self.assertEqual(errors, {'crash': 'Worker process crashed.', 'crash2': 'Worker process crashed.'})
+
+    @patch('ooxml.batch.convert_file', _fake_convert)
+    def test_convert_timeout_queued(self):
+        "Time waiting in the pool should not count into the timeout."
+
+        results = list(batch.convert(['a:2', 'b:2'], workers=1, timeout=3))
+
+        self.assertEqual(sorted(result.path for result in results), ['a:2', 'b:2'])
+        self.assertEqual([result.stats['error'] for result in results], [None, None])
+
+    def test_find_files(self):
+        self.assertEqual(list(batch.find_files([self.directory, SAMPLE])), [self.broken, SAMPLE])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import os
+import unittest
+
+import ooxml
+from ooxml import columnar, importer
+from ooxml.columnar import ColumnarDocument, build_columnar
+
+SAMPLES = os.path.join(os.path.dirname(__file__), '..', 'samples', 'files')
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" ' \
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+CONTENT = ('<w:document {}><w:body>'
+           '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Title</w:t></w:r></w:p>'
+           '<w:p><w:r><w:rPr><w:b/><w:sz w:val="28"/></w:rPr><w:t>Some </w:t><w:t>text</w:t></w:r>'
+           '<w:r><w:br/></w:r></w:p>'
+           '<w:tbl><w:tblPr><w:tblStyle w:val="Grid"/></w:tblPr><w:tr><w:tc><w:p><w:r><w:t>cell</w:t>'
+           '<mc:AlternateContent><mc:Choice><w:txbxContent><w:p><w:r><w:t>box</w:t></w:r></w:p>'
+           '</w:txbxContent></mc:Choice></mc:AlternateContent></w:r></w:p></w:tc></w:tr></w:tbl>'
+           '<w:sectPr/>'
+           '</w:body></w:document>').format(W)
+
+
+class TestBuildColumnar(unittest.TestCase):
+    def setUp(self):
+        self.cdoc = build_columnar(io.BytesIO(CONTENT.encode('utf-8')))
+
+    def test_runs(self):
+        self.assertEqual(list(self.cdoc.run_kind), [columnar.TEXT] * 3 + [columnar.BREAK] + [columnar.TEXT] * 2)
+        self.assertEqual([self.cdoc.run_text(n) for n in range(len(self.cdoc))],
+                         ['Title', 'Some ', 'text', 'textWrapping', 'cell', 'box'])
+        self.assertEqual(list(self.cdoc.run_size), [-1, 28, 28, -1, -1, -1])
+        self.assertEqual(self.cdoc.run_flags[1], columnar.RUN_FLAGS['b'])
+        self.assertEqual(list(self.cdoc.run_weight), [5, 4, 4, 12, 4, 3])
+
+    def test_paragraphs(self):
+        self.assertEqual(self.cdoc.paragraph_text(1), 'Some text')
+        self.assertEqual(list(self.cdoc.paragraph_element), [0, 1, 2, 2])
+        self.assertEqual(list(self.cdoc.paragraph_parent), [-1, -1, -1, 2])
+        self.assertEqual(list(self.cdoc.paragraph_flags), [0, 0, columnar.IN_TABLE, columnar.IN_TEXTBOX])
+        self.assertEqual([self.cdoc.styles[n] for n in self.cdoc.paragraph_style], ['Heading1', None, 'Grid', 'Grid'])
+        self.assertEqual(self.cdoc.document.used_styles, ['Heading1', 'Grid'])
+
+
+class TestColumnarDocument(unittest.TestCase):
+    def _assertSame(self, file_name):
+        file_name = os.path.join(SAMPLES, file_name)
+
+        dfile = ooxml.read_from_file(file_name)
+        document = dfile.document
+        dfile.close()
+
+        importer.calculate_weights(document)
+        document._calculate_possible_headers()
+
+        cdoc = ColumnarDocument.from_file(file_name)
+        headers_style, headers, text, base_font_size = cdoc.possible_headers()
+
+        self.assertEqual(cdoc.font_size_usage(), document.usage_font_size)
+        self.assertEqual(headers_style, document.possible_headers_style)
+        self.assertEqual(headers, document.possible_headers)
+        self.assertEqual(text, document.possible_text)
+        self.assertEqual(base_font_size, document.base_font_size)
+
+    def test_same_as_importer(self):
+        self._assertSame('02_split.docx')
+        self._assertSame('03_hooks.docx')
+
+    def test_without_numpy(self):
+        "Pure Python fallback should return the same values."
+
+        numpy, columnar.numpy = columnar.numpy, None
+
+        try:
+            self._assertSame('02_split.docx')
+        finally:
+            columnar.numpy = numpy
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+
+from ooxml import doc
+
+
+def _style(style_id, name, style_type='paragraph', based_on='', rpr=None):
+    st = doc.Style()
+    st.style_id = style_id
+    st.name = name
+    st.style_type = style_type
+    st.based_on = based_on
+    st.rpr = rpr or {}
+
+    return st
+
+
+class TestStylesCollection(unittest.TestCase):
+    def setUp(self):
+        self.styles = doc.StylesCollection()
+        self.styles.add(_style('Normal', 'Normal'))
+        self.styles.add(_style('Heading1', 'heading 1'))
+        self.styles.add(_style('Emphasis', 'Emphasis', 'character'))
+        self.styles.default_styles['paragraph'] = 'Normal'
+
+    def test_get_by_id(self):
+        self.assertEqual(self.styles.get_by_id('Heading1').name, 'heading 1')
+        self.assertIsNone(self.styles.get_by_id('Missing'))
+        self.assertEqual(self.styles.get_by_id('Missing', 'paragraph').style_id, 'Normal')
+        self.assertEqual(self.styles.get_by_id('Emphasis', 'paragraph').style_id, 'Emphasis')
+
+    def test_get_by_name(self):
+        self.assertEqual(self.styles.get_by_name('heading 1').style_id, 'Heading1')
+        self.assertIsNone(self.styles.get_by_name('Missing'))
+        self.assertEqual(self.styles.get_by_name('Missing', 'paragraph').style_id, 'Normal')
+
+    def test_get_by_name_changed(self):
+        self.styles.get_by_name('heading 1')
+        self.styles.add(_style('Heading1', 'Heading One'))
+        self.styles.styles['Quote'] = _style('Quote', 'Quote')
+
+        self.assertEqual(self.styles.get_by_name('Heading One').style_id, 'Heading1')
+        self.assertIsNone(self.styles.get_by_name('heading 1'))
+        self.assertEqual(self.styles.get_by_name('Quote').style_id, 'Quote')
+
+    def test_get_by_name_replaced(self):
+        "Replacing a style in the dictionary keeps the number of styles but must clear the cache."
+
+        self.styles.get_by_name('heading 1')
+        self.styles.styles['Heading1'] = _style('Heading1', 'Heading One')
+
+        self.assertEqual(self.styles.get_by_name('Heading One').style_id, 'Heading1')
+        self.assertIsNone(self.styles.get_by_name('heading 1'))
+
+        del self.styles.styles['Heading1']
+        self.styles.styles['Heading2'] = _style('Heading2', 'heading 2')
+
+        self.assertIsNone(self.styles.get_by_name('Heading One'))
+        self.assertEqual(self.styles.get_by_name('heading 2').style_id, 'Heading2')
+
+    def test_reset(self):
+        self.styles.reset()
+
+        self.assertIsNone(self.styles.get_by_name('Normal'))
+        self.assertIsNone(self.styles.get_by_id('Normal'))
+
+
+class TestResolveStyle(unittest.TestCase):
+    def setUp(self):
+        self.styles = doc.StylesCollection()
+        self.styles.add(_style('Normal', 'Normal', rpr={'sz': '24', 'color': '000000'}))
+        self.styles.add(_style('Heading1', 'heading 1', based_on='Normal', rpr={'sz': '40', 'b': True}))
+        self.styles.add(_style('Heading2', 'heading 2', based_on='Heading1', rpr={'i': True}))
+
+    def test_resolve(self):
+        resolved = self.styles.resolve('Heading2')
+
+        self.assertEqual([st.style_id for st in resolved.chain], ['Heading2', 'Heading1', 'Normal'])
+        self.assertEqual(resolved.style_ids, ['Normal', 'Heading1', 'Heading2'])
+        self.assertEqual(resolved.font_size, 20)
+        self.assertEqual(resolved.rpr, {'sz': '40', 'color': '000000', 'b': True, 'i': True})
+        self.assertIs(self.styles.resolve('Heading2'), resolved)
+
+    def test_resolve_missing(self):
+        self.styles.add(_style('Quote', 'Quote', based_on='Missing'))
+
+        self.assertIsNone(self.styles.resolve('Missing'))
+        self.assertEqual(self.styles.resolve('Quote').style_ids, ['Quote'])
+        self.assertEqual(self.styles.resolve('Quote').font_size, -1)
+
+    def test_resolve_cycle(self):
+        self.styles.add(_style('Normal', 'Normal', based_on='Heading2'))
+
+        self.assertEqual(self.styles.resolve('Heading1').style_ids, ['Heading2', 'Normal', 'Heading1'])
+
+    def test_resolve_changed(self):
+        self.styles.resolve('Heading2')
+        self.styles.add(_style('Heading1', 'heading 1', rpr={'sz': '36'}))
+
+        self.assertEqual(self.styles.resolve('Heading2').style_ids, ['Heading1', 'Heading2'])
+        self.assertEqual(self.styles.resolve('Heading2').font_size, 18)
+
+    def test_resolve_replaced(self):
+        self.styles.resolve('Heading2')
+        self.styles.styles['Heading1'] = _style('Heading1', 'heading 1', rpr={'sz': '36'})
+
+        self.assertEqual(self.styles.resolve('Heading2').font_size, 18)
+
+
+class TestElements(unittest.TestCase):
+    def test_no_dict(self):
+        "Elements should not have instance dictionary."
+
+        for elem in [doc.Paragraph(), doc.Text('text'), doc.Link('rId1'), doc.TableCell(), doc.Table(),
+                     doc.Break(), doc.Footnote('1'), doc.SmartTag(), doc.TOC(), doc.Math()]:
+            self.assertFalse(hasattr(elem, '__dict__'), type(elem).__name__)
+
+    def test_empty_properties(self):
+        first, second = doc.Text('first'), doc.Text('second')
+
+        self.assertEqual(first.rpr, {})
+        self.assertEqual(first.ppr, {})
+        self.assertIs(first.rpr, second.rpr)
+
+        with self.assertRaises(TypeError):
+            first.rpr['b'] = True
+
+    def test_style_id(self):
+        "Paragraph has style_id only when style is defined."
+
+        par = doc.Paragraph()
+
+        self.assertFalse(hasattr(par, 'style_id'))
+
+        par.style_id = 'Heading1'
+
+        self.assertEqual(par.style_id, 'Heading1')
+
+
+class TestFindPossibleHeaders(unittest.TestCase):
+    def test_headers(self):
+        usage = {12: 800, 10: 150, 16: 30, 20: 20}
+        headers_style, headers, text, base_font_size = doc.find_possible_headers([20, -1, 14, 20], usage)
+
+        self.assertEqual(headers_style, [20, 14])
+        self.assertEqual(headers, [20, 16, 14])
+        self.assertEqual(text, [12, 10])
+        self.assertEqual(base_font_size, 12)
+
+    def test_empty(self):
+        self.assertEqual(doc.find_possible_headers([], {}), ([], [], [], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import sys
+import types
+import unittest
+
+from mock import patch
+
+from lxml import etree
+
+import ooxml
+from ooxml import doc, importer
+from ooxml.importer import calculate_weight, calculate_weights, text_length, iter_chapters, get_chapters
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'samples', 'files', '02_split.docx')
+
+
+def _paragraph(*texts):
+    par = doc.Paragraph()
+
+    for text, sz in texts:
+        t = doc.Text(text)
+        t.rpr = {'sz': sz}
+        par.elements.append(t)
+
+    return par
+
+
+class TestCalculateWeight(unittest.TestCase):
+    def setUp(self):
+        self.document = doc.Document()
+
+        link = doc.Link('rId1')
+        link.elements.append(_paragraph(('link', '24')).elements[0])
+
+        self.first = _paragraph(('Some text', '24'), ('Header', '32'))
+        self.first.elements.append(link)
+        self.second = _paragraph(('More text', '24'))
+        self.document.elements = [self.first, self.second]
+
+    def test_weight(self):
+        # Link content is counted twice
+        self.assertEqual(calculate_weight(self.document, self.first), 23)
+        self.assertEqual(self.document.usage_font_size, {})
+        self.assertEqual(self.document.weights, {})
+
+    def test_usage(self):
+        "Usage of font sizes should not depend on weights calculated before."
+
+        calculate_weight(self.document, self.first)
+        calculate_weight(self.document, self.first.elements[1])
+        calculate_weights(self.document)
+
+        other = doc.Document()
+        other.elements = [self.first, self.second]
+        calculate_weights(other)
+
+        self.assertEqual(self.document.usage_font_size, other.usage_font_size)
+        self.assertEqual(self.document.usage_font_size, {12: 22, 16: 6})
+
+    def test_cached(self):
+        calculate_weights(self.document)
+        usage = dict(self.document.usage_font_size)
+
+        self.assertEqual(calculate_weight(self.document, self.first), 23)
+        self.assertEqual(calculate_weight(self.document, self.second), 9)
+        self.assertEqual(calculate_weight(self.document, self.first.elements[1]), 6)
+        self.assertEqual(self.document.usage_font_size, usage)
+        self.assertEqual(self.document.usage_font_size, {12: 22, 16: 6})
+
+    def test_cached_top_level(self):
+        "Only weights of the top level elements are kept in the document."
+
+        calculate_weights(self.document)
+
+        self.assertEqual(sorted(self.document.weights), sorted([id(self.first), id(self.second)]))
+
+        self.first.elements[1].text = 'Title'
+
+        self.assertEqual(calculate_weight(self.document, self.first.elements[1]), 5)
+        self.assertEqual(calculate_weight(self.document, self.first), 23)
+
+    def test_invalidate(self):
+        calculate_weights(self.document)
+        self.first.elements[0].text = 'Text'
+        self.document.invalidate_weights()
+
+        self.assertEqual(self.document.usage_font_size, {})
+        self.assertEqual(calculate_weight(self.document, self.first), 18)
+
+        calculate_weights(self.document)
+
+        self.assertEqual(self.document.usage_font_size, {12: 17, 16: 6})
+
+    def test_text_length(self):
+        self.assertEqual(text_length(self.second, self.document), 9)
+
+        self.second.elements[0].text = 'Changed'
+
+        self.assertEqual(text_length(self.second, self.document), 9)
+        self.assertEqual(text_length(self.second), 7)
+
+
+class TestIterChapters(unittest.TestCase):
+    def setUp(self):
+        self.dfile = ooxml.read_from_file(SAMPLE)
+
+    def tearDown(self):
+        self.dfile.close()
+
+    def test_generator(self):
+        chapters = iter_chapters(self.dfile.document)
+
+        self.assertIsInstance(chapters, types.GeneratorType)
+
+        title, content = next(chapters)
+
+        self.assertEqual(title, 'CHAPTER I')
+        self.assertTrue(content.startswith(b'<body><h1 class="heading1 heading1-fontsize">CHAPTER I</h1>'))
+
+    def test_content(self):
+        "Content should be a complete body without anything left from the root element."
+
+        for pretty_print in [True, False]:
+            for title, content in get_chapters(self.dfile.document, serialize_options={'pretty_print': pretty_print}):
+                self.assertTrue(content.startswith(b'<body>'))
+                self.assertTrue(content.endswith(b'</p>\n</body>\n') or content.endswith(b'<p/>\n</body>\n'))
+                self.assertNotIn(b'&lt;', content)
+
+    def test_same_as_get_chapters(self):
+        self.assertEqual(list(iter_chapters(self.dfile.document)), get_chapters(self.dfile.document))
+
+    def test_workers(self):
+        "Serializing chapters in a pool of processes should create the same chapters."
+
+        self.assertEqual(get_chapters(self.dfile.document, workers=2), get_chapters(self.dfile.document))
+
+    @patch.object(sys, 'version_info', (2, 7, 18))
+    def test_workers_unsupported(self):
+        with self.assertRaises(RuntimeError):
+            get_chapters(self.dfile.document, workers=2)
+
+        self.assertTrue(get_chapters(self.dfile.document, workers=1))
+
+
+def _round_trip(root, pretty_print):
+    "Body as it was created before, by parsing serialized elements with HTML parser."
+
+    s = etree.tostring(root, pretty_print=pretty_print, encoding='utf-8')
+    body = importer.parse_html_string(s.rstrip()[len('<div>'):-len('</div>')]).find('.//body')
+
+    return etree.tostring(body, pretty_print=True, encoding='utf-8')
+
+
+class TestHtmlBody(unittest.TestCase):
+    def _check(self, html):
+        for pretty_print in [True, False]:
+            expected = _round_trip(etree.fromstring(html), pretty_print)
+            body = importer._html_body(etree.fromstring(html), pretty_print)
+
+            self.assertIsNotNone(body)
+            self.assertEqual(etree.tostring(body, pretty_print=True, encoding='utf-8'), expected)
+
+    def test_body(self):
+        self._check('<div><h1>Title</h1><p>Some <b>bold</b> text<br/></p><p><span></span></p>'
+                    '<table><tr><td><p>cell</p></td></tr></table><ul><li>item</li></ul></div>')
+
+    def test_text_box(self):
+        "Parser closes the paragraph before the text box."
+
+        self._check('<div><p><span>before</span><div class="textbox"><p>box</p></div></p><p>after</p></div>')
+        self._check('<div><p><div class="textbox"><p>first</p></div><div class="textbox"><p>second</p></div></p></div>')
+
+    def test_restructured(self):
+        "Trees which parser would change in other ways are not used."
+
+        self.assertIsNone(importer._html_body(etree.fromstring('<div>text<p>par</p></div>'), True))
+        self.assertIsNone(importer._html_body(etree.fromstring('<div><p><div/>text</p></div>'), True))
+        self.assertIsNone(importer._html_body(etree.fromstring('<div><span><p>par</p></span></div>'), True))
+
+
+if __name__ == '__main__':
+    unittest.main()
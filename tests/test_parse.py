@@ -1,7 +1,12 @@
+import os
+import glob
 import unittest
 import six
 
-from ooxml.parse import parse_relationship
+from ooxml import doc
+from ooxml.serialize import serialize_styles
+from ooxml.parse import parse_relationship, parse_document, iterparse_document, parse_text, parse_from_file, \
+    coalesce_runs, targetparse_document, ParseStats
 
 content_valid = six.b('''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships"><Relationship Id="rId3" Type="http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects" Target="stylesWithEffects.xml"/><Relationship Id="rId4" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/settings" Target="settings.xml"/><Relationship Id="rId5" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/webSettings" Target="webSettings.xml"/><Relationship Id="rId6" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="media/image1.jpeg"/><Relationship Id="rId7" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/fontTable" Target="fontTable.xml"/><Relationship Id="rId8" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/theme" Target="theme/theme1.xml"/><Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/><Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/></Relationships>''')
@@ -71,6 +76,319 @@ class TestParseRelationship(unittest.TestCase):
             'Internal')
 
 
+content_document = six.b('''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><w:body><w:sdt><w:sdtContent><w:p><w:r><w:t>Contents</w:t></w:r></w:p></w:sdtContent></w:sdt><w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Title</w:t></w:r></w:p><w:p><w:r><w:rPr><w:b/><w:sz w:val="28"/></w:rPr><w:t>Bold</w:t></w:r><w:r><w:t xml:space="preserve"> text</w:t></w:r><w:hyperlink r:id="rId5"><w:r><w:t>link</w:t></w:r></w:hyperlink></w:p><w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/></w:tblPr><w:tr><w:tc><w:p><w:r><w:t>cell 1</w:t></w:r></w:p></w:tc><w:tc><w:tcPr><w:gridSpan w:val="2"/></w:tcPr><w:p><w:r><w:t>cell 2</w:t></w:r></w:p></w:tc></w:tr></w:tbl><w:p><w:r><w:t>Last</w:t></w:r></w:p><w:sectPr/></w:body></w:document>''')
+
+
+def _dump(obj):
+    "Returns simple representation of the parsed document elements."
+
+    from ooxml import doc
+
+    if isinstance(obj, list):
+        return [_dump(el) for el in obj]
+
+    if not isinstance(obj, doc.Element):
+        return obj
+
+    names = [name for cls in type(obj).__mro__ for name in getattr(cls, '__slots__', ())]
+
+    return (type(obj).__name__, dict((key, _dump(getattr(obj, key))) for key in names
+                                     if hasattr(obj, key) and key not in ['parent', 'document']))
+
+
+class TestIterparseDocument(unittest.TestCase):
+    def test_parse(self):
+        "Make sure we parse all the top level elements."
+
+        document = iterparse_document(six.BytesIO(content_document))
+
+        self.assertEqual([type(el).__name__ for el in document.elements], ['TOC', 'Paragraph', 'Paragraph', 'Table', 'Paragraph'])
+        self.assertEqual(document.elements[-1].elements[0].text, 'Last')
+
+    def test_same_as_parse_document(self):
+        "Incremental parsing should create the same document as parse_document."
+
+        document = parse_document(content_document)
+        iter_document = iterparse_document(six.BytesIO(content_document))
+
+        self.assertEqual(_dump(iter_document.elements), _dump(document.elements))
+        self.assertEqual(iter_document.used_styles, document.used_styles)
+        self.assertEqual(iter_document.used_font_size, document.used_font_size)
+
+
+content_complex = six.b('''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" xmlns:m="http://schemas.openxmlformats.org/officeDocument/2006/math" xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"><w:body>
+<w:p><w:pPr><w:framePr w:dropCap="drop"/><w:rPr><w:sz w:val="72"/></w:rPr></w:pPr><w:r><w:rPr><w:sz w:val="72"/></w:rPr><w:t>T</w:t></w:r></w:p>
+<w:p><w:pPr><w:pStyle w:val="Quote"/><w:numPr><w:ilvl w:val="1"/><w:numId w:val="3"/></w:numPr><w:jc w:val="center"/></w:pPr><w:r><w:t>he </w:t><w:t/><w:br/><w:sym w:font="Symbol" w:char="F0B7"/></w:r><w:ins><w:r><w:t>inserted</w:t></w:r></w:ins><m:oMath><w:r><w:t>x</w:t></w:r></m:oMath><w:commentRangeStart w:id="1"/><w:r><w:rPr><w:rStyle w:val="Emphasis"/><w:i/></w:rPr><w:t>first</w:t><w:commentReference w:id="1"/><w:footnoteReference w:id="2"/></w:r><w:commentRangeEnd w:id="1"/><w:hyperlink w:anchor="top"><w:r><w:t>anchor</w:t></w:r></w:hyperlink><w:smartTag w:element="place"><w:r><w:t>Zagreb</w:t></w:r><w:smartTag w:element="city"><w:r><w:t>Split</w:t></w:r></w:smartTag></w:smartTag></w:p>
+<w:p><w:r><w:drawing><a:graphic><a:blip r:embed="rId7"/></a:graphic></w:drawing><mc:AlternateContent><mc:Choice><w:txbxContent><w:p><w:pPr><w:pStyle w:val="Box"/></w:pPr><w:r><w:t>inside</w:t></w:r></w:p></w:txbxContent></mc:Choice><mc:Fallback><w:txbxContent><w:p><w:r><w:t>fallback</w:t></w:r></w:p></w:txbxContent></mc:Fallback></mc:AlternateContent></w:r></w:p>
+<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/></w:tblPr><w:tr><w:tc><w:tcPr><w:vMerge w:val="restart"/></w:tcPr><w:p><w:r><w:t>merged</w:t></w:r></w:p></w:tc><w:tc><w:p/></w:tc></w:tr><w:tr><w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p><w:pPr><w:pStyle w:val="Skipped"/></w:pPr></w:p></w:tc><w:tc><w:p><w:r><w:t>last</w:t></w:r></w:p></w:tc></w:tr></w:tbl>
+<w:sectPr/></w:body></w:document>''')
+
+
+class TestTargetparseDocument(unittest.TestCase):
+    def _assertSame(self, content, merge_runs=False):
+        document = parse_document(content, merge_runs)
+        target_document = targetparse_document(six.BytesIO(content), merge_runs)
+
+        self.assertEqual(_dump(target_document.elements), _dump(document.elements))
+        self.assertEqual(target_document.used_styles, document.used_styles)
+        self.assertEqual(target_document.used_font_size, document.used_font_size)
+        self.assertEqual(target_document.merged_runs, document.merged_runs)
+
+    def test_same_as_parse_document(self):
+        "Parser target should create the same document as parse_document."
+
+        self._assertSame(content_document)
+        self._assertSame(content_complex)
+        self._assertSame(content_complex, merge_runs=True)
+
+    def test_samples(self):
+        "Compare documents created from all the sample files."
+
+        from ooxml.docxfile import DOCXFile
+
+        for file_name in glob.glob(os.path.join(os.path.dirname(__file__), '..', 'samples', 'files', '*.docx')):
+            dfile = DOCXFile(file_name)
+            self._assertSame(dfile.read_file('document.xml'))
+            dfile.close()
+
+
+class TestParseText(unittest.TestCase):
+    def _parse(self, content):
+        from lxml import etree
+        from ooxml import doc
+
+        run = etree.fromstring(six.b('<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">{}</w:r>'.format(content)))
+        paragraph = doc.Paragraph()
+
+        parse_text(doc.Document(), paragraph, run)
+
+        return paragraph.elements
+
+    def test_multiple_text(self):
+        "Make sure we don't drop content when run has more text elements."
+
+        elements = self._parse('<w:rPr><w:b/></w:rPr><w:t>first</w:t><w:br/><w:t>second</w:t><w:br w:type="page"/>')
+
+        self.assertEqual([type(el).__name__ for el in elements], ['Text', 'Break', 'Text', 'Break'])
+        self.assertEqual([elements[0].text, elements[2].text], ['first', 'second'])
+        self.assertEqual(elements[3].break_type, 'page')
+
+    def test_properties(self):
+        "All text elements in the run should have run properties."
+
+        elements = self._parse('<w:t>first</w:t><w:t>second</w:t><w:rPr><w:i/></w:rPr>')
+
+        self.assertEqual([el.rpr for el in elements], [{'i': True}, {'i': True}])
+
+        with self.assertRaises(TypeError):
+            elements[0].rpr['b'] = True
+
+        with self.assertRaises(TypeError):
+            elements[0].rpr.update(b=True)
+
+        elements[0].rpr = doc.Properties(dict(elements[0].rpr, b=True))
+
+        self.assertEqual(elements[0].rpr, {'i': True, 'b': True})
+        self.assertEqual(elements[1].rpr, {'i': True})
+
+    def test_shared_properties(self):
+        "Runs with the same formatting should share properties."
+
+        elements = self._parse('<w:r><w:rPr><w:b/><w:sz w:val="24"/></w:rPr><w:t>first</w:t></w:r>'
+                               '<w:r><w:rPr><w:sz w:val="24"/><w:b/></w:rPr><w:t>second</w:t></w:r>')
+
+        self.assertEqual(elements[0].rpr, {'b': True, 'sz': '24'})
+        self.assertIs(elements[0].rpr, elements[1].rpr)
+
+        with self.assertRaises(TypeError):
+            elements[0].rpr['i'] = True
+
+    def test_references(self):
+        "Parse references in the order they are defined."
+
+        elements = self._parse('<w:footnoteReference w:id="2"/><w:sym w:font="Wingdings" w:char="F04A"/><w:commentReference w:id="3"/>')
+
+        self.assertEqual([type(el).__name__ for el in elements], ['Footnote', 'Symbol', 'Comment'])
+        self.assertEqual(elements[0].rid, '2')
+        self.assertEqual(elements[2].comment_type, 'reference')
+
+
+content_runs = six.b('''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><w:body><w:p><w:r><w:rPr><w:b/></w:rPr><w:t>Bo</w:t></w:r><w:r><w:rPr><w:b/></w:rPr><w:t>ld</w:t></w:r><w:r><w:t xml:space="preserve"> te</w:t></w:r><w:r><w:t>xt</w:t></w:r><w:r><w:br/></w:r><w:r><w:t>after</w:t></w:r><w:hyperlink r:id="rId5"><w:r><w:t>li</w:t></w:r><w:r><w:t>nk</w:t></w:r></w:hyperlink><w:r><w:t>end</w:t></w:r></w:p></w:body></w:document>''')
+
+
+class TestCoalesceRuns(unittest.TestCase):
+    def test_merge(self):
+        "Adjacent runs with the same formatting should be merged."
+
+        document = parse_document(content_runs, merge_runs=True)
+        elements = document.elements[0].elements
+
+        self.assertEqual([type(el).__name__ for el in elements], ['Text', 'Text', 'Break', 'Text', 'Link', 'Text'])
+        self.assertEqual([elements[0].text, elements[1].text, elements[3].text], ['Bold', ' text', 'after'])
+        self.assertEqual(elements[0].rpr, {'b': True})
+        self.assertEqual(elements[4].elements[0].text, 'link')
+        self.assertEqual(document.merged_runs, 3)
+
+    def test_disabled(self):
+        document = parse_document(content_runs)
+
+        self.assertEqual(len(document.elements[0].elements), 8)
+        self.assertEqual(document.merged_runs, 0)
+
+    def test_iterparse(self):
+        document = parse_document(content_runs, merge_runs=True)
+        iter_document = iterparse_document(six.BytesIO(content_runs), merge_runs=True)
+
+        self.assertEqual(_dump(iter_document.elements), _dump(document.elements))
+
+    def test_nothing_to_merge(self):
+        document = parse_document(content_document)
+        paragraph = document.elements[2]
+        elements = paragraph.elements
+
+        self.assertEqual(coalesce_runs(paragraph), 0)
+        self.assertIs(paragraph.elements, elements)
+
+
+content_footnotes = six.b('''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:footnotes xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote><w:footnote w:id="1"><w:p><w:pPr><w:pStyle w:val="FootnoteText"/></w:pPr><w:r><w:t>Note</w:t></w:r></w:p></w:footnote></w:footnotes>''')
+
+
+content_styles = six.b('''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:rPr><w:sz w:val="24"/></w:rPr></w:style><w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/><w:rPr><w:b/><w:sz w:val="32"/></w:rPr></w:style><w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/></w:style><w:style w:type="paragraph" w:styleId="FootnoteText"><w:name w:val="footnote text"/><w:basedOn w:val="Normal"/><w:rPr><w:sz w:val="20"/></w:rPr></w:style></w:styles>''')
+
+
+# file object mockup
+class OOXMLFile:
+    def __init__(self, files):
+        self.file_name = 'test.docx'
+        self.files = files
+        self.read_files = []
+
+    def read_file(self, file_name):
+        self.read_files.append(file_name)
+
+        return self.files[file_name]
+
+    def open_file(self, file_name):
+        return six.BytesIO(self.read_file(file_name))
+
+
+class TestParseFromFile(unittest.TestCase):
+    def setUp(self):
+        self.file_object = OOXMLFile({'document.xml': content_document,
+                                      'footnotes.xml': content_footnotes,
+                                      '_rels/document.xml.rels': content_external})
+
+    def test_parse(self):
+        "Parse all the parts of the file."
+
+        document = parse_from_file(self.file_object)
+
+        self.assertIn('footnotes.xml', self.file_object.read_files)
+        self.assertEqual(list(document.footnotes.keys()), ['1'])
+        self.assertIn('FootnoteText', document.used_styles)
+
+    def test_lazy(self):
+        "Parts should be parsed only when we need them."
+
+        document = parse_from_file(self.file_object, lazy=True)
+
+        self.assertNotIn('footnotes.xml', self.file_object.read_files)
+        self.assertNotIn('_rels/document.xml.rels', self.file_object.read_files)
+
+        self.assertEqual(list(document.footnotes.keys()), ['1'])
+        self.assertIn('footnotes.xml', self.file_object.read_files)
+        self.assertNotIn('_rels/document.xml.rels', self.file_object.read_files)
+
+        self.assertEqual(document.relationships['document']['rId5']['target'], 'http://www.google.com/')
+        self.assertEqual(document.comments, {})
+
+    def test_lazy_used_styles(self):
+        "Used styles should include styles from the parts which have not been accessed yet."
+
+        document = parse_from_file(self.file_object, lazy=True)
+
+        self.assertIn('FootnoteText', document.used_styles)
+        self.assertIn('footnotes.xml', self.file_object.read_files)
+
+    def test_lazy_serialize_styles(self):
+        "Styles should be serialized the same way when parts are parsed on demand."
+
+        files = dict(self.file_object.files)
+        files['styles.xml'] = content_styles
+
+        css = serialize_styles(parse_from_file(OOXMLFile(files)))
+
+        self.assertIn('.footnotetext', css)
+        self.assertEqual(serialize_styles(parse_from_file(OOXMLFile(files), lazy=True)), css)
+
+    def test_workers(self):
+        "Parsing files concurrently should create the same document."
+
+        document = parse_from_file(self.file_object)
+        concurrent_document = parse_from_file(OOXMLFile(self.file_object.files), workers=2)
+
+        self.assertEqual(_dump(concurrent_document.elements), _dump(document.elements))
+        self.assertEqual(concurrent_document.used_styles, document.used_styles)
+        self.assertEqual(list(concurrent_document.footnotes.keys()), ['1'])
+
+    def test_iterparse(self):
+        "Iterparse engine should create the same document."
+
+        document = parse_from_file(self.file_object)
+        iter_document = parse_from_file(OOXMLFile(self.file_object.files), engine='iterparse')
+
+        self.assertEqual(_dump(iter_document.elements), _dump(document.elements))
+
+    def test_target(self):
+        "Target engine should create the same document."
+
+        document = parse_from_file(self.file_object)
+        target_document = parse_from_file(OOXMLFile(self.file_object.files), engine='target')
+
+        self.assertEqual(_dump(target_document.elements), _dump(document.elements))
+
+    def test_stats(self):
+        "Stats should be collected for every phase and file without changing the document."
+
+        document = parse_from_file(self.file_object)
+        stats = ParseStats(trace_memory=True)
+        stats_document = parse_from_file(OOXMLFile(self.file_object.files), stats=stats)
+
+        self.assertEqual(_dump(stats_document.elements), _dump(document.elements))
+        self.assertEqual(list(stats.phases), ['document', 'styles', 'relationships', 'comments', 'footnotes',
+                                              'endnotes', 'numbering'])
+        self.assertEqual(sorted(stats.files), ['_rels/document.xml.rels', 'document.xml', 'footnotes.xml'])
+        self.assertEqual(stats.files['document.xml']['size'], len(content_document))
+        # Paragraphs of the footnotes are counted too
+        self.assertEqual(stats.elements['Paragraph'], len(document.elements) + 1)
+
+        report = stats.report()
+
+        self.assertEqual(report['elements'], dict(stats.elements))
+        self.assertIn('footnotes.xml', stats.format_report())
+
+        if six.PY3:
+            self.assertGreater(report['phases']['document']['peak_memory'], 0)
+
+    def test_lazy_stats(self):
+        "Parts parsed on demand should be added to the stats when they are parsed."
+
+        stats = ParseStats()
+        document = parse_from_file(OOXMLFile(self.file_object.files), engine='target', lazy=True, stats=stats)
+
+        self.assertEqual(list(stats.phases), ['document', 'styles'])
+        self.assertIsNone(stats.files['document.xml']['parse'])
+
+        document.footnotes
+
+        self.assertEqual(list(stats.phases), ['document', 'styles', 'footnotes'])
+        self.assertIn('footnotes.xml', stats.files)
+
 
 if __name__ == '__main__':
     unittest.main()
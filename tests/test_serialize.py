@@ -3,7 +3,10 @@ import six
 
 from mock import patch, call, Mock, MagicMock, ANY
 
-from ooxml.serialize import serialize_elements, serialize_break, serialize_link
+from ooxml import doc
+from ooxml import serialize as serialize_module
+from ooxml.serialize import serialize_elements, serialize_break, serialize_link, write_elements, serialize, \
+    Context, DEFAULT_OPTIONS, Hook, Profiler
 
 from lxml import etree
 
@@ -192,5 +195,214 @@ class TestSerializeElements(unittest.TestCase):
         self.assertEqual(instance.get_serializer.call_args_list, [call(1), call(2), call(3)])
 
 
+def _paragraph(text, ilvl=None, numid=None):
+    par = doc.Paragraph()
+    par.ilvl, par.numid = ilvl, numid
+
+    t = doc.Text(text)
+    t.rpr = {}
+    par.elements.append(t)
+
+    return par
+
+
+class TestSerializeParagraph(unittest.TestCase):
+    def _serialize(self, runs):
+        document = doc.Document()
+        par = doc.Paragraph()
+
+        for text, rpr in runs:
+            t = doc.Text(text)
+            t.rpr = rpr
+            par.elements.append(t)
+
+        document.elements.append(par)
+
+        return serialize(document, {'pretty_print': False})
+
+    def test_merge_runs(self):
+        "Runs with the same formatting are merged into text, children and tails."
+
+        self.assertEqual(self._serialize([('a', {}), ('b', {}), ('c', {'b': True}), ('d', {'b': True}), ('e', {}),
+                                          ('f', {'sz': '28'}), ('g', {'sz': '28'}), ('h', {})]),
+                         six.b('<div><p>ab<b>cd</b>e<span class="" style="font-size: 14.0pt;">fg</span>h</p></div>'))
+
+    def test_many_runs(self):
+        runs = [(u'{} '.format(n), [{}, {'i': True}][n % 2]) for n in range(1000)]
+        expected = u''.join(u'{} <i>{} </i>'.format(n, n + 1) for n in range(0, 1000, 2))
+
+        self.assertEqual(self._serialize(runs), u'<div><p>{}</p></div>'.format(expected).encode('utf-8'))
+
+
+class Quote(doc.Paragraph):
+    __slots__ = ()
+
+
+class Marker(doc.Element):
+    __slots__ = ()
+
+
+class TestContext(unittest.TestCase):
+    def test_subclass(self):
+        "Subclasses of the elements should use serializer of their parent class."
+
+        ctx = Context(doc.Document())
+
+        self.assertIs(ctx.get_serializer(Quote()), serialize_module.serialize_paragraph)
+        self.assertIs(ctx.dispatch[Quote], serialize_module.serialize_paragraph)
+        self.assertIsNone(ctx.get_serializer(doc.Text('text')))
+
+    def test_custom_serializer(self):
+        def _marker(ctx, document, elem, root):
+            etree.SubElement(root, 'hr')
+
+            return root
+
+        document = doc.Document()
+        par = doc.Paragraph()
+        par.elements = [doc.Text('a'), Marker(), doc.Text('b')]
+        document.elements = [par, Quote()]
+
+        self.assertEqual(serialize(document, {'pretty_print': False, 'serializers': {Marker: _marker}}),
+                         six.b('<div><p>a<hr/>b</p><p/></div>'))
+
+    def test_default_options(self):
+        "Options given to the context should not change default options."
+
+        Context(doc.Document(), {'serializers': {Marker: None}, 'hooks': {'p': [None]}})
+
+        self.assertNotIn(Marker, DEFAULT_OPTIONS['serializers'])
+        self.assertEqual(DEFAULT_OPTIONS['hooks'], {})
+
+
+class TestHooks(unittest.TestCase):
+    def _paragraph(self, style_id, rpr=None):
+        par = doc.Paragraph()
+        par.style_id = style_id
+        par.elements = [doc.Text(style_id)]
+
+        if rpr:
+            par.rpr = rpr
+
+        return par
+
+    def test_filters(self):
+        calls = []
+
+        def _hook(name):
+            def _inner(ctx, document, el, elem):
+                calls.append((name, el.style_id))
+                elem.set('class', (elem.get('class', '') + ' ' + name).strip())
+
+            return _inner
+
+        document = doc.Document()
+        document.elements = [self._paragraph('Quote'), self._paragraph('Title', {'b': True}),
+                             self._paragraph('Normal'), Quote()]
+        document.elements[3].style_id = 'Quote'
+
+        hooks = [_hook('all'),
+                 Hook(_hook('quote'), style_id='Quote'),
+                 Hook(_hook('headers'), style_id=['Title', 'Heading1']),
+                 Hook(_hook('bold'), rpr=['b']),
+                 Hook(_hook('subclass'), element_class=Quote)]
+
+        result = serialize(document, {'pretty_print': False, 'hooks': {'p': hooks}})
+
+        self.assertEqual(result, six.b('<div><p class="all quote">Quote</p><p class="all headers bold">Title</p>'
+                                       '<p class="all">Normal</p><p class="all quote subclass"/></div>'))
+        self.assertEqual(calls, [('all', 'Quote'), ('quote', 'Quote'),
+                                 ('all', 'Title'), ('headers', 'Title'), ('bold', 'Title'),
+                                 ('all', 'Normal'),
+                                 ('all', 'Quote'), ('quote', 'Quote'), ('subclass', 'Quote')])
+
+
+class TestProfiler(unittest.TestCase):
+    def test_report(self):
+        def check_for_quote(ctx, document, el, elem):
+            elem.set('class', 'quote')
+
+        document = doc.Document()
+        par = doc.Paragraph()
+        par.elements = [doc.Text('a'), doc.Break()]
+        document.elements = [par, Quote(), doc.Paragraph()]
+        document.elements[1].style_id = 'Quote'
+
+        profiler = Profiler()
+        options = {'pretty_print': False, 'hooks': {'p': [Hook(check_for_quote, style_id='Quote')]}}
+
+        result = serialize(document, dict(options, profiler=profiler))
+
+        self.assertEqual(result, serialize(document, options))
+
+        report = profiler.report()
+
+        self.assertEqual(sorted(report['serializers']), ['Break', 'Paragraph', 'Quote'])
+        self.assertEqual(report['serializers']['Paragraph']['calls'], 2)
+        self.assertEqual(report['serializers']['Break']['calls'], 1)
+        self.assertEqual(report['hooks']['p: check_for_quote']['calls'], 1)
+        self.assertGreaterEqual(report['serializers']['Quote']['total'], report['serializers']['Quote']['max'])
+        self.assertIn('p: check_for_quote', profiler.format_report())
+
+    def test_disabled(self):
+        ctx = Context(doc.Document())
+
+        self.assertIsNone(ctx.profiler)
+        self.assertIs(ctx.get_serializer(doc.Paragraph()), serialize_module.serialize_paragraph)
+
+
+class Output(six.BytesIO):
+    "File object which counts writes."
+
+    def __init__(self):
+        six.BytesIO.__init__(self)
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+
+        return six.BytesIO.write(self, data)
+
+
+class TestWriteElements(unittest.TestCase):
+    def setUp(self):
+        self.doc = doc.Document()
+        self.elements = [_paragraph('first'),
+                         _paragraph('one', 0, 1), _paragraph('two', 1, 1), _paragraph('three', 0, 1),
+                         _paragraph('second'),
+                         _paragraph('four', 0, 2)]
+
+    def _write(self, elements, options=None):
+        output = Output()
+        write_elements(self.doc, elements, output, options)
+
+        return output
+
+    def test_same_as_serialize(self):
+        for pretty_print in [True, False]:
+            options = {'pretty_print': pretty_print}
+            output = self._write(self.elements, options)
+
+            self.assertEqual(output.getvalue(), serialize_elements(self.doc, self.elements, options))
+
+    def test_lists(self):
+        output = self._write(self.elements)
+
+        self.assertEqual(output.getvalue(), six.b('<div>\n  <p>first</p>\n  <ul>\n    <li>one<ul><li>two</li></ul></li>\n'
+                                                  '    <li>three</li>\n  </ul>\n  <p>second</p>\n  <ul>\n    <li>four</li>\n  </ul>\n</div>\n'))
+
+    def test_incremental(self):
+        "Every top level element should be written separately."
+
+        output = self._write(self.elements)
+
+        # opening tag, 4 top level elements and closing tag
+        self.assertEqual(output.writes, 6)
+
+    def test_empty(self):
+        self.assertEqual(self._write([]).getvalue(), six.b('<div/>\n'))
+        self.assertEqual(self._write([], {'pretty_print': False}).getvalue(), six.b('<div/>'))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,54 @@
+import io
+import os
+import unittest
+
+import ooxml
+from ooxml.text import iter_paragraphs
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'samples', 'files', '02_split.docx')
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" ' \
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+CONTENT = ('<w:document {}><w:body>'
+           '<w:sdt><w:sdtContent><w:p><w:r><w:t>Contents</w:t></w:r></w:p></w:sdtContent></w:sdt>'
+           '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Title</w:t></w:r></w:p>'
+           '<w:p><w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">Some </w:t><w:br/><w:t>text &amp; more</w:t></w:r>'
+           '<w:smartTag w:element="place"><w:r><w:t> here</w:t></w:r></w:smartTag>'
+           '<w:r><mc:AlternateContent><mc:Choice><w:txbxContent><w:p><w:r><w:t>box</w:t></w:r></w:p>'
+           '</w:txbxContent></mc:Choice><mc:Fallback><w:txbxContent><w:p><w:r><w:t>box</w:t></w:r></w:p>'
+           '</w:txbxContent></mc:Fallback></mc:AlternateContent></w:r></w:p>'
+           '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>cell</w:t></w:r></w:p></w:tc></w:tr>'
+           '<w:tr><w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p><w:r><w:t>merged</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+           '<w:p/>'
+           '<w:sectPr/>'
+           '</w:body></w:document>').format(W)
+
+
+class TestIterParagraphs(unittest.TestCase):
+    def test_paragraphs(self):
+        paragraphs = list(iter_paragraphs(io.BytesIO(CONTENT.encode('utf-8'))))
+
+        self.assertEqual(paragraphs, ['Title', 'Some \ntext & more here', 'box', 'cell', ''])
+
+    def test_chunks(self):
+        "Paragraphs should not depend on the size of the chunks."
+
+        source = io.BytesIO(CONTENT.encode('utf-8'))
+
+        self.assertEqual(list(iter_paragraphs(source, chunk_size=7)),
+                         list(iter_paragraphs(io.BytesIO(CONTENT.encode('utf-8')))))
+
+
+class TestExtractText(unittest.TestCase):
+    def test_extract_text(self):
+        dfile = ooxml.read_from_file(SAMPLE)
+        texts = [''.join(elem.text or '' for elem in par.elements) for par in dfile.document.elements]
+        dfile.close()
+
+        self.assertEqual(ooxml.extract_text(SAMPLE), '\n'.join(texts))
+        self.assertEqual(ooxml.extract_text(SAMPLE, separator=u'\n\n'), '\n\n'.join(texts))
+
+
+if __name__ == '__main__':
+    unittest.main()
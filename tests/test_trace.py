@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import unittest
+
+import ooxml
+from ooxml import importer, parse, serialize, trace
+from ooxml.trace import Tracer
+
+from lxml import etree
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'samples', 'files', '02_split.docx')
+
+
+def _convert():
+    dfile = ooxml.read_from_file(SAMPLE)
+    chapters = importer.get_chapters(dfile.document)
+    dfile.close()
+
+    return chapters
+
+
+def _contains(outer, inner):
+    return outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+
+
+class TestTracer(unittest.TestCase):
+    def test_spans(self):
+        chapters = _convert()
+
+        with Tracer() as tracer:
+            traced_chapters = _convert()
+
+        self.assertEqual(traced_chapters, chapters)
+
+        spans = dict((event['name'], event) for event in tracer.events)
+
+        for name in ['DOCXFile.reset', 'DOCXFile.read_file', 'parse_from_file', 'parse_document', 'parse_style',
+                     'parse_relationship', 'split_document', 'mark_styles', 'find_important', '_serialize_chapter',
+                     'etree.tostring']:
+            self.assertIn(name, spans)
+
+        for name in ['parse_paragraph', 'parse_text', 'parse_previous_properties']:
+            self.assertNotIn(name, spans)
+
+        self.assertEqual(spans['parse_from_file']['args']['elements'], spans['parse_document']['args']['elements'])
+        self.assertTrue(_contains(spans['parse_from_file'], spans['parse_document']))
+        self.assertTrue(_contains(spans['split_document'], spans['find_important']))
+        self.assertEqual(len([event for event in tracer.events if event['name'] == '_serialize_chapter']), len(chapters))
+
+    def test_detailed(self):
+        with Tracer(detailed=True) as tracer:
+            _convert()
+
+        names = set(event['name'] for event in tracer.events)
+
+        for name in ['parse_document', 'parse_paragraph', 'parse_text', 'parse_relationship']:
+            self.assertIn(name, names)
+
+    def test_tostring(self):
+        "Only calls of tostring made by ooxml should be traced."
+
+        tostring = etree.tostring
+
+        with Tracer() as tracer:
+            self.assertIs(etree.tostring, tostring)
+            etree.tostring(etree.Element('p'))
+
+            self.assertEqual(tracer.events, [])
+
+            serialize.etree.tostring(serialize.etree.Element('p'))
+
+        self.assertEqual([event['name'] for event in tracer.events], ['etree.tostring'])
+
+    def test_restore(self):
+        "Original functions should be used when tracer is not running."
+
+        functions = (parse.parse_text, parse.RUN_HANDLERS, list(parse.DOCUMENT_PARTS), importer.split_document,
+                     serialize.etree, ooxml.docxfile.DOCXFile.read_file)
+        handlers = dict(parse.RUN_HANDLERS)
+
+        with Tracer(detailed=True):
+            self.assertIsNot(parse.parse_text, functions[0])
+
+            with self.assertRaises(RuntimeError):
+                Tracer().start()
+
+        self.assertIs(parse.parse_text, functions[0])
+        self.assertEqual(parse.RUN_HANDLERS, handlers)
+        self.assertEqual(parse.DOCUMENT_PARTS, functions[2])
+        self.assertIs(importer.split_document, functions[3])
+        self.assertIs(serialize.etree, functions[4])
+        self.assertIs(importer.etree, functions[4])
+        self.assertIs(ooxml.docxfile.DOCXFile.read_file, functions[5])
+        self.assertIsNone(trace._active)
+
+    def test_save(self):
+        with Tracer() as tracer:
+            ooxml.read_from_file(SAMPLE).close()
+
+        file_name = os.path.join(tempfile.mkdtemp(), 'trace.json')
+        tracer.save(file_name)
+
+        with open(file_name) as f:
+            events = json.load(f)['traceEvents']
+
+        self.assertEqual(len(events), len(tracer.events))
+        self.assertEqual(set(event['ph'] for event in events), set(['X']))
+        self.assertEqual(events, sorted(events, key=lambda event: (event['ts'], -event['dur'])))
+
+    def test_error(self):
+        "Calls which raise should also be recorded."
+
+        with Tracer() as tracer:
+            with self.assertRaises(Exception):
+                ooxml.read_from_file(os.path.join(os.path.dirname(__file__), 'missing.docx'))
+
+        spans = dict((event['name'], event) for event in tracer.events)
+
+        self.assertIn('error', spans['DOCXFile.reset']['args'])
+
+    def test_sort(self):
+        "Outer span should go before inner span which starts at the same time."
+
+        tracer = Tracer()
+        tracer.add_span('inner', 'test', 1, 2)
+        tracer.add_span('outer', 'test', 1, 3)
+
+        self.assertEqual([event['name'] for event in tracer.to_dict()['traceEvents']], ['outer', 'inner'])
+
+
+if __name__ == '__main__':
+    unittest.main()